@@ -0,0 +1,146 @@
+#! python3  # noqa: E265
+
+"""
+    Backpressure benchmark: throughput and peak memory of a crawl with and without
+    the Backpressure extension.
+
+    Each crawl runs in a fresh interpreter, from the project folder (outputs are
+    written into `_output` as usual). Settings can be overridden, for example to
+    crawl a local mirror with a warm HTTP cache.
+
+    Usage:
+
+    .. code-block:: bash
+
+        python benchmarks/bench_backpressure.py --spider geotribu_rdp \\
+            -s DEFAULT_URL_BASE=http://localhost/geotribu_reborn/
+"""
+
+# #############################################################################
+# ########## Libraries #############
+# ##################################
+
+# Standard library
+import argparse
+import json
+import resource
+import subprocess
+import sys
+from pathlib import Path
+
+# #############################################################################
+# ########## Globals ###############
+# ##################################
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+# #############################################################################
+# ########## Functions #############
+# ##################################
+
+
+def run_crawl(spider_name: str, overrides: dict) -> dict:
+    """Run a crawl in the current process and return its main figures.
+
+    :param str spider_name: name of the spider to run
+    :param dict overrides: settings overriding the project ones
+
+    :return: elapsed time, items, peak RSS and backpressure stats
+    :rtype: dict
+    """
+    from scrapy.crawler import CrawlerProcess
+    from scrapy.utils.project import get_project_settings
+
+    settings = get_project_settings()
+    settings.setdict(overrides, priority="cmdline")
+    process = CrawlerProcess(settings)
+    crawler = process.create_crawler(spider_name)
+    process.crawl(crawler)
+    process.start()
+
+    stats = crawler.stats.get_stats()
+    return {
+        "elapsed": stats.get("elapsed_time_seconds", 0),
+        "items": stats.get("item_scraped_count", 0),
+        # kilobytes on Linux
+        "maxrss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "pauses": stats.get("backpressure/pauses", 0),
+        "pending_max": stats.get("backpressure/pending_items_max", "-"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1].strip())
+    parser.add_argument("--spider", default="geotribu_rdp")
+    parser.add_argument("--high", type=int, default=50, help="high-water mark")
+    parser.add_argument("--low", type=int, default=10, help="low-water mark")
+    parser.add_argument(
+        "-s", dest="settings", action="append", default=[], metavar="NAME=VALUE"
+    )
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_crawl(args.spider, json.loads(args.child))))
+        return
+
+    overrides = dict(setting.split("=", 1) for setting in args.settings)
+    overrides.setdefault("LOG_LEVEL", "WARNING")
+    modes = (
+        ("without", {"BACKPRESSURE_ENABLED": False}),
+        (
+            "with",
+            {
+                "BACKPRESSURE_ENABLED": True,
+                "BACKPRESSURE_HIGH_WATER": args.high,
+                "BACKPRESSURE_LOW_WATER": args.low,
+            },
+        ),
+    )
+
+    print(
+        "{:<10} {:>10} {:>8} {:>10} {:>12} {:>8} {:>12}".format(
+            "mode",
+            "time (s)",
+            "items",
+            "items/s",
+            "max RSS (MB)",
+            "pauses",
+            "max pending",
+        )
+    )
+    for label, mode_settings in modes:
+        completed = subprocess.run(
+            [
+                sys.executable,
+                __file__,
+                "--spider",
+                args.spider,
+                "--child",
+                json.dumps(dict(overrides, **mode_settings)),
+            ],
+            cwd=PROJECT_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        print(
+            "{:<10} {:>10.2f} {:>8} {:>10.1f} {:>12.1f} {:>8} {:>12}".format(
+                label,
+                result.get("elapsed"),
+                result.get("items"),
+                result.get("items") / max(result.get("elapsed"), 1e-6),
+                result.get("maxrss_mb"),
+                result.get("pauses"),
+                result.get("pending_max"),
+            )
+        )
+
+
+# #############################################################################
+# ##### Main #######################
+# ##################################
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+#! python3  # noqa: E265
+
+"""
+    Front-matter serialization: template-based emitter vs PyYAML safe_dump, timed on
+    random front-matters built from tricky characters (YAML indicators, quotes, line
+    breaks, non printable and non ASCII characters, reserved words...).
+
+    The round-trip of the template-based emitter is checked by
+    tests/test_frontmatter.py.
+
+    Usage:
+
+    .. code-block:: bash
+
+        python benchmarks/bench_frontmatter.py --samples 2000
+"""
+
+# #############################################################################
+# ########## Libraries #############
+# ##################################
+
+# Standard library
+import argparse
+import random
+import sys
+import timeit
+from pathlib import Path
+
+# 3rd party
+from yaml import safe_dump
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# package module
+from geotribu_scraper.frontmatter import dump_frontmatter  # noqa: E402
+
+# #############################################################################
+# ########## Globals ###############
+# ##################################
+
+TRICKY_CHUNKS = (
+    " ",
+    "  ",
+    ":",
+    ": ",
+    " #",
+    "#",
+    "-",
+    "- ",
+    "?",
+    "'",
+    '"',
+    "\\",
+    "\n",
+    "\r\n",
+    "\t",
+    "\x00",
+    "\x1b",
+    "\x85",
+    "\xa0",
+    "\u2028",
+    "\ufeff",
+    "\u00e9",
+    "\u00ab",
+    "\u00bb",
+    "\u2026",
+    "\U0001f30d",
+    "---",
+    "...",
+    "[",
+    "]",
+    "{",
+    "}",
+    ",",
+    "&",
+    "*",
+    "!",
+    "|",
+    ">",
+    "%",
+    "@",
+    "`",
+    "~",
+    "yes",
+    "No",
+    "null",
+    "true",
+    "0x1F",
+    "1:20",
+    "1_000",
+    ".inf",
+    "2015-02-20",
+    "10:20:30",
+    "=",
+    "<<",
+    "QGIS",
+    "revue de presse",
+)
+
+
+# #############################################################################
+# ########## Functions #############
+# ##################################
+
+
+def random_text(rng: random.Random) -> str:
+    return "".join(rng.choice(TRICKY_CHUNKS) for _ in range(rng.randint(0, 6)))
+
+
+def random_frontmatter(rng: random.Random) -> dict:
+    return {
+        "authors": [random_text(rng)],
+        "categories": [rng.choice(("revue de presse", "article"))],
+        "date": "{} 10:20".format(rng.choice(("2015-02-20", "2008-11-03"))),
+        "description": random_text(rng) * rng.randint(1, 30),
+        "image": "",
+        "legacy": {"node": rng.choice((None, rng.randint(1, 5000)))},
+        "license": "default",
+        "robots": "index, follow",
+        "tags": [random_text(rng) for _ in range(rng.randint(0, 5))],
+        "title": random_text(rng),
+    }
+
+
+def reference_dump(frontmatter: dict) -> str:
+    return safe_dump(
+        data=frontmatter,
+        allow_unicode=True,
+        explicit_start=True,
+        indent=4,
+        width=1000,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1].strip())
+    parser.add_argument("--samples", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=2020)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    samples = [random_frontmatter(rng) for _ in range(args.samples)]
+
+    # timing
+    for label, func in (("safe_dump", reference_dump), ("template", dump_frontmatter)):
+        duration = timeit.timeit(lambda: [func(f) for f in samples], number=3) / 3
+        print(
+            "{:<10} {:>8.1f} ms for {} items ({:.1f} µs/item)".format(
+                label, duration * 1000, len(samples), duration * 1e6 / len(samples)
+            )
+        )
+
+
+# #############################################################################
+# ##### Main #######################
+# ##################################
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#! python3  # noqa: E265
+
+"""
+    HTML to markdown conversion: markdownify alone vs lxml pre-cleaning + markdownify
+    vs the project converter (cleaning + a single parsing for all the fragments).
+
+    Fragments are extracted from the legacy pages stored in `tests/fixtures` with the
+    same selectors as the spiders (RDP intro and news, article body and author).
+
+    Usage:
+
+    .. code-block:: bash
+
+        python benchmarks/bench_html_cleaning.py --number 20 --repeat 5
+"""
+
+# #############################################################################
+# ########## Libraries #############
+# ##################################
+
+# Standard library
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+# 3rd party
+from markdownify import markdownify as md
+from parsel import Selector
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# package module
+from geotribu_scraper.html_cleaner import clean_html  # noqa: E402
+from geotribu_scraper.markdown_converter import html_to_markdown  # noqa: E402
+
+# #############################################################################
+# ########## Globals ###############
+# ##################################
+
+FIXTURES_FOLDER = Path(__file__).resolve().parent.parent / "tests" / "fixtures"
+
+
+# #############################################################################
+# ########## Functions #############
+# ##################################
+
+
+def extract_fragments(fixture: Path) -> list:
+    """Extract the HTML fragments converted by the pipeline from a legacy page.
+
+    :param Path fixture: path to the HTML page
+
+    :return: list of HTML fragments
+    :rtype: list
+    """
+    article = Selector(text=fixture.read_text(encoding="UTF8")).css("article")[0]
+    if fixture.name.startswith("rdp_"):
+        fragments = []
+        for paragraph in article.css("p"):
+            if paragraph.css("p.directNews"):
+                break
+            fragments.append(paragraph.get())
+        for news in article.css("div.news-details"):
+            fragments.extend(news.css("p, iframe, li").getall())
+    else:
+        fragments = article.css(
+            "div.field-name-field-introduction, div.field-name-body"
+        ).getall()
+        fragments.extend(article.css("div.views-field-field-description p").getall())
+
+    return [f for f in fragments if not f.startswith("<iframe ")]
+
+
+def convert_raw(fragments: list) -> list:
+    return [md(fragment, heading_style="ATX") for fragment in fragments]
+
+
+def convert_cleaned(fragments: list) -> list:
+    return [md(clean_html(fragment), heading_style="ATX") for fragment in fragments]
+
+
+def convert_item(fragments: list) -> list:
+    return html_to_markdown.convert_fragments(fragments)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1].strip())
+    parser.add_argument("--number", type=int, default=20, help="runs per timing")
+    parser.add_argument("--repeat", type=int, default=5, help="best of N timings")
+    args = parser.parse_args()
+
+    print(
+        "{:<24} {:>10} {:>10} {:>10} {:>10} {:>10}".format(
+            "fixture", "raw (ms)", "clean (ms)", "item (ms)", "raw (B)", "clean (B)"
+        )
+    )
+    for fixture in sorted(FIXTURES_FOLDER.glob("*.html")):
+        fragments = extract_fragments(fixture)
+        timings = []
+        for func in (convert_raw, convert_cleaned, convert_item):
+            durations = timeit.repeat(
+                lambda: func(fragments), repeat=args.repeat, number=args.number
+            )
+            timings.append(min(durations) * 1000 / args.number)
+
+        print(
+            "{:<24} {:>10.2f} {:>10.2f} {:>10.2f} {:>10} {:>10}".format(
+                fixture.name,
+                *timings,
+                sum(len(m) for m in convert_raw(fragments)),
+                sum(len(m) for m in convert_cleaned(fragments)),
+            )
+        )
+
+
+# #############################################################################
+# ##### Main #######################
+# ##################################
+if __name__ == "__main__":
+    main()
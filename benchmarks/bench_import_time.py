@@ -0,0 +1,113 @@
+#! python3  # noqa: E265
+
+"""
+    Startup benchmark: import time of the package and of each spider module.
+
+    Each module is imported in a fresh interpreter (`python -X importtime`), from an
+    empty temporary folder to check that importing does not write anything on disk.
+
+    Usage:
+
+    .. code-block:: bash
+
+        python benchmarks/bench_import_time.py --runs 10
+"""
+
+# #############################################################################
+# ########## Libraries #############
+# ##################################
+
+# Standard library
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+# #############################################################################
+# ########## Globals ###############
+# ##################################
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+MODULES = (
+    "geotribu_scraper",
+    "geotribu_scraper.settings",
+    "geotribu_scraper.middlewares",
+    "geotribu_scraper.pipelines",
+    "geotribu_scraper.spiders.articles_crawler",
+    "geotribu_scraper.spiders.rdp_crawler",
+    "geotribu_scraper.spiders.tutos_crawler",
+)
+
+
+# #############################################################################
+# ########## Functions #############
+# ##################################
+
+
+def measure_import(module_name: str, work_dir: str) -> int:
+    """Import a module in a fresh interpreter and return its cumulative import time.
+
+    :param str module_name: dotted module name
+    :param str work_dir: folder used as current working directory
+
+    :return: cumulative import time in microseconds
+    :rtype: int
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import {}".format(module_name)],
+        cwd=work_dir,
+        env={"PYTHONPATH": str(PROJECT_ROOT)},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    for line in completed.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        fields = [field.strip() for field in line.split("|")]
+        if len(fields) == 3 and fields[2] == module_name:
+            return int(fields[1])
+
+    raise ValueError("No import time found for {}".format(module_name))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1].strip())
+    parser.add_argument("--runs", type=int, default=5, help="runs per module")
+    args = parser.parse_args()
+
+    print("{:<45} {:>12} {:>12}".format("module", "median (ms)", "min (ms)"))
+    for module_name in MODULES:
+        with tempfile.TemporaryDirectory() as work_dir:
+            try:
+                timings = [
+                    measure_import(module_name, work_dir) for _ in range(args.runs)
+                ]
+            except subprocess.CalledProcessError as err:
+                print(
+                    "{:<45} import failed: {}".format(
+                        module_name, err.stderr.strip().splitlines()[-1]
+                    )
+                )
+                continue
+            side_effects = sorted(p.name for p in Path(work_dir).iterdir())
+
+        print(
+            "{:<45} {:>12.1f} {:>12.1f}{}".format(
+                module_name,
+                statistics.median(timings) / 1000,
+                min(timings) / 1000,
+                "  /!\\ created: {}".format(", ".join(side_effects))
+                if side_effects
+                else "",
+            )
+        )
+
+
+# #############################################################################
+# ##### Main #######################
+# ##################################
+if __name__ == "__main__":
+    main()
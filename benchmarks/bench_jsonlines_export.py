@@ -0,0 +1,200 @@
+#! python3  # noqa: E265
+
+"""
+    Items export: current JsonWriterPipeline (json.dumps with ASCII escaping, one
+    write per item) vs the batched JSON lines writer, uncompressed, gzip and zstd
+    (if zstandard is installed), with json and orjson (if installed).
+
+    Items are extracted from the legacy pages stored in `tests/fixtures` with the
+    same functions as the spiders, then repeated with distinct nodes and shuffled
+    words. Every export is read back and checked against the items before timing.
+
+    Usage:
+
+    .. code-block:: bash
+
+        python benchmarks/bench_jsonlines_export.py --items 5000 --repeat 3
+"""
+
+# #############################################################################
+# ########## Libraries #############
+# ##################################
+
+# Standard library
+import argparse
+import gzip
+import json
+import random
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+# 3rd party
+from scrapy.http import HtmlResponse
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# package module
+from geotribu_scraper import jsonlines_export  # noqa: E402
+from geotribu_scraper.extraction import extract_article, extract_rdp  # noqa: E402
+from geotribu_scraper.jsonlines_export import JsonLinesWriter  # noqa: E402
+
+# #############################################################################
+# ########## Globals ###############
+# ##################################
+
+FIXTURES_FOLDER = Path(__file__).resolve().parent.parent / "tests" / "fixtures"
+
+
+# #############################################################################
+# ########## Functions #############
+# ##################################
+
+
+def shuffle_words(value, rng: random.Random):
+    """Shuffle the words of the strings of a value, so that repeated items are not
+    found again by the compressors, with the same vocabulary and characters.
+    """
+    if isinstance(value, str):
+        words = value.split(" ")
+        rng.shuffle(words)
+        return " ".join(words)
+    if isinstance(value, (list, tuple)):
+        return [shuffle_words(v, rng) for v in value]
+    if isinstance(value, dict):
+        return {k: shuffle_words(v, rng) for k, v in value.items()}
+    return value
+
+
+def load_items(count: int, seed: int = 2020) -> list:
+    """Extract the items of the fixtures pages and repeat them up to count, with
+    shuffled words.
+
+    :param int count: count of items
+    :param int seed: random seed
+
+    :return: list of items fields
+    :rtype: list
+    """
+    models = []
+    for fixture in sorted(FIXTURES_FOLDER.glob("*.html")):
+        response = HtmlResponse(
+            url="http://localhost/geotribu_reborn/{}".format(fixture.stem),
+            body=fixture.read_bytes(),
+            encoding="UTF8",
+        )
+        extractor = extract_rdp if fixture.name.startswith("rdp_") else extract_article
+        models.append(extractor(response))
+
+    rng = random.Random(seed)
+    items = []
+    for i in range(count):
+        item = shuffle_words(models[i % len(models)], rng)
+        item["drupal_node"] = i
+        items.append(item)
+    return items
+
+
+def write_current(items: list, folder: Path) -> list:
+    """Export as JsonWriterPipeline does."""
+    path = folder / "items.jl"
+    with path.open(mode="w", encoding="UTF8") as out_file:
+        for item in items:
+            line = json.dumps(dict(item)) + "\n"
+            out_file.write(line)
+    return [path]
+
+
+def write_batched(items: list, folder: Path, compression: str, fast_json: bool):
+    """Export with the batched writer."""
+    with JsonLinesWriter(
+        base_path=folder / "items",
+        compression=compression,
+        fast_json=fast_json,
+    ) as writer:
+        for item in items:
+            writer.write(item)
+    return writer.paths
+
+
+def read_back(path: Path) -> list:
+    if path.suffix == ".gz":
+        data = gzip.decompress(path.read_bytes())
+    elif path.suffix == ".zst":
+        import zstandard
+
+        data = (
+            zstandard.ZstdDecompressor().decompressobj().decompress(path.read_bytes())
+        )
+    else:
+        data = path.read_bytes()
+    return [json.loads(line) for line in data.splitlines()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1].strip())
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=2020)
+    args = parser.parse_args()
+
+    items = load_items(args.items, args.seed)
+    expected = [json.loads(json.dumps(item)) for item in items]
+
+    compressions = [None, "gzip"]
+    try:
+        import zstandard  # noqa: F401
+
+        compressions.append("zstd")
+    except ImportError:
+        print("zstandard is not installed: zstd skipped.")
+    encoders = [False]
+    if jsonlines_export.orjson:
+        encoders.append(True)
+    else:
+        print("orjson is not installed: orjson skipped.")
+
+    variants = [("current (items.jl)", write_current)]
+    for compression in compressions:
+        for fast_json in encoders:
+            variants.append(
+                (
+                    "{} {}".format(
+                        compression or "raw", "orjson" if fast_json else "json"
+                    ),
+                    lambda i, f, c=compression, j=fast_json: write_batched(i, f, c, j),
+                )
+            )
+
+    print("{} items".format(len(items)))
+    reference_time = None
+    for label, func in variants:
+        with tempfile.TemporaryDirectory() as folder:
+            paths = func(items, Path(folder))
+            if [item for path in paths for item in read_back(path)] != expected:
+                print("Mismatch in the export: {}".format(label))
+                sys.exit(1)
+            size = sum(path.stat().st_size for path in paths)
+            duration = min(
+                timeit.repeat(
+                    lambda: func(items, Path(folder)), number=1, repeat=args.repeat
+                )
+            )
+        reference_time = reference_time or duration
+        print(
+            "{:<20} {:>8.1f} ms ({:>6.0f} items/s, x{:.2f}) {:>10} bytes".format(
+                label,
+                duration * 1000,
+                len(items) / duration,
+                reference_time / duration,
+                size,
+            )
+        )
+
+
+# #############################################################################
+# ##### Main #######################
+# ##################################
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#! python3  # noqa: E265
+
+"""
+    Stress test of the shared token bucket: several processes take tokens for the
+    same host as fast as they are allowed (trying again when told to), and the
+    timestamps of all the "requests" are checked against the budget.
+
+    A token bucket of rate r and size b allows at most b + r * t requests during any
+    period of t seconds: the check is made on sliding windows (1 second by default),
+    longer than the scheduling jitter of the processes.
+
+    Usage:
+
+    .. code-block:: bash
+
+        python benchmarks/stress_shared_rate_limit.py --processes 8 --requests 25 --rate 20
+"""
+
+# #############################################################################
+# ########## Libraries #############
+# ##################################
+
+# Standard library
+import argparse
+import multiprocessing
+import sys
+import tempfile
+import time
+from bisect import bisect_left
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# package module
+from geotribu_scraper.rate_limit import SharedTokenBucket  # noqa: E402
+
+# #############################################################################
+# ########## Globals ###############
+# ##################################
+
+HOST = "web.archive.org"
+
+
+# #############################################################################
+# ########## Functions #############
+# ##################################
+
+
+def worker(db_path: str, rate: float, burst: float, requests: int, start: float):
+    """Take tokens as fast as allowed, return the send times."""
+    bucket = SharedTokenBucket(db_path=Path(db_path), rate=rate, burst=burst)
+    time.sleep(max(0, start - time.time()))
+    times = []
+    for _ in range(requests):
+        delay = bucket.acquire(HOST)
+        while delay > 0:
+            time.sleep(delay)
+            delay = bucket.acquire(HOST)
+        times.append(time.time())
+    bucket.close()
+    return times
+
+
+def max_excess(times: list, rate: float, burst: float, window: float) -> float:
+    """Highest count of requests over the budget, in every window starting at a
+    request.
+
+    :param list times: sorted send times
+    :param float rate: tokens per second
+    :param float burst: size of the bucket
+    :param float window: length of the windows in seconds
+
+    :return: requests over the budget (0 or negative if respected)
+    :rtype: float
+    """
+    budget = burst + rate * window
+    return max(
+        bisect_left(times, first + window) - i - budget for i, first in enumerate(times)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1].strip())
+    parser.add_argument("--processes", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=25, help="per process")
+    parser.add_argument("--rate", type=float, default=20, help="requests per second")
+    parser.add_argument("--burst", type=float, default=1)
+    parser.add_argument("--window", type=float, default=1, help="seconds")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        db_path = str(Path(folder) / "rate_limit.sqlite")
+        # create the database before the workers start
+        SharedTokenBucket(Path(db_path), args.rate, args.burst).close()
+        start = time.time() + 1
+        with multiprocessing.Pool(args.processes) as pool:
+            results = pool.starmap(
+                worker,
+                [(db_path, args.rate, args.burst, args.requests, start)]
+                * args.processes,
+            )
+
+    times = sorted(t for result in results for t in result)
+    duration = times[-1] - times[0]
+    global_rate = (len(times) - args.burst) / duration if duration else float("inf")
+    excess = max_excess(times, args.rate, args.burst, args.window)
+    print(
+        "{} processes, {} requests in {:.2f} s: {:.2f} requests/s for a budget of "
+        "{} (unshared: {} requests/s).".format(
+            args.processes,
+            len(times),
+            duration,
+            global_rate,
+            args.rate,
+            args.rate * args.processes,
+        )
+    )
+    if excess > 0:
+        print("Budget exceeded by {:.2f} requests.".format(excess))
+        sys.exit(1)
+    print(
+        "Budget respected on every {} s window (margin {:.2f} requests).".format(
+            args.window, 0.0 - excess
+        )
+    )
+
+
+# #############################################################################
+# ##### Main #######################
+# ##################################
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#! python3  # noqa: E265
+
+"""
+    Pause of the Scrapy engine shared by several components (backpressure extension,
+    429 backoff...): each one pauses the engine for its own reason, and the engine is
+    only resumed once no reason remains.
+"""
+
+# #############################################################################
+# ########## Libraries #############
+# ##################################
+
+# Standard library
+import logging
+from weakref import WeakKeyDictionary
+
+# #############################################################################
+# ########## Globals ###############
+# ##################################
+
+# reasons for which the engine of each crawler is paused
+_pause_reasons = WeakKeyDictionary()
+
+# #############################################################################
+# ########## Functions #############
+# ##################################
+
+
+def pause_reasons(crawler) -> frozenset:
+    """Return the reasons for which the engine of a crawler is paused.
+
+    :param Crawler crawler: Scrapy crawler
+
+    :return: pause reasons, empty if the engine runs
+    :rtype: frozenset
+    """
+    return frozenset(_pause_reasons.get(crawler, ()))
+
+
+def pause_engine(crawler, reason: str):
+    """Pause the engine of a crawler for a reason.
+
+    :param Crawler crawler: Scrapy crawler
+    :param str reason: pause reason, to be given back to `unpause_engine`
+    """
+    reasons = _pause_reasons.setdefault(crawler, set())
+    if not reasons:
+        crawler.engine.pause()
+    reasons.add(reason)
+
+
+def unpause_engine(crawler, reason: str) -> bool:
+    """Release a pause reason and resume the engine if no other reason remains.
+
+    :param Crawler crawler: Scrapy crawler
+    :param str reason: pause reason given to `pause_engine`
+
+    :return: True if the engine has been resumed
+    :rtype: bool
+    """
+    reasons = _pause_reasons.get(crawler, set())
+    if reason not in reasons:
+        return False
+
+    reasons.discard(reason)
+    if reasons:
+        logging.debug(
+            "Engine still paused, released '{}' but kept by: {}".format(
+                reason, ", ".join(sorted(reasons))
+            )
+        )
+        return False
+
+    crawler.engine.unpause()
+    return True
@@ -0,0 +1,886 @@
+#! python3  # noqa: E265
+
+# Define here the custom Scrapy extensions
+#
+# See documentation in:
+# https://docs.scrapy.org/en/latest/topics/extensions.html
+
+# #############################################################################
+# ########## Libraries #############
+# ##################################
+
+# Standard library
+import ipaddress
+import json
+import logging
+import os
+import sys
+import time
+from collections import Counter, deque
+from pathlib import Path
+from urllib.parse import urlparse
+
+# 3rd party library
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+from twisted.internet import task
+
+# project
+from geotribu_scraper.engine_pause import pause_engine, unpause_engine
+
+# #############################################################################
+# ########## Globals ###############
+# ##################################
+
+# host names considered as local mirrors
+LOCAL_HOSTNAMES = ("localhost",)
+LOCAL_DOMAIN_SUFFIXES = (".localhost", ".local", ".lan", ".internal")
+
+# HTTP status codes counted as errors by the throttling
+THROTTLING_ERROR_CODES = frozenset((429, 500, 502, 503, 504, 520, 522, 524))
+
+# prefix of the exported metrics names
+METRICS_PREFIX = "geotribu_scraper_"
+
+
+# #############################################################################
+# ########## Functions #############
+# ##################################
+
+
+def is_local_host(host: str) -> bool:
+    """Check if a host is a loopback, private or link-local one: a local mirror of
+    the website rather than a public server. No DNS resolution is performed.
+
+    :param str host: host name or IP address
+
+    :return: True if the host is local
+    :rtype: bool
+    """
+    host = (host or "").lower().rstrip(".")
+    if host in LOCAL_HOSTNAMES or host.endswith(LOCAL_DOMAIN_SUFFIXES):
+        return True
+
+    try:
+        ip = ipaddress.ip_address(host.strip("[]"))
+    except ValueError:
+        return False
+
+    return ip.is_loopback or ip.is_private or ip.is_link_local
+
+
+# #############################################################################
+# ########## Classes ###############
+# ##################################
+class SlotThrottle(object):
+    """Throttling state of a download slot (a host): its profile, the EWMA of the
+    latency and of the error rate of its downloads, and the concurrency and delay
+    derived from them.
+
+    :param str profile_name: name of the profile
+    :param dict profile: limits of the profile, see ADAPTIVE_THROTTLE_PROFILES
+    :param float alpha: smoothing factor of the EWMA
+    :param int window: count of downloads between two adjustments
+    :param float max_error_rate: error rate above which the slot is slowed down
+    """
+
+    def __init__(
+        self,
+        profile_name: str,
+        profile: dict,
+        alpha: float,
+        window: int,
+        max_error_rate: float,
+    ):
+        self.profile_name = profile_name
+        self.profile = profile
+        self.alpha = alpha
+        self.window = window
+        self.max_error_rate = max_error_rate
+
+        self.latency_ewma = None
+        self.error_rate_ewma = 0.0
+        self.downloads_since_adjustment = 0
+        self.concurrency = profile.get("concurrency")
+        self.delay = profile.get("delay")
+
+    def record(self, latency: float, is_error: bool) -> str:
+        """Update the averages with a download and adjust the limits at the end of
+        each window, or right away on an error.
+
+        :param float latency: download latency, None if the download failed
+        :param bool is_error: error response or download exception
+
+        :return: "slowdowns", "speedups" or None if the limits are unchanged
+        :rtype: str
+        """
+        if latency is not None:
+            if self.latency_ewma is None:
+                self.latency_ewma = latency
+            else:
+                self.latency_ewma += self.alpha * (latency - self.latency_ewma)
+        self.error_rate_ewma += self.alpha * (is_error - self.error_rate_ewma)
+
+        self.downloads_since_adjustment += 1
+        if self.downloads_since_adjustment >= self.window or is_error:
+            self.downloads_since_adjustment = 0
+            return self.adjust()
+        return None
+
+    def adjust(self) -> str:
+        """Decrease concurrency and increase delay (multiplicatively) when the server
+        struggles, else increase concurrency (additively) and decrease delay.
+
+        :return: "slowdowns", "speedups" or None if the limits are unchanged
+        :rtype: str
+        """
+        target_latency = self.profile.get("target_latency")
+        latency = self.latency_ewma
+        if self.error_rate_ewma > self.max_error_rate or (
+            latency is not None and latency > 2 * target_latency
+        ):
+            self.concurrency = max(
+                self.profile.get("min_concurrency"), self.concurrency // 2
+            )
+            self.delay = min(
+                self.profile.get("max_delay"),
+                max(self.delay * 2, self.profile.get("delay"), 0.25),
+            )
+            return "slowdowns"
+        elif (
+            self.error_rate_ewma < self.max_error_rate / 2
+            and latency is not None
+            and latency < target_latency
+        ):
+            self.concurrency = min(
+                self.profile.get("max_concurrency"), self.concurrency + 1
+            )
+            self.delay = max(self.profile.get("delay"), round(self.delay * 0.75, 3))
+            return "speedups"
+        return None
+
+
+class AdaptiveThrottle(object):
+    """Set the concurrency and delay of each download slot (a host) from a profile
+    picked according to the host (full speed for local mirrors, polite limits for
+    public hosts), then adjust them from an exponentially weighted moving average
+    (EWMA) of the latency and of the error rate of the downloads of this slot. Error
+    responses and download exceptions (timeouts, refused connections...) count as
+    errors.
+
+    The chosen limits are exposed in the stats, under `adaptive_throttle/<slot>/`.
+    """
+
+    def __init__(self, crawler):
+        self.crawler = crawler
+        self.stats = crawler.stats
+        settings = crawler.settings
+
+        # in Wayback CDX mode, contents are downloaded from the Wayback Machine
+        if settings.get("WAYBACK_CDX_SOURCE"):
+            target_url = settings.get("WAYBACK_BASE_URL")
+        else:
+            target_url = settings.get("DEFAULT_URL_BASE")
+
+        self.profiles = settings.getdict("ADAPTIVE_THROTTLE_PROFILES")
+        self.forced_profile_name = settings.get("ADAPTIVE_THROTTLE_PROFILE")
+        # profile of the main host, also used for the hosts whose profile is missing
+        self.profile_name = self.profile_name_for(urlparse(target_url).hostname)
+        if self.profile_name not in self.profiles:
+            raise NotConfigured(
+                "Unknown throttling profile: {}".format(self.profile_name)
+            )
+
+        self.alpha = settings.getfloat("ADAPTIVE_THROTTLE_EWMA_ALPHA")
+        self.window = settings.getint("ADAPTIVE_THROTTLE_WINDOW")
+        self.max_error_rate = settings.getfloat("ADAPTIVE_THROTTLE_MAX_ERROR_RATE")
+
+        # state by download slot key
+        self.slots = {}
+        # requests which got a response, the others left the downloader on an error
+        self.answered = set()
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("ADAPTIVE_THROTTLE_ENABLED"):
+            raise NotConfigured
+        if crawler.settings.getbool("AUTOTHROTTLE_ENABLED"):
+            logging.warning(
+                "Adaptive throttling disabled because AutoThrottle is enabled."
+            )
+            raise NotConfigured
+
+        ext = cls(crawler)
+        crawler.signals.connect(
+            ext.request_reached_downloader, signal=signals.request_reached_downloader
+        )
+        crawler.signals.connect(
+            ext.response_downloaded, signal=signals.response_downloaded
+        )
+        crawler.signals.connect(
+            ext.request_left_downloader, signal=signals.request_left_downloader
+        )
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        return ext
+
+    def profile_name_for(self, host: str) -> str:
+        """Name of the profile of a host: the forced one, else local or public.
+
+        :param str host: host name or IP address
+
+        :return: profile name
+        :rtype: str
+        """
+        if self.forced_profile_name:
+            return self.forced_profile_name
+        return "local" if is_local_host(host) else "public"
+
+    def slot_throttle(self, request) -> SlotThrottle:
+        """Return the throttling state of the download slot of a request, created
+        from the profile of its host the first time the slot is seen.
+
+        :param Request request: request assigned to a download slot
+
+        :return: throttling state of the slot
+        :rtype: SlotThrottle
+        """
+        key = request.meta.get("download_slot")
+        throttle = self.slots.get(key)
+        if throttle is not None:
+            return throttle
+
+        profile_name = self.profile_name_for(urlparse(request.url).hostname)
+        if profile_name not in self.profiles:
+            profile_name = self.profile_name
+        throttle = SlotThrottle(
+            profile_name=profile_name,
+            profile=self.profiles.get(profile_name),
+            alpha=self.alpha,
+            window=self.window,
+            max_error_rate=self.max_error_rate,
+        )
+        self.slots[key] = throttle
+
+        downloader = self.crawler.engine.downloader
+        downloader.total_concurrency = max(
+            downloader.total_concurrency, throttle.profile.get("max_concurrency")
+        )
+        logging.info(
+            "Adaptive throttling: profile '{}' for {}, concurrency {}, "
+            "delay {}s.".format(profile_name, key, throttle.concurrency, throttle.delay)
+        )
+        self.stats.set_value("adaptive_throttle/{}/profile".format(key), profile_name)
+        self.stats.set_value(
+            "adaptive_throttle/total_concurrency", downloader.total_concurrency
+        )
+        self._update_stats(key, throttle)
+        return throttle
+
+    def request_reached_downloader(self, request, spider):
+        # the slot exists, the request is not sent yet. Slots are also recreated by
+        # the downloader after some idle time.
+        self._apply(request, self.slot_throttle(request))
+
+    def response_downloaded(self, response, request, spider):
+        self.answered.add(request)
+        latency = request.meta.get("download_latency")
+        if latency is None:
+            return
+        self._record(
+            request, latency=latency, is_error=response.status in THROTTLING_ERROR_CODES
+        )
+
+    def request_left_downloader(self, request, spider):
+        if request in self.answered:
+            self.answered.discard(request)
+            return
+
+        # no response: timeout, refused connection, DNS error...
+        self.stats.inc_value("adaptive_throttle/download_errors")
+        self._record(request, latency=None, is_error=True)
+
+    def spider_closed(self, spider):
+        for key, throttle in self.slots.items():
+            logging.info(
+                "Adaptive throttling of {} ('{}'): latency EWMA {:.3f}s, error rate "
+                "EWMA {:.2%}, final concurrency {} and delay {}s.".format(
+                    key,
+                    throttle.profile_name,
+                    throttle.latency_ewma or 0,
+                    throttle.error_rate_ewma,
+                    throttle.concurrency,
+                    throttle.delay,
+                )
+            )
+
+    def _record(self, request, latency: float, is_error: bool):
+        throttle = self.slots.get(request.meta.get("download_slot"))
+        if throttle is None:
+            return
+        change = throttle.record(latency=latency, is_error=is_error)
+        if change:
+            self.stats.inc_value("adaptive_throttle/{}".format(change))
+        self._apply(request, throttle)
+        self._update_stats(request.meta.get("download_slot"), throttle)
+
+    def _apply(self, request, throttle: SlotThrottle):
+        slot = self.crawler.engine.downloader.slots.get(
+            request.meta.get("download_slot")
+        )
+        if slot is not None:
+            slot.concurrency = throttle.concurrency
+            slot.delay = throttle.delay
+
+    def _update_stats(self, key: str, throttle: SlotThrottle):
+        prefix = "adaptive_throttle/{}/".format(key)
+        self.stats.set_value(prefix + "concurrency", throttle.concurrency)
+        self.stats.set_value(prefix + "delay", throttle.delay)
+        self.stats.max_value("adaptive_throttle/max_concurrency", throttle.concurrency)
+        if throttle.latency_ewma is not None:
+            self.stats.set_value(
+                prefix + "latency_ewma", round(throttle.latency_ewma, 4)
+            )
+        self.stats.set_value(
+            prefix + "error_rate_ewma", round(throttle.error_rate_ewma, 4)
+        )
+
+
+class MetricsExporter(object):
+    """Serve live metrics of the crawl in the Prometheus text format, on
+    http://METRICS_HOST:METRICS_PORT/metrics (or any other path): responses by status,
+    items by type, queue depths, pipeline latency, markdown bytes written and time
+    spent in the 429 backoff.
+
+    Rates per second are computed over the last METRICS_RATE_WINDOW seconds.
+    """
+
+    def __init__(self, crawler):
+        self.crawler = crawler
+        self.stats = crawler.stats
+        self.host = crawler.settings.get("METRICS_HOST")
+        self.port = crawler.settings.getint("METRICS_PORT")
+        self.interval = crawler.settings.getfloat("METRICS_SAMPLE_INTERVAL")
+        window = crawler.settings.getfloat("METRICS_RATE_WINDOW")
+
+        self.responses = Counter()
+        self.items = Counter()
+        self.samples = deque(maxlen=max(2, int(window / self.interval) + 1))
+        self.start_time = None
+        self.listener = None
+        self.sampling_task = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("METRICS_ENABLED"):
+            raise NotConfigured
+
+        ext = cls(crawler)
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        crawler.signals.connect(ext.response_received, signal=signals.response_received)
+        crawler.signals.connect(ext.item_scraped, signal=signals.item_scraped)
+        return ext
+
+    def spider_opened(self, spider):
+        # imported here: the reactor must not be installed when the module is loaded
+        # (Scrapy installs the one of TWISTED_REACTOR), and the web server is only
+        # needed when the metrics are enabled
+        from twisted.internet import reactor
+        from twisted.web.resource import Resource
+        from twisted.web.server import Site
+
+        resource = Resource()
+        resource.isLeaf = True
+        resource.render_GET = self.render_GET
+
+        self.start_time = time.monotonic()
+        self.listener = reactor.listenTCP(
+            self.port, Site(resource), interface=self.host
+        )
+        self.sampling_task = task.LoopingCall(self.sample)
+        self.sampling_task.start(self.interval, now=True)
+        logging.info(
+            "Metrics served on http://{}:{}/metrics".format(
+                self.host, self.listener.getHost().port
+            )
+        )
+
+    def spider_closed(self, spider):
+        if self.sampling_task and self.sampling_task.running:
+            self.sampling_task.stop()
+        if self.listener:
+            return self.listener.stopListening()
+
+    def render_GET(self, request) -> bytes:
+        """Render the metrics for a GET request on the web server.
+
+        :param request: Twisted web request
+
+        :return: metrics in the Prometheus text format
+        :rtype: bytes
+        """
+        request.setHeader(b"Content-Type", b"text/plain; version=0.0.4; charset=utf-8")
+        return self.render().encode("UTF8")
+
+    def response_received(self, response, request, spider):
+        self.responses[str(response.status)] += 1
+
+    def item_scraped(self, item, response, spider):
+        self.items[type(item).__name__] += 1
+
+    def sample(self):
+        """Keep a snapshot of the counters, used to compute the rates."""
+        self.samples.append(
+            (time.monotonic(), Counter(self.responses), Counter(self.items))
+        )
+
+    def _rates(self, counter: Counter, index: int) -> dict:
+        """Rates per second of a counter since the oldest snapshot.
+
+        :param Counter counter: current values
+        :param int index: index of the counter in the snapshots
+
+        :return: rates by label
+        :rtype: dict
+        """
+        if not self.samples:
+            return {}
+        oldest = self.samples[0]
+        elapsed = time.monotonic() - oldest[0]
+        if elapsed <= 0:
+            return {}
+        return {
+            label: (value - oldest[index].get(label, 0)) / elapsed
+            for label, value in counter.items()
+        }
+
+    def _queue_depths(self) -> dict:
+        """Current sizes of the scheduler, downloader and scraper queues."""
+        engine = self.crawler.engine
+        depths = {}
+        if engine is None or engine.slot is None:
+            return depths
+
+        depths["scheduler"] = len(engine.slot.scheduler)
+        downloader = engine.downloader
+        depths["downloader_queued"] = sum(
+            len(slot.queue) for slot in downloader.slots.values()
+        )
+        depths["downloader_transferring"] = sum(
+            len(slot.transferring) for slot in downloader.slots.values()
+        )
+        if engine.scraper.slot is not None:
+            depths["scraper_queued"] = len(engine.scraper.slot.queue)
+            depths["item_pipeline"] = engine.scraper.slot.itemproc_size
+        return depths
+
+    def render(self) -> str:
+        """Build the metrics document in the Prometheus text format.
+
+        :return: metrics
+        :rtype: str
+        """
+        lines = []
+
+        def add(name, kind, help_text, values):
+            lines.append("# HELP {}{} {}".format(METRICS_PREFIX, name, help_text))
+            lines.append("# TYPE {}{} {}".format(METRICS_PREFIX, name, kind))
+            for labels, value in values:
+                lines.append(
+                    "{}{}{} {}".format(
+                        METRICS_PREFIX,
+                        name,
+                        "{{{}}}".format(
+                            ",".join('{}="{}"'.format(k, v) for k, v in labels)
+                        )
+                        if labels
+                        else "",
+                        round(value, 6) if isinstance(value, float) else value,
+                    )
+                )
+
+        add(
+            "uptime_seconds",
+            "gauge",
+            "Time since the spider was opened.",
+            [((), time.monotonic() - (self.start_time or time.monotonic()))],
+        )
+        add(
+            "responses_total",
+            "counter",
+            "Responses received, by HTTP status.",
+            [((("status", k),), v) for k, v in sorted(self.responses.items())],
+        )
+        add(
+            "responses_per_second",
+            "gauge",
+            "Responses received per second, by HTTP status.",
+            [
+                ((("status", k),), v)
+                for k, v in sorted(self._rates(self.responses, 1).items())
+            ],
+        )
+        add(
+            "items_total",
+            "counter",
+            "Items scraped, by item type.",
+            [((("type", k),), v) for k, v in sorted(self.items.items())],
+        )
+        add(
+            "items_per_second",
+            "gauge",
+            "Items scraped per second, by item type.",
+            [
+                ((("type", k),), v)
+                for k, v in sorted(self._rates(self.items, 2).items())
+            ],
+        )
+        add(
+            "queue_size",
+            "gauge",
+            "Requests or items waiting or in progress, by queue.",
+            [((("queue", k),), v) for k, v in self._queue_depths().items()],
+        )
+        add(
+            "pipeline_latency_seconds",
+            "summary",
+            "Time spent converting items to markdown.",
+            [],
+        )
+        lines.append(
+            "{}pipeline_latency_seconds_sum {}".format(
+                METRICS_PREFIX,
+                round(self.stats.get_value("pipeline/process_item_seconds", 0), 6),
+            )
+        )
+        lines.append(
+            "{}pipeline_latency_seconds_count {}".format(
+                METRICS_PREFIX, self.stats.get_value("pipeline/process_item_count", 0)
+            )
+        )
+        add(
+            "pipeline_latency_max_seconds",
+            "gauge",
+            "Longest time spent converting an item to markdown.",
+            [((), self.stats.get_value("pipeline/process_item_max_seconds", 0))],
+        )
+        add(
+            "markdown_bytes_written_total",
+            "counter",
+            "Bytes of markdown files written.",
+            [((), self.stats.get_value("markdown/bytes_written", 0))],
+        )
+        add(
+            "markdown_files_written_total",
+            "counter",
+            "Markdown files written.",
+            [((), self.stats.get_value("markdown/files_written", 0))],
+        )
+        add(
+            "retry_429_backoff_seconds_total",
+            "counter",
+            "Time spent paused after 429 Too Many Requests responses.",
+            [((), self.stats.get_value("retry/429_backoff_seconds", 0))],
+        )
+
+        return "\n".join(lines) + "\n"
+
+
+class Backpressure(object):
+    """Pause the scheduling of new requests while too many items are pending in the
+    item pipelines (conversion to markdown...), so that a fast downloader (local
+    mirror, warm HTTP cache) does not pile up responses and items in memory.
+
+    The engine is paused when the pending items reach BACKPRESSURE_HIGH_WATER and
+    resumed when they fall to BACKPRESSURE_LOW_WATER, unless another component still
+    keeps it paused (see `geotribu_scraper.engine_pause`). Requests already sent are
+    not cancelled.
+    """
+
+    def __init__(self, crawler):
+        self.crawler = crawler
+        self.stats = crawler.stats
+        self.high_water = crawler.settings.getint("BACKPRESSURE_HIGH_WATER")
+        self.low_water = crawler.settings.getint("BACKPRESSURE_LOW_WATER")
+        self.interval = crawler.settings.getfloat("BACKPRESSURE_CHECK_INTERVAL")
+        if self.low_water >= self.high_water:
+            raise NotConfigured(
+                "BACKPRESSURE_LOW_WATER must be lower than BACKPRESSURE_HIGH_WATER"
+            )
+
+        self.paused_since = None
+        self.checking_task = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("BACKPRESSURE_ENABLED"):
+            raise NotConfigured
+
+        ext = cls(crawler)
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        return ext
+
+    def spider_opened(self, spider):
+        self.stats.set_value("backpressure/high_water", self.high_water)
+        self.stats.set_value("backpressure/low_water", self.low_water)
+        self.checking_task = task.LoopingCall(self.check)
+        self.checking_task.start(self.interval, now=False)
+
+    def spider_closed(self, spider):
+        if self.checking_task and self.checking_task.running:
+            self.checking_task.stop()
+        if self.paused_since is not None:
+            self._resume()
+
+    def pending_items(self) -> int:
+        """Queue depth of the conversion stage: items still in the item pipelines,
+        plus responses waiting to be parsed or whose items are not all processed yet.
+
+        :return: pending items and responses
+        :rtype: int
+        """
+        slot = self.crawler.engine.scraper.slot
+        if slot is None:
+            return 0
+        return slot.itemproc_size + len(slot.active)
+
+    def check(self):
+        pending = self.pending_items()
+        self.stats.set_value("backpressure/pending_items", pending)
+        self.stats.max_value("backpressure/pending_items_max", pending)
+
+        if self.paused_since is None and pending >= self.high_water:
+            logging.debug(
+                "Backpressure: {} pending items, scheduling paused.".format(pending)
+            )
+            pause_engine(self.crawler, reason="backpressure")
+            self.paused_since = time.monotonic()
+            self.stats.inc_value("backpressure/pauses")
+        elif self.paused_since is not None and pending <= self.low_water:
+            logging.debug(
+                "Backpressure: {} pending items, scheduling resumed.".format(pending)
+            )
+            self._resume()
+
+    def _resume(self):
+        resumed = unpause_engine(self.crawler, reason="backpressure")
+        self.stats.inc_value(
+            "backpressure/paused_seconds", time.monotonic() - self.paused_since
+        )
+        self.paused_since = None
+        # do not wait for the next heartbeat of the engine
+        if resumed and self.crawler.engine.slot is not None:
+            self.crawler.engine.slot.nextcall.schedule()
+
+
+class MemoryTelemetry(object):
+    """Follow the memory of long crawls: the resident set size (RSS) is sampled every
+    MEMORY_TELEMETRY_INTERVAL seconds and, with MEMORY_TELEMETRY_TRACEMALLOC, a
+    tracemalloc snapshot is taken every MEMORY_TELEMETRY_SNAPSHOT_ITEMS items or
+    MEMORY_TELEMETRY_SNAPSHOT_INTERVAL seconds.
+
+    Samples and snapshots (top allocation sites and growth since the previous
+    snapshot) are written as JSON lines to MEMORY_TELEMETRY_FILE. A summary is logged
+    when the spider is closed.
+    """
+
+    def __init__(self, crawler):
+        self.crawler = crawler
+        self.stats = crawler.stats
+        settings = crawler.settings
+        self.interval = settings.getfloat("MEMORY_TELEMETRY_INTERVAL")
+        self.use_tracemalloc = settings.getbool("MEMORY_TELEMETRY_TRACEMALLOC")
+        self.snapshot_items = settings.getint("MEMORY_TELEMETRY_SNAPSHOT_ITEMS")
+        self.snapshot_interval = settings.getfloat("MEMORY_TELEMETRY_SNAPSHOT_INTERVAL")
+        self.frames = max(1, settings.getint("MEMORY_TELEMETRY_FRAMES"))
+        self.top = settings.getint("MEMORY_TELEMETRY_TOP")
+        self.file_pattern = settings.get("MEMORY_TELEMETRY_FILE")
+
+        self.start_time = None
+        self.items = 0
+        self.rss_start = None
+        self.first_snapshot = None
+        self.last_snapshot = None
+        self.last_snapshot_time = None
+        self.out_file = None
+        self.sampling_task = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("MEMORY_TELEMETRY_ENABLED"):
+            raise NotConfigured
+
+        ext = cls(crawler)
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        crawler.signals.connect(ext.item_scraped, signal=signals.item_scraped)
+        return ext
+
+    @staticmethod
+    def current_rss() -> int:
+        """Current resident set size of the process, read from /proc on Linux. Falls
+        back to the peak RSS elsewhere.
+
+        :return: RSS in bytes, or None if it can not be read
+        :rtype: int
+        """
+        try:
+            with open("/proc/self/statm") as statm:
+                return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError, AttributeError):
+            pass
+
+        try:
+            import resource
+        except ImportError:
+            return None
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # kilobytes on Linux, bytes on macOS
+        return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+    def spider_opened(self, spider):
+        self.start_time = time.monotonic()
+        out_path = Path(
+            self.file_pattern.format(spider=getattr(spider, "output_name", spider.name))
+        )
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        self.out_file = out_path.open("w", encoding="UTF8")
+        logging.info("Memory telemetry written to {}".format(out_path))
+
+        if self.use_tracemalloc:
+            import tracemalloc
+
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.frames)
+            self.snapshot()
+
+        self.rss_start = self.sample()
+        self.sampling_task = task.LoopingCall(self.tick)
+        self.sampling_task.start(self.interval, now=False)
+
+    def spider_closed(self, spider):
+        if self.sampling_task and self.sampling_task.running:
+            self.sampling_task.stop()
+
+        rss_end = self.sample()
+        growth = []
+        if self.use_tracemalloc:
+            import tracemalloc
+
+            self.snapshot()
+            growth = self.last_snapshot.compare_to(self.first_snapshot, self.key_type)
+            tracemalloc.stop()
+        self.out_file.close()
+
+        logging.info(
+            "Memory: RSS {} at start, {} at end, {} at peak.".format(
+                self._mib(self.rss_start),
+                self._mib(rss_end),
+                self._mib(self.stats.get_value("memory_telemetry/rss_max")),
+            )
+        )
+        # differences are sorted by absolute value: keep the growing sites only
+        growing = [stat for stat in growth if stat.size_diff > 0]
+        for stat in growing[: min(self.top, 5)]:
+            logging.info(
+                "Memory growth since start: {:+.1f} KiB ({:+d} blocks) at {}".format(
+                    stat.size_diff / 1024, stat.count_diff, stat.traceback
+                )
+            )
+
+    def item_scraped(self, item, response, spider):
+        self.items += 1
+        if (
+            self.use_tracemalloc
+            and self.snapshot_items
+            and self.items % self.snapshot_items == 0
+        ):
+            self.snapshot()
+
+    @property
+    def key_type(self) -> str:
+        return "traceback" if self.frames > 1 else "lineno"
+
+    def tick(self):
+        self.sample()
+        if (
+            self.use_tracemalloc
+            and self.snapshot_interval
+            and time.monotonic() - self.last_snapshot_time >= self.snapshot_interval
+        ):
+            self.snapshot()
+
+    def sample(self) -> int:
+        """Record the current RSS.
+
+        :return: RSS in bytes
+        :rtype: int
+        """
+        rss = self.current_rss()
+        if rss is not None:
+            self.stats.set_value("memory_telemetry/rss", rss)
+            self.stats.max_value("memory_telemetry/rss_max", rss)
+        self._write({"type": "rss", "rss": rss})
+        return rss
+
+    def snapshot(self):
+        """Take a tracemalloc snapshot and record its top allocation sites and the
+        growth since the previous snapshot.
+        """
+        import tracemalloc
+
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            (
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+                tracemalloc.Filter(False, "<unknown>"),
+            )
+        )
+        record = {
+            "type": "snapshot",
+            "traced": tracemalloc.get_traced_memory()[0],
+            "top": [
+                self._stat_as_dict(stat)
+                for stat in snapshot.statistics(self.key_type)[: self.top]
+            ],
+        }
+        if self.last_snapshot is not None:
+            record["growth"] = [
+                self._stat_as_dict(stat)
+                for stat in snapshot.compare_to(self.last_snapshot, self.key_type)[
+                    : self.top
+                ]
+            ]
+        self._write(record)
+        self.stats.inc_value("memory_telemetry/snapshots")
+
+        if self.first_snapshot is None:
+            self.first_snapshot = snapshot
+        self.last_snapshot = snapshot
+        self.last_snapshot_time = time.monotonic()
+
+    @staticmethod
+    def _stat_as_dict(stat) -> dict:
+        """Statistic or statistic difference of a tracemalloc snapshot as a dict."""
+        out = {
+            "where": [
+                "{}:{}".format(frame.filename, frame.lineno) for frame in stat.traceback
+            ],
+            "size": stat.size,
+            "count": stat.count,
+        }
+        if hasattr(stat, "size_diff"):
+            out["size_diff"] = stat.size_diff
+            out["count_diff"] = stat.count_diff
+        return out
+
+    @staticmethod
+    def _mib(value: int) -> str:
+        return "?" if value is None else "{:.1f} MiB".format(value / 1024 / 1024)
+
+    def _write(self, record: dict):
+        record["elapsed"] = round(time.monotonic() - self.start_time, 3)
+        record["items"] = self.items
+        self.out_file.write(json.dumps(record) + "\n")
+        self.out_file.flush()
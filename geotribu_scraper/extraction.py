@@ -0,0 +1,264 @@
+#! python3  # noqa: E265
+
+"""
+    Extraction of the contents fields from the website pages.
+
+    Functions take a response and return the item fields as a plain dictionary, so
+    they can run either in the spider callbacks or in the worker processes of
+    `geotribu_scraper.parse_pool`.
+"""
+
+# #############################################################################
+# ########## Libraries #############
+# ##################################
+
+# Standard library
+import logging
+
+# 3rd party library
+from scrapy.http.response import Response
+from scrapy.selector import Selector
+
+# #############################################################################
+# ########## Globals ###############
+# ##################################
+
+# version of the extraction functions: to be increased whenever a change alters the
+# extracted fields, so the results stored in the parse cache are discarded
+EXTRACTION_VERSION = 1
+
+# #############################################################################
+# ########## Functions #############
+# ##################################
+
+
+def extract_rdp_intro(rdp: Selector) -> str:
+    """Introduction of a revue de presse: paragraphs before the first news.
+
+    :param Selector rdp: revue de presse content
+
+    :return: introduction HTML
+    :rtype: str
+    """
+    intro = ""
+    for i in rdp.css("p"):
+        if not i.css("p.directNews"):
+            intro += i.get()
+        else:
+            break
+    return intro
+
+
+def extract_rdp_news(rdp: Selector) -> dict:
+    """News of a revue de presse, grouped by section.
+
+    :param Selector rdp: revue de presse content
+
+    :return: lists of news (title, image, paragraphs) by section HTML
+    :rtype: dict
+    """
+    dico_news_by_section = {}
+    start_section = "Non classés"
+    for i in rdp.css("div.news-details, p.typeNews"):
+        if i.css("p.typeNews"):
+            logging.info("Section spotted: {}".format(i.get()))
+            active_section = i.get()
+            dico_news_by_section.setdefault(active_section, [])
+        elif i.css("div.news-details"):
+            dico_news_by_section.get(active_section).append(
+                (
+                    i.css("span.news-title::text").get(),
+                    i.css("img").get(),
+                    i.css("p, iframe, li").getall(),
+                )
+            )
+        else:
+            dico_news_by_section.get(start_section).append(i.get())
+
+    return dico_news_by_section
+
+
+def extract_rdp(response: Response) -> dict:
+    """Fields of a revue de presse page.
+
+    :param Response response: HTTP response of the revue de presse page
+
+    :return: GeoRdpItem fields
+    :rtype: dict
+    """
+    logging.info(
+        "Start parsing RDP: {}".format(response.css("title::text").getall()[0])
+    )
+    item = {}
+
+    # contenu de la rdp
+    rdp = response.css("article")[0]
+
+    # titre
+    rdp_title_section = rdp.css("div.title-and-meta")
+    rdp_title = rdp_title_section.css("h2.node__title a::text").get()
+    item["title"] = rdp_title
+
+    # type d'article - jusqu'en 2013, les revues de presse étaient des articles
+    # comme les autres et n'étaient pas aussi structurées
+    if "revue de presse" in rdp_title.lower():
+        item["kind"] = "rdp"
+    else:
+        item["kind"] = "art"
+
+    # url - ne contient pas forcément l'identifiant du noeud de contenu Drupal.
+    # Par ex les contenus avec URL personnalisée : /geotribu_reborn/GeoRDP/20150220
+    rdp_rel_url = rdp_title_section.css("h2.node__title a::attr(href)").get()
+    item["url_full"] = rdp_rel_url
+
+    # shortlink - lien court contenant l'identifiant du noeud de contenu Drupal
+    shortlink = response.xpath('//link[@rel="shortlink"]')
+    if shortlink:
+        short_url_content = shortlink.attrib.get("href")
+        if "node" in short_url_content:
+            item["drupal_node"] = int(short_url_content.split("/")[-1])
+
+    # date de publication
+    rdp_date = rdp.css("div.date")
+    rdp_date_day = rdp_date.css("span.day::text").get()
+    rdp_date_month = rdp_date.css("span.month::text").get()
+    rdp_date_year = rdp_date.css("span.year::text").get()
+    item["published_date"] = (rdp_date_day, rdp_date_month, rdp_date_year)
+
+    # tags
+    item["tags"] = rdp_title_section.css("span.taxonomy-tag a::text").getall()
+
+    # intro, sections and news
+    item["intro"] = extract_rdp_intro(rdp)
+    item["news_sections"] = rdp.css("p.typeNews::text").getall()
+    item["news_details"] = extract_rdp_news(rdp)
+
+    # images URLS (converted into absolute)
+    item["image_urls"] = [
+        response.urljoin(i) for i in rdp.css("img").xpath("@src").getall()
+    ]
+
+    # pseudo author to fit others crawlers structure
+    item["author"] = {
+        "thumbnail": "?",
+        "name": "Geotribu",
+        "description": "",
+    }
+
+    return item
+
+
+def extract_article(response: Response) -> dict:
+    """Fields of an article or tutoriel page.
+
+    :param Response response: HTTP response of the article page
+
+    :return: ArticleItem fields
+    :rtype: dict
+    """
+    logging.info(
+        "Start parsing ARTICLE: {}".format(response.css("title::text").getall()[0])
+    )
+    item = {}
+
+    # contenu de la art
+    art = response.css("article")[0]
+
+    # titre
+    art_title_section = art.css("div.title-and-meta")
+    art_title = art_title_section.css("h2.node__title a::text").get()
+    item["title"] = art_title
+
+    # type d'article - jusqu'en 2013, les revues de presse étaient des articles
+    # comme les autres et n'étaient pas aussi structurées
+    if "revue de presse" in art_title.lower():
+        item["kind"] = "rdp"
+    else:
+        item["kind"] = "art"
+
+    # url
+    art_rel_url = art_title_section.css("h2.node__title a::attr(href)").get()
+    item["url_full"] = art_rel_url
+
+    # shortlink - lien court contenant l'identifiant du noeud de contenu Drupal
+    shortlink = response.xpath('//link[@rel="shortlink"]')
+    if shortlink:
+        short_url_content = shortlink.attrib.get("href")
+        if "node" in short_url_content:
+            item["drupal_node"] = int(short_url_content.split("/")[-1])
+
+    # date de publication
+    art_date = art.css("div.date")
+    art_date_day = art_date.css("span.day::text").get()
+    art_date_month = art_date.css("span.month::text").get()
+    art_date_year = art_date.css("span.year::text").get()
+    item["published_date"] = (art_date_day, art_date_month, art_date_year)
+
+    # tags
+    item["tags"] = art_title_section.css("span.taxonomy-tag a::text").getall()
+
+    # récupération de l'intro
+    try:
+        item["intro"] = art.css("div.field-name-field-introduction").getall()[0]
+    except IndexError:
+        logging.debug("Article doesn't have introduction.")
+        item["intro"] = None
+
+    # corps
+    art_raw_body = art.css("div.field-name-body")
+    art_out_body = []
+    for el in art_raw_body:
+        art_out_body.append(el.get())
+
+    item["body"] = art_out_body
+
+    # images URLS (converted into absolute)
+    item["image_urls"] = [
+        response.urljoin(i) for i in art.css("img").xpath("@src").getall()
+    ]
+
+    # author
+    author_block = art.css("div.view.view-about-author")
+    if author_block:
+        # author thumbnail
+        thumbnail = (
+            art.css("div.view.view-about-author").css("img").xpath("@src").getall()
+        )
+        if thumbnail and len(thumbnail):
+            thumbnail = (
+                art.css("div.view.view-about-author")
+                .css("img")
+                .xpath("@src")
+                .getall()[0]
+            )
+        else:
+            thumbnail = "?"
+
+        # author name
+        name = (
+            author_block.css("div.views-field.views-field-field-nom-complet")
+            .css("div.field-content::text")
+            .getall()
+        )
+        if name and len(name):
+            author_block.css("div.views-field.views-field-field-nom-complet").css(
+                "div.field-content::text"
+            ).getall()[0]
+        else:
+            name = "?"
+
+        item["author"] = {
+            "thumbnail": thumbnail,
+            "name": name[0],
+            "description": author_block.css(
+                "div.views-field.views-field-field-description p"
+            ).getall(),
+        }
+    else:
+        item["author"] = {
+            "thumbnail": "?",
+            "name": art_title_section.css("span.username a::text").get(),
+            "description": "",
+        }
+
+    return item
@@ -0,0 +1,206 @@
+#! python3  # noqa: E265
+
+"""
+    Fast YAML front-matter serializer, dedicated to the fixed schema of the
+    generated markdown files:
+
+    authors, categories, date, description, image, legacy.node, license, robots,
+    tags, title.
+
+    Scalars are written plain when it is safe, else single or double quoted like
+    PyYAML does. Any unexpected value falls back to PyYAML `safe_dump`.
+"""
+
+# #############################################################################
+# ########## Libraries #############
+# ##################################
+
+# Standard library
+import re
+
+# #############################################################################
+# ########## Globals ###############
+# ##################################
+
+# keys sorted like safe_dump does, with the expected kind of value
+FRONTMATTER_SCHEMA = (
+    ("authors", list),
+    ("categories", list),
+    ("date", str),
+    ("description", str),
+    ("image", str),
+    ("legacy", dict),
+    ("license", str),
+    ("robots", str),
+    ("tags", list),
+    ("title", str),
+)
+
+# characters which can only be written in a double-quoted scalar: non printable
+# ones, line breaks and BOM
+RE_DOUBLE_QUOTED_CHARS = re.compile(
+    "[^\x20-\x7e\xa0-\ud7ff\ue000-\ufffd\U00010000-\U0010ffff]|[\x85\u2028\u2029\ufeff]"
+)
+# characters which can not start a plain scalar (indicators)
+PLAIN_FORBIDDEN_FIRST_CHARS = frozenset("-?:,[]{}#&*!|>'\"%@`")
+
+ESCAPE_REPLACEMENTS = {
+    "\0": "0",
+    "\x07": "a",
+    "\x08": "b",
+    "\x09": "t",
+    "\x0a": "n",
+    "\x0b": "v",
+    "\x0c": "f",
+    "\x0d": "r",
+    "\x1b": "e",
+    '"': '"',
+    "\\": "\\",
+    "\x85": "N",
+    "\u2028": "L",
+    "\u2029": "P",
+}
+RE_DOUBLE_QUOTED_ESCAPES = re.compile(
+    '["\\\\]|[^\x20-\x7e\xa0-\ud7ff\ue000-\ufffd\U00010000-\U0010ffff]|[\x85\u2028\u2029\ufeff]'
+)
+
+# PyYAML resolver, loaded on first use
+_resolver = None
+
+
+# #############################################################################
+# ########## Functions #############
+# ##################################
+
+
+def _resolves_to_str(value: str) -> bool:
+    """Check that a plain scalar would be loaded back as a string (and not as a
+    boolean, null, number, timestamp...).
+
+    :param str value: scalar to check
+
+    :return: True if the YAML SafeLoader resolves it as a string
+    :rtype: bool
+    """
+    global _resolver
+    if _resolver is None:
+        from yaml.nodes import ScalarNode
+        from yaml.resolver import Resolver
+
+        _resolver = (Resolver(), ScalarNode)
+
+    resolver, node_class = _resolver
+    return resolver.resolve(node_class, value, (True, False)) == (
+        "tag:yaml.org,2002:str"
+    )
+
+
+def _escape_char(match: re.Match) -> str:
+    char = match.group(0)
+    if char in ESCAPE_REPLACEMENTS:
+        return "\\" + ESCAPE_REPLACEMENTS.get(char)
+
+    code = ord(char)
+    if code <= 0xFF:
+        return "\\x{:02X}".format(code)
+    elif code <= 0xFFFF:
+        return "\\u{:04X}".format(code)
+    return "\\U{:08X}".format(code)
+
+
+def format_scalar(value: str) -> str:
+    """Format a string as a YAML scalar: plain if possible, else single-quoted, else
+    double-quoted with escapes.
+
+    :param str value: string to format
+
+    :return: YAML scalar
+    :rtype: str
+    """
+    if RE_DOUBLE_QUOTED_CHARS.search(value):
+        return '"{}"'.format(RE_DOUBLE_QUOTED_ESCAPES.sub(_escape_char, value))
+
+    if (
+        value
+        and value[0] not in PLAIN_FORBIDDEN_FIRST_CHARS
+        and value[0] != " "
+        and value[-1] not in " :"
+        and ": " not in value
+        and " #" not in value
+        and not value.startswith(("---", "..."))
+        and _resolves_to_str(value)
+    ):
+        return value
+
+    return "'{}'".format(value.replace("'", "''"))
+
+
+def _format_value(value) -> str:
+    """Format a scalar value of the schema: string, integer or None.
+
+    :raises TypeError: for any other type
+
+    :return: YAML scalar
+    :rtype: str
+    """
+    if isinstance(value, str):
+        return format_scalar(value)
+    elif value is None:
+        return "null"
+    elif isinstance(value, int) and not isinstance(value, bool):
+        return str(value)
+    raise TypeError("Unexpected value: {!r}".format(value))
+
+
+def _dump_with_template(frontmatter: dict) -> str:
+    """Serialize the front-matter following the fixed schema.
+
+    :raises TypeError: if the front-matter does not fit the schema
+    """
+    if len(frontmatter) != len(FRONTMATTER_SCHEMA):
+        raise TypeError("Unexpected keys: {}".format(sorted(frontmatter)))
+
+    lines = ["---"]
+    for key, expected_type in FRONTMATTER_SCHEMA:
+        value = frontmatter[key]
+        if not isinstance(value, expected_type):
+            raise TypeError("Unexpected value for {}: {!r}".format(key, value))
+
+        if expected_type is list:
+            if value:
+                lines.append("{}:".format(key))
+                lines.extend("- {}".format(_format_value(v)) for v in value)
+            else:
+                lines.append("{}: []".format(key))
+        elif expected_type is dict:
+            if set(value) != {"node"}:
+                raise TypeError("Unexpected value for {}: {!r}".format(key, value))
+            lines.append("{}:\n    node: {}".format(key, _format_value(value["node"])))
+        else:
+            lines.append("{}: {}".format(key, _format_value(value)))
+
+    lines.append("")
+    return "\n".join(lines)
+
+
+def dump_frontmatter(frontmatter: dict) -> str:
+    """Serialize the YAML front-matter of a generated markdown file, with the
+    document start marker. Falls back to PyYAML for unexpected values.
+
+    :param dict frontmatter: front-matter fields
+
+    :return: YAML front-matter ready to be written
+    :rtype: str
+    """
+    try:
+        return _dump_with_template(frontmatter)
+    except (KeyError, TypeError):
+        from yaml import safe_dump
+
+        return safe_dump(
+            data=frontmatter,
+            allow_unicode=True,
+            explicit_start=True,
+            indent=4,
+            width=1000,
+        )
@@ -0,0 +1,236 @@
+#! python3  # noqa: E265
+
+"""
+    Export of the rendered markdown documents straight into a git repository (bare or
+    not), through a `git fast-import` stream, instead of writing loose files to be
+    added and committed afterwards.
+
+    Documents are streamed as blobs when they are rendered; commits are written once
+    the spider is closed, either one per publication date (backdated, in date order)
+    or a single one. Documents identical to the version on the branch are skipped, so
+    a new run only commits what changed.
+"""
+
+# #############################################################################
+# ########## Libraries #############
+# ##################################
+
+# Standard library
+import calendar
+import logging
+import subprocess
+import time
+from datetime import datetime
+from hashlib import sha1
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+# #############################################################################
+# ########## Functions #############
+# ##################################
+
+
+def git_blob_hash(data: bytes) -> str:
+    """Object name of a blob in git, to compare a content with the repository without
+    writing it.
+
+    :param bytes data: blob content
+
+    :return: SHA-1 hexadecimal digest
+    :rtype: str
+    """
+    return sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def quote_path(path: str) -> str:
+    """Quote a path for a fast-import command, only if needed (C-style).
+
+    :param str path: path in the repository
+
+    :return: path as written in the stream
+    :rtype: str
+    """
+    if not path.startswith('"') and "\n" not in path:
+        return path
+    return '"{}"'.format(
+        path.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    )
+
+
+# #############################################################################
+# ########## Classes ###############
+# ##################################
+class GitFastImport(object):
+    """Commit documents into a branch of a git repository with `git fast-import`.
+    The repository is created (bare) if it does not exist.
+
+    :param Path repository: path to the git repository
+    :param str branch: branch to commit to, created if needed
+    :param str prefix: folder of the documents in the repository. Defaults to "".
+    :param str author: author and committer, as "Name <email>"
+    :param bool backdate: one commit per publication date, dated of it, else a single
+        commit of the current date. Defaults to True.
+    """
+
+    def __init__(
+        self,
+        repository: Path,
+        branch: str,
+        prefix: str = "",
+        author: str = "Geotribu <geotribu@gmail.com>",
+        backdate: bool = True,
+    ):
+        self.repository = Path(repository)
+        self.branch = branch
+        self.ref = "refs/heads/{}".format(branch)
+        self.prefix = prefix.strip("/")
+        self.author = author
+        self.backdate = backdate
+
+        if not self.repository.exists():
+            self.repository.parent.mkdir(parents=True, exist_ok=True)
+            self.git("init", "--bare", "--quiet", str(self.repository), cwd=False)
+            logging.info("Git export: repository created: {}".format(self.repository))
+
+        # blobs of the documents on the branch, to skip the unchanged ones
+        self.tip = self.git("rev-parse", "--verify", "--quiet", self.ref + "^{commit}")
+        self.tree: Dict[str, str] = {}
+        if self.tip:
+            for entry in self.git("ls-tree", "-r", "-z", self.ref).split("\0"):
+                if entry:
+                    meta, path = entry.split("\t", 1)
+                    self.tree[path] = meta.split()[2]
+
+        self.documents: Dict[str, Tuple[Optional[datetime], int]] = {}
+        self.marks = 0
+        self.count_commits = 0
+        self.process = subprocess.Popen(
+            ["git", "-C", str(self.repository), "fast-import", "--quiet", "--done"],
+            stdin=subprocess.PIPE,
+        )
+        self.stream = self.process.stdin
+
+    @classmethod
+    def from_settings(cls, settings, spider_name: str):
+        return cls(
+            repository=Path(settings.get("GIT_EXPORT_REPOSITORY")),
+            branch=settings.get("GIT_EXPORT_BRANCH").format(spider=spider_name),
+            prefix=settings.get("GIT_EXPORT_PREFIX", ""),
+            author=settings.get("GIT_EXPORT_AUTHOR"),
+            backdate=settings.getbool("GIT_EXPORT_BACKDATE", True),
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def git(self, *args, cwd: bool = True) -> str:
+        """Run a git command and return its output, empty if it failed.
+
+        :param args: command arguments
+        :param bool cwd: run in the repository. Defaults to True.
+
+        :return: standard output
+        :rtype: str
+        """
+        command = ["git", "-C", str(self.repository)] if cwd else ["git"]
+        result = subprocess.run(
+            command + list(args), capture_output=True, text=True, encoding="UTF8"
+        )
+        return result.stdout.strip("\n") if result.returncode == 0 else ""
+
+    def write_data(self, data: bytes):
+        self.stream.write(b"data %d\n" % len(data))
+        self.stream.write(data)
+        self.stream.write(b"\n")
+
+    def add(self, path: str, content: bytes, date: datetime = None) -> Optional[str]:
+        """Stream a document, committed when the export is closed. A document added
+        again with the same path replaces the previous one.
+
+        :param str path: path relative to the prefix folder
+        :param bytes content: document content
+        :param datetime date: publication date. Defaults to None (current date).
+
+        :return: "added", "changed" or None if the branch already has this content
+        :rtype: Optional[str]
+        """
+        path = "{}/{}".format(self.prefix, path) if self.prefix else path
+        previous = self.tree.get(path)
+        if previous == git_blob_hash(content):
+            self.documents.pop(path, None)
+            return None
+
+        self.marks += 1
+        self.stream.write(b"blob\nmark :%d\n" % self.marks)
+        self.write_data(content)
+        self.documents[path] = (
+            date if isinstance(date, datetime) else None,
+            self.marks,
+        )
+        return "changed" if previous else "added"
+
+    def write_commit(self, paths: list, timestamp: int, message: str):
+        """Commit documents streamed before, on top of the branch.
+
+        :param list paths: paths of the documents
+        :param int timestamp: author and committer date (UNIX time, UTC)
+        :param str message: commit message
+        """
+        identity = "{} {} +0000".format(self.author, timestamp).encode("UTF8")
+        self.stream.write(b"commit %s\n" % self.ref.encode("UTF8"))
+        self.stream.write(b"author %s\ncommitter %s\n" % (identity, identity))
+        self.write_data(message.encode("UTF8"))
+        if self.count_commits == 0 and self.tip:
+            self.stream.write(b"from %s^0\n" % self.ref.encode("UTF8"))
+        for path in paths:
+            self.stream.write(
+                "M 100644 :{} {}\n".format(
+                    self.documents.get(path)[1], quote_path(path)
+                ).encode("UTF8")
+            )
+        self.stream.write(b"\n")
+        self.count_commits += 1
+
+    def close(self):
+        """Write the commits and wait for fast-import to update the branch.
+
+        :raises RuntimeError: if fast-import failed
+        """
+        now = int(time.time())
+        if self.backdate:
+            by_date: Dict[Optional[datetime], list] = {}
+            for path, (date, _) in self.documents.items():
+                by_date.setdefault(date and date.date(), []).append(path)
+            # documents without a publication date come last, of the current date
+            for date in sorted(by_date, key=lambda d: (d is None, d)):
+                paths = sorted(by_date.get(date))
+                self.write_commit(
+                    paths=paths,
+                    timestamp=calendar.timegm(date.timetuple()) if date else now,
+                    message="Import legacy contents published on {}\n\n{}\n".format(
+                        date or "an unknown date", "\n".join(paths)
+                    ),
+                )
+        elif self.documents:
+            self.write_commit(
+                paths=sorted(self.documents),
+                timestamp=now,
+                message="Import {} legacy contents\n".format(len(self.documents)),
+            )
+
+        self.stream.write(b"done\n")
+        self.stream.close()
+        if self.process.wait() != 0:
+            raise RuntimeError(
+                "git fast-import failed ({}) on {}".format(
+                    self.process.returncode, self.repository
+                )
+            )
+        logging.info(
+            "Git export: {} documents in {} commits on {} of {}".format(
+                len(self.documents), self.count_commits, self.branch, self.repository
+            )
+        )
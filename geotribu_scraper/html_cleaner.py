@@ -0,0 +1,97 @@
+#! python3  # noqa: E265
+
+"""
+    Pre-conversion cleaning of legacy Drupal HTML fragments with lxml, to shrink
+    the tree walked by markdownify.
+"""
+
+# #############################################################################
+# ########## Libraries #############
+# ##################################
+
+# Standard library
+from html import escape
+
+# 3rd party
+from lxml import etree
+from lxml import html as lxml_html
+
+# #############################################################################
+# ########## Globals ###############
+# ##################################
+
+# elements removed with their content
+NOISE_TAGS = ("script", "style", "noscript", "link", "meta", "object", "embed")
+
+# elements unwrapped: their content is kept, not the element itself
+WRAPPER_TAGS = ("div", "span", "font", "center")
+
+# elements removed when they have neither text nor children
+EMPTY_REMOVABLE_TAGS = frozenset(
+    ("p", "div", "span", "font", "strong", "b", "em", "i", "u", "a")
+)
+
+# attributes removed from every element
+NOISE_ATTRIBUTES = ("style", "class", "id", "align", "width", "height")
+
+
+# #############################################################################
+# ########## Functions #############
+# ##################################
+
+
+def _is_tracking_pixel(element: lxml_html.HtmlElement) -> bool:
+    return element.get("width") in ("0", "1") and element.get("height") in ("0", "1")
+
+
+def clean_html(in_html: str) -> str:
+    """Remove noise from an HTML fragment before its conversion to markdown:
+    scripts, styles, comments, tracking pixels, presentational attributes, empty
+    elements and wrapper divs/spans. Iframes are kept as they are.
+
+    :param str in_html: HTML fragment
+
+    :return: cleaned HTML fragment
+    :rtype: str
+    """
+    # standalone iframes are kept raw by the pipeline
+    if not in_html or in_html.startswith("<iframe "):
+        return in_html
+
+    try:
+        root = lxml_html.fragment_fromstring(in_html, create_parent="div")
+    except etree.ParserError:
+        return in_html
+
+    for comment in root.xpath("//comment() | //processing-instruction()"):
+        comment.drop_tree()
+
+    for element in list(root.iter(*NOISE_TAGS)):
+        element.drop_tree()
+
+    for element in list(root.iter("img")):
+        if _is_tracking_pixel(element):
+            element.drop_tree()
+
+    for element in root.iter(etree.Element):
+        if element.tag == "iframe":
+            continue
+        for attribute in list(element.attrib):
+            if attribute in NOISE_ATTRIBUTES or attribute.startswith(("on", "data-")):
+                del element.attrib[attribute]
+
+    # bottom-up so that wrappers emptied by the removal of their children go too
+    for element in reversed(list(root.iter(*EMPTY_REMOVABLE_TAGS))):
+        if element is root:
+            continue
+        if len(element) == 0 and not (element.text or "").strip():
+            element.drop_tree()
+
+    for element in list(root.iter(*WRAPPER_TAGS)):
+        if element is not root:
+            element.drop_tag()
+
+    out_html = escape(root.text or "", quote=False)
+    for child in root:
+        out_html += lxml_html.tostring(child, encoding="unicode", with_tail=True)
+    return out_html
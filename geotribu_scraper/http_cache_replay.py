@@ -0,0 +1,115 @@
+#! python3  # noqa: E265
+
+"""
+    Offline replay of the Scrapy HTTP cache (filesystem storage): cached pages are
+    sent straight to the spider callbacks, without network nor download delay.
+
+    The replay can be split across several processes, each one handling a shard of
+    the cache entries:
+
+    .. code-block:: bash
+
+        python -m geotribu_scraper.http_cache_replay geotribu_rdp --processes 4
+"""
+
+# #############################################################################
+# ########## Libraries #############
+# ##################################
+
+# Standard library
+import argparse
+import gzip
+import logging
+import pickle
+import subprocess
+import sys
+from pathlib import Path
+
+# 3rd party library
+from scrapy.linkextractors import IGNORED_EXTENSIONS
+from scrapy.utils.url import url_has_any_extension
+
+# #############################################################################
+# ########## Functions #############
+# ##################################
+
+
+def iter_cached_urls(
+    cache_dir: Path,
+    spider_name: str,
+    use_gzip: bool = True,
+    shard: int = 0,
+    shards: int = 1,
+):
+    """Iterate over the URLs of the pages stored in the filesystem HTTP cache of a
+    spider: successful GET requests, without media files nor robots.txt.
+
+    :param Path cache_dir: HTTP cache folder (HTTPCACHE_DIR resolved)
+    :param str spider_name: name of the spider whose cache is read
+    :param bool use_gzip: cache entries are gzipped (HTTPCACHE_GZIP)
+    :param int shard: index of the shard to read, from 0 to shards - 1
+    :param int shards: count of shards the entries are split into
+
+    :return: URLs, in a stable order
+    :rtype: Iterator[str]
+    """
+    spider_cache_dir = Path(cache_dir) / spider_name
+    if not spider_cache_dir.is_dir():
+        logging.warning("No HTTP cache found in {}".format(spider_cache_dir))
+        return
+
+    open_func = gzip.open if use_gzip else open
+    for meta_path in sorted(spider_cache_dir.glob("*/*/pickled_meta")):
+        # entries folders are named after the request fingerprint (hexadecimal)
+        if int(meta_path.parent.name[:8], 16) % shards != shard:
+            continue
+
+        with open_func(meta_path, "rb") as meta_file:
+            metadata = pickle.load(meta_file)
+
+        url = metadata.get("url")
+        if (
+            metadata.get("method") != "GET"
+            or metadata.get("status") != 200
+            or url.endswith("/robots.txt")
+            or url_has_any_extension(url, IGNORED_EXTENSIONS)
+        ):
+            continue
+        yield url
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Replay the HTTP cache of a spider in several processes."
+    )
+    parser.add_argument("spider", help="spider name")
+    parser.add_argument("--processes", type=int, default=2)
+    parser.add_argument(
+        "-s", dest="settings", action="append", default=[], metavar="NAME=VALUE"
+    )
+    args = parser.parse_args()
+
+    common_args = ["-s", "HTTPCACHE_REPLAY_ENABLED=1"]
+    common_args += ["-s", "HTTPCACHE_REPLAY_SHARDS={}".format(args.processes)]
+    if args.processes > 1:
+        # the node alias index file can not be shared by concurrent processes
+        common_args += ["-s", "NODE_ALIAS_INDEX_ENABLED=0"]
+    for setting in args.settings:
+        common_args += ["-s", setting]
+
+    processes = [
+        subprocess.Popen(
+            [sys.executable, "-m", "scrapy", "crawl", args.spider]
+            + common_args
+            + ["-s", "HTTPCACHE_REPLAY_SHARD={}".format(shard)]
+        )
+        for shard in range(args.processes)
+    ]
+    sys.exit(max(process.wait() for process in processes))
+
+
+# #############################################################################
+# ##### Main #######################
+# ##################################
+if __name__ == "__main__":
+    main()
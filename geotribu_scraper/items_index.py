@@ -0,0 +1,298 @@
+#! python3  # noqa: E265
+
+"""
+    Random access into the JSON lines file of the scraped items (`items_<spider>.jl`),
+    through a sidecar index of the byte offset and length of each item, written along
+    by `JsonWriterPipeline`. The items file is memory-mapped: reading one item (or a
+    subset) does not load the others.
+
+    .. code-block:: bash
+
+        python -m geotribu_scraper.items_index _output/items_geotribu_rdp.jl --node 1002
+"""
+
+# #############################################################################
+# ########## Libraries #############
+# ##################################
+
+# Standard library
+import argparse
+import json
+import logging
+import mmap
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
+
+# 3rd party library
+from scrapy import Item
+
+# project
+from geotribu_scraper.items import ArticleItem, GeoRdpItem
+from geotribu_scraper.node_index import NodeAliasIndex
+
+# #############################################################################
+# ########## Globals ###############
+# ##################################
+
+# classes of the items which can be rebuilt from the file, by name
+ITEM_CLASSES = {cls.__name__: cls for cls in (ArticleItem, GeoRdpItem)}
+
+# fields yielded as tuples by the spiders, read back from JSON as lists
+TUPLE_FIELDS = ("published_date",)
+
+# #############################################################################
+# ########## Functions #############
+# ##################################
+
+
+def index_path_for(items_path: Path) -> Path:
+    """Path of the sidecar index of an items file: `<name>.jl` -> `<name>.jl.idx`.
+
+    :param Path items_path: path to the JSON lines file of the items
+
+    :return: path to the index
+    :rtype: Path
+    """
+    items_path = Path(items_path)
+    return items_path.with_name(items_path.name + ".idx")
+
+
+def index_entry(item: dict, offset: int, length: int, item_type: str = None) -> dict:
+    """Index entry of an item written into the items file.
+
+    :param dict item: item fields
+    :param int offset: position of the first byte of the item line
+    :param int length: length in bytes of the item line, line break included
+    :param str item_type: name of the item class. Defaults to None.
+
+    :return: entry of the sidecar index
+    :rtype: dict
+    """
+    return {
+        "node": item.get("drupal_node"),
+        "url": item.get("url_full"),
+        "kind": item.get("kind"),
+        "type": item_type,
+        "offset": offset,
+        "length": length,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Print items of the items file, as JSON lines."
+    )
+    parser.add_argument(
+        "items", type=Path, help="path to the items file (items_<spider>.jl)"
+    )
+    parser.add_argument("--node", type=int, action="append", help="legacy node")
+    parser.add_argument("--url", help="content URL")
+    parser.add_argument("--kind", help="content kind (art, rdp)")
+    args = parser.parse_args()
+
+    with ItemsFile(args.items) as items_file:
+        if args.url:
+            items = [items_file.get_url(args.url)]
+        else:
+            items = map(
+                items_file.read, items_file.select(nodes=args.node, kind=args.kind)
+            )
+        for item in items:
+            if item is not None:
+                print(json.dumps(item, ensure_ascii=False))
+
+
+# #############################################################################
+# ########## Classes ###############
+# ##################################
+class ItemsFile(object):
+    """Read-only access to the items file, by legacy node, URL or kind.
+
+    The sidecar index is loaded if it matches the items file, else it is rebuilt
+    with a single scan of the items file (older runs, interrupted crawl).
+
+    :param Path items_path: path to the JSON lines file of the items
+    :param Path index_path: path to the sidecar index. Defaults to the items path
+        followed by `.idx`.
+    """
+
+    def __init__(self, items_path: Path, index_path: Path = None):
+        self.items_path = Path(items_path)
+        self.index_path = Path(index_path or index_path_for(self.items_path))
+
+        self.file = self.items_path.open(mode="rb")
+        self.size = self.items_path.stat().st_size
+        # an empty file can not be memory-mapped
+        self.data = (
+            mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            if self.size
+            else b""
+        )
+
+        self.entries: List[dict] = self.load_index()
+        self.by_node: dict = {}
+        self.by_url: dict = {}
+        for entry in self.entries:
+            if entry.get("node") is not None:
+                self.by_node.setdefault(entry.get("node"), []).append(entry)
+            if entry.get("url"):
+                self.by_url.setdefault(
+                    NodeAliasIndex.url_key(entry.get("url")), []
+                ).append(entry)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.file.close()
+
+    def load_index(self) -> List[dict]:
+        """Load the sidecar index, or rebuild it if it is missing or does not match
+        the items file.
+
+        :return: index entries, in the order of the items file
+        :rtype: List[dict]
+        """
+        entries = []
+        if self.index_path.is_file():
+            with self.index_path.open(mode="r", encoding="UTF8") as in_index:
+                entries = [json.loads(line) for line in in_index if line.strip()]
+            end = entries[-1]["offset"] + entries[-1]["length"] if entries else 0
+            if end == self.size:
+                return entries
+            logging.warning(
+                "Index {} does not match {}: rebuilding it.".format(
+                    self.index_path, self.items_path
+                )
+            )
+        return self.build_index()
+
+    def build_index(self) -> List[dict]:
+        """Scan the items file to list the offset and length of each item.
+
+        :return: index entries, in the order of the items file
+        :rtype: List[dict]
+        """
+        entries = []
+        end = 0
+        while end < self.size:
+            start = end
+            end = self.data.find(b"\n", start)
+            end = self.size if end == -1 else end + 1
+            line = self.data[start:end]
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+            except ValueError:
+                # truncated last line of an interrupted crawl
+                logging.warning(
+                    "Invalid item at offset {} of {}".format(start, self.items_path)
+                )
+                continue
+
+            # type not written in the file: guessed from the specific fields
+            if "news_details" in item:
+                item_type = GeoRdpItem.__name__
+            elif "body" in item:
+                item_type = ArticleItem.__name__
+            else:
+                item_type = None
+            entries.append(index_entry(item, start, end - start, item_type))
+        return entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def read(self, entry: dict) -> dict:
+        """Decode the item of an index entry.
+
+        :param dict entry: index entry
+
+        :return: item fields
+        :rtype: dict
+        """
+        offset = entry.get("offset")
+        return json.loads(self.data[offset : offset + entry.get("length")])
+
+    def load_item(self, entry: dict) -> Item:
+        """Rebuild the Scrapy item of an index entry, to convert it again through the
+        pipelines: the tuples turned into lists by JSON (`TUPLE_FIELDS`) are restored.
+        Only possible for items written with their type.
+
+        :param dict entry: index entry
+
+        :return: GeoRdpItem or ArticleItem
+        :rtype: Item
+        """
+        if entry.get("type") not in ITEM_CLASSES:
+            raise ValueError(
+                "Unknown item type for node {}: {}".format(
+                    entry.get("node"), entry.get("type")
+                )
+            )
+        fields = self.read(entry)
+        for field in TUPLE_FIELDS:
+            if isinstance(fields.get(field), list):
+                fields[field] = tuple(fields.get(field))
+        return ITEM_CLASSES.get(entry.get("type"))(fields)
+
+    def get(self, node: int) -> Optional[dict]:
+        """Return the item of a legacy node, the last written if there are several.
+
+        :param int node: Drupal content node id
+
+        :return: item fields or None if not found
+        :rtype: Optional[dict]
+        """
+        entries = self.by_node.get(node)
+        return self.read(entries[-1]) if entries else None
+
+    def get_url(self, url: str) -> Optional[dict]:
+        """Return the item scraped from an URL (absolute or relative).
+
+        :param str url: content URL
+
+        :return: item fields or None if not found
+        :rtype: Optional[dict]
+        """
+        entries = self.by_url.get(NodeAliasIndex.url_key(url))
+        return self.read(entries[-1]) if entries else None
+
+    def select(
+        self, nodes: Iterable[int] = None, kind: str = None, item_type: str = None
+    ) -> Iterator[dict]:
+        """Index entries matching every given filter, in the order of the file.
+
+        :param Iterable[int] nodes: legacy nodes. Defaults to None.
+        :param str kind: content kind (art, rdp). Defaults to None.
+        :param str item_type: name of the item class. Defaults to None.
+
+        :return: matching index entries, to be read with `read` or `load_item`
+        :rtype: Iterator[dict]
+        """
+        nodes = set(nodes) if nodes is not None else None
+        for entry in self.entries:
+            if nodes is not None and entry.get("node") not in nodes:
+                continue
+            if kind is not None and entry.get("kind") != kind:
+                continue
+            if item_type is not None and entry.get("type") != item_type:
+                continue
+            yield entry
+
+    def __iter__(self) -> Iterator[dict]:
+        for entry in self.entries:
+            yield self.read(entry)
+
+
+# #############################################################################
+# ##### Main #######################
+# ##################################
+if __name__ == "__main__":
+    main()
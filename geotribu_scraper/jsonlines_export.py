@@ -0,0 +1,187 @@
+#! python3  # noqa: E265
+
+"""
+    JSON lines export of the scraped items into compressed streams (gzip, or zstd
+    with the zstandard package), written by batches and rotated by size.
+
+    Items are encoded in UTF-8 (non-ASCII characters are not escaped), with orjson
+    when it is installed.
+"""
+
+# #############################################################################
+# ########## Libraries #############
+# ##################################
+
+# Standard library
+import gzip
+import json
+import logging
+from pathlib import Path
+from typing import List
+
+# 3rd party library
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# #############################################################################
+# ########## Globals ###############
+# ##################################
+
+# file extension and default level of each compression
+COMPRESSIONS = {None: ("", None), "gzip": (".gz", 3), "zstd": (".zst", 3)}
+
+# #############################################################################
+# ########## Functions #############
+# ##################################
+
+
+def encode_line(obj) -> bytes:
+    """Encode an object into a JSON line, in UTF-8.
+
+    :param obj: object to encode. Unknown types are encoded as strings.
+
+    :return: JSON line, line break included
+    :rtype: bytes
+    """
+    return (
+        json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=str) + "\n"
+    ).encode("UTF8")
+
+
+def encode_line_orjson(obj) -> bytes:
+    """Same as `encode_line`, with orjson."""
+    return orjson.dumps(obj, default=str, option=orjson.OPT_APPEND_NEWLINE)
+
+
+# #############################################################################
+# ########## Classes ###############
+# ##################################
+class JsonLinesWriter(object):
+    """Write objects as JSON lines into compressed files. Lines are buffered and
+    written by batches of `batch_size`; a new file is started once the current one
+    reaches about `max_bytes` (compressed size). Files are named after the base path
+    followed by the part number: `items_geotribu_rdp_00001.jl.gz`...
+
+    :param Path base_path: path of the files, without part number nor extension
+    :param str compression: gzip, zstd or None. Defaults to "gzip".
+    :param int level: compression level. Defaults to 3.
+    :param int batch_size: count of lines written at once. Defaults to 100.
+    :param int max_bytes: size of the files, 0 to never rotate. Defaults to 0.
+    :param bool fast_json: use orjson if installed. Defaults to True.
+    """
+
+    def __init__(
+        self,
+        base_path: Path,
+        compression: str = "gzip",
+        level: int = None,
+        batch_size: int = 100,
+        max_bytes: int = 0,
+        fast_json: bool = True,
+    ):
+        if compression not in COMPRESSIONS:
+            raise ValueError(
+                "Unknown compression: {}. Available: {}".format(
+                    compression, ", ".join(filter(None, COMPRESSIONS))
+                )
+            )
+        if compression == "zstd":
+            try:
+                import zstandard
+            except ImportError as err:
+                raise ImportError(
+                    "zstd compression requires the zstandard package: "
+                    "pip install zstandard"
+                ) from err
+            self.zstandard = zstandard
+
+        self.base_path = Path(base_path)
+        self.compression = compression
+        self.extension, default_level = COMPRESSIONS.get(compression)
+        self.level = level if level is not None else default_level
+        self.batch_size = max(batch_size, 1)
+        self.max_bytes = max_bytes
+        self.encode = encode_line_orjson if fast_json and orjson else encode_line
+
+        self.buffer: List[bytes] = []
+        self.raw = self.stream = None
+        self.paths: List[Path] = []
+        self.count_items = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def open_part(self):
+        """Start a new file."""
+        path = self.base_path.with_name(
+            "{}_{:05d}.jl{}".format(
+                self.base_path.name, len(self.paths) + 1, self.extension
+            )
+        )
+        if not self.paths:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # numbered files of a previous export, which could have more parts. Not
+            # the files of the other exports with the same prefix (shards).
+            for previous in path.parent.glob(
+                "{}_{}.jl{}".format(self.base_path.name, "[0-9]" * 5, self.extension)
+            ):
+                previous.unlink()
+        self.paths.append(path)
+        self.raw = path.open(mode="wb")
+        if self.compression == "gzip":
+            self.stream = gzip.GzipFile(
+                filename="", mode="wb", fileobj=self.raw, compresslevel=self.level
+            )
+        elif self.compression == "zstd":
+            self.stream = self.zstandard.ZstdCompressor(level=self.level).stream_writer(
+                self.raw, closefd=False
+            )
+        else:
+            self.stream = self.raw
+        logging.debug("JSON lines export: writing {}".format(path))
+
+    def close_part(self):
+        """Finish the current file."""
+        if self.stream is not self.raw:
+            self.stream.close()
+        self.bytes_out += self.raw.tell()
+        self.raw.close()
+        self.raw = self.stream = None
+
+    def write(self, obj):
+        """Queue an object, written with the next batch.
+
+        :param obj: object to write
+        """
+        self.buffer.append(self.encode(obj))
+        self.count_items += 1
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Write the queued lines, then start a new file if the current one is big
+        enough."""
+        if not self.buffer:
+            return
+        if self.stream is None:
+            self.open_part()
+        data = b"".join(self.buffer)
+        self.buffer = []
+        self.stream.write(data)
+        self.bytes_in += len(data)
+        # the compressor keeps some data: the size is a bit late, which is fine
+        if self.max_bytes and self.raw.tell() >= self.max_bytes:
+            self.close_part()
+
+    def close(self):
+        """Write the queued lines and finish the current file."""
+        self.flush()
+        if self.stream is not None:
+            self.close_part()
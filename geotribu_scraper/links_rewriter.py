@@ -0,0 +1,129 @@
+#! python3  # noqa: E265
+
+"""
+    Rewrite of the links in the converted markdown, in a single pass over the text:
+
+    - legacy URLs with a known replacement (`URLS_BASE_REPLACEMENTS`), anywhere;
+    - images sources (`![alt](src)`), replaced with the path of the image downloaded
+      by the images pipeline when there is no known replacement.
+"""
+
+# #############################################################################
+# ########## Libraries #############
+# ##################################
+
+# Standard library
+import re
+from urllib.parse import urljoin, urlsplit
+
+# #############################################################################
+# ########## Classes ###############
+# ##################################
+
+
+class PageImages(object):
+    """Images of a page: links to the downloaded ones, and the images referenced by
+    the page as they are found during the rewrite.
+
+    :param str page_url: absolute URL of the page, to resolve relative sources
+    :param dict downloaded: link to use for each downloaded image URL
+    """
+
+    def __init__(self, page_url: str = None, downloaded: dict = None):
+        self.page_url = page_url
+        self.downloaded = {}
+        for url, link in (downloaded or {}).items():
+            self.downloaded[url] = link
+            # also match the sources without query string (e.g. ?itok=)
+            self.downloaded.setdefault(url.split("?")[0], link)
+        # referenced images: URL -> link, None if the image is missing
+        self.referenced = {}
+
+    def resolve(self, src: str) -> str:
+        """Link to the downloaded image matching a source.
+
+        :param str src: image source, absolute or relative to the page
+
+        :return: link to the downloaded image, None if it was not downloaded
+        :rtype: str
+        """
+        url = urljoin(self.page_url, src) if self.page_url else src
+        link = self.downloaded.get(url) or self.downloaded.get(url.split("?")[0])
+        self.referenced.setdefault(url, link)
+        return link
+
+
+class LinksRewriter(object):
+    """Rewrite legacy URLs and images sources of a markdown text in one pass.
+
+    :param dict replacements: replacement of each legacy URL (or URL prefix)
+    """
+
+    def __init__(self, replacements: dict):
+        self.replacements = replacements
+        # longest first, so that a URL is not shadowed by one of its prefixes
+        self.legacy_url = re.compile(
+            "|".join(
+                re.escape(url) for url in sorted(replacements, key=len, reverse=True)
+            )
+            or "(?!)"
+        )
+        # cheap tokens first: images sources, and URLs starting with one of the hosts
+        # of the legacy URLs, in which the legacy URLs are then looked for. Branches
+        # start with a literal (no named group) so that the regex engine can skip the
+        # positions which can not match.
+        hosts = sorted(
+            {"{0.scheme}://{0.netloc}".format(urlsplit(url)) for url in replacements}
+        )
+        self.tokens = re.compile(
+            r"!(\[[^\]]*\]\()([^)\s]+)|(?:{})\S*".format(
+                "|".join(map(re.escape, hosts)) or "(?!)"
+            )
+        )
+
+    def rewrite(self, text: str, page: PageImages = None) -> tuple:
+        """Replace the legacy URLs and images sources of a text.
+
+        :param str text: markdown text
+        :param PageImages page: images of the page. Defaults to None.
+
+        :return: rewritten text and count of replacements
+        :rtype: tuple
+        """
+        count = 0
+
+        def replace_legacy(match) -> str:
+            nonlocal count
+            count += 1
+            return self.replacements.get(match.group())
+
+        def replace(match) -> str:
+            nonlocal count
+            src = match.group(2)
+            if src is None:
+                # URL token
+                return self.legacy_url.sub(replace_legacy, match.group())
+
+            new_src = self.rewrite_src(src, page)
+            if new_src != src:
+                count += 1
+            return "!{}{}".format(match.group(1), new_src)
+
+        return self.tokens.sub(replace, text), count
+
+    def rewrite_src(self, src: str, page: PageImages = None) -> str:
+        """New source of an image: known replacement of the legacy URL first, else the
+        downloaded image.
+
+        :param str src: image source
+        :param PageImages page: images of the page. Defaults to None.
+
+        :return: new source, unchanged if there is none
+        :rtype: str
+        """
+        new_src = self.legacy_url.sub(
+            lambda legacy: self.replacements.get(legacy.group()), src
+        )
+        if new_src == src and page is not None:
+            new_src = page.resolve(src) or src
+        return new_src
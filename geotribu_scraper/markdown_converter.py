@@ -0,0 +1,130 @@
+#! python3  # noqa: E265
+
+"""
+    HTML to markdown converter dedicated to the legacy Drupal markup.
+
+    A single converter instance is shared by the pipelines. All the fragments of an
+    item are parsed at once, in one BeautifulSoup tree.
+"""
+
+# #############################################################################
+# ########## Libraries #############
+# ##################################
+
+# 3rd party
+from bs4 import BeautifulSoup
+from markdownify import ATX, MarkdownConverter, whitespace_re
+
+# package module
+from geotribu_scraper.html_cleaner import clean_html
+
+# #############################################################################
+# ########## Globals ###############
+# ##################################
+
+# name of the element wrapping each fragment when they are parsed together
+FRAGMENT_TAG = "geotribu-fragment"
+
+# ancestors disabling whitespace normalization and escaping of text nodes
+PREFORMATTED_TAGS = frozenset(("pre",))
+LITERAL_TAGS = frozenset(("pre", "code", "kbd", "samp"))
+
+
+# #############################################################################
+# ########## Classes ###############
+# ##################################
+class GeotribuMarkdownConverter(MarkdownConverter):
+    """Markdown converter for the tags found in the legacy contents: p, a, img,
+    iframe, ul/li, h2-h4, strong/em, br... Headings are always written in ATX style
+    and iframes nested in other elements are replaced by their text.
+    """
+
+    class Options:
+        heading_style = ATX
+
+    def convert(self, html: str) -> str:
+        """Convert an HTML string to markdown. Plain text without markup nor entity
+        (and not only made of whitespaces) skips the HTML parsing.
+
+        :param str html: HTML string
+
+        :return: markdown
+        :rtype: str
+        """
+        if (
+            isinstance(html, str)
+            and "<" not in html
+            and "&" not in html
+            and not html.isspace()
+        ):
+            return self.escape(whitespace_re.sub(" ", html))
+
+        return super().convert(html)
+
+    def convert_fragments(self, fragments: list) -> list:
+        """Convert the HTML fragments of an item, after cleaning (see
+        `geotribu_scraper.html_cleaner`), with a single parsing. Standalone iframes
+        are returned raw.
+
+        :param list fragments: HTML fragments
+
+        :return: converted fragments, in the same order
+        :rtype: list
+        """
+        wrapped = []
+        for fragment in fragments:
+            if not fragment.startswith("<iframe "):
+                wrapped.append(
+                    "<{0}>{1}</{0}>".format(FRAGMENT_TAG, clean_html(fragment))
+                )
+        if not wrapped:
+            return list(fragments)
+
+        soup = BeautifulSoup("".join(wrapped), "html.parser")
+        converted = iter(
+            self.process_tag(wrapper, convert_as_inline=False, children_only=True)
+            for wrapper in soup.find_all(FRAGMENT_TAG, recursive=False)
+        )
+
+        return [
+            fragment if fragment.startswith("<iframe ") else next(converted)
+            for fragment in fragments
+        ]
+
+    def process_text(self, el) -> str:
+        """Same as markdownify 0.12 (copied from it, keep in sync with the version
+        pinned in requirements.txt) but looks for the preformatted ancestors in a
+        single walk up the tree.
+        """
+        text = str(el) or ""
+
+        in_preformatted = in_literal = False
+        parent = el.parent
+        while parent is not None:
+            if parent.name in LITERAL_TAGS:
+                in_literal = True
+                if parent.name in PREFORMATTED_TAGS:
+                    in_preformatted = True
+                    break
+            parent = parent.parent
+
+        if not in_preformatted:
+            text = whitespace_re.sub(" ", text)
+        if not in_literal:
+            text = self.escape(text)
+
+        # remove trailing whitespaces of the last text node of a list item, or of the
+        # one followed by an embedded list
+        if el.parent.name == "li" and (
+            not el.next_sibling or el.next_sibling.name in ("ul", "ol")
+        ):
+            text = text.rstrip()
+
+        return text
+
+    def convert_iframe(self, el, text: str, convert_as_inline: bool) -> str:
+        return text
+
+
+# shared instance
+html_to_markdown = GeotribuMarkdownConverter()
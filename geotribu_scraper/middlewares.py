@@ -10,12 +10,27 @@
 # ##################################
 
 # Standard library
+import logging
+import tempfile
 import time
+from collections import deque
+from pathlib import Path
+from typing import Optional
 
 # 3rd party library
-from scrapy import signals
+from scrapy import Request, signals
+from scrapy import version_info as scrapy_version_info
 from scrapy.downloadermiddlewares.retry import RetryMiddleware
+from scrapy.exceptions import DontCloseSpider, IgnoreRequest, NotConfigured
+from scrapy.utils.httpobj import urlparse_cached
+from scrapy.utils.misc import load_object
 from scrapy.utils.response import response_status_message
+from twisted.internet import task
+
+# package module
+from geotribu_scraper.engine_pause import pause_engine, unpause_engine
+from geotribu_scraper.node_index import NodeAliasIndex
+from geotribu_scraper.rate_limit import SharedTokenBucket
 
 
 # #############################################################################
@@ -129,11 +144,16 @@ class TooManyRequestsRetryMiddleware(RetryMiddleware):
         if request.meta.get("dont_retry", False):
             return response
         elif response.status == 429:
-            self.crawler.engine.pause()
+            pause_engine(self.crawler, reason="429_backoff")
+            backoff_start = time.monotonic()
             time.sleep(
                 60
             )  # If the rate limit is renewed in a minute, put 60 seconds, and so on.
-            self.crawler.engine.unpause()
+            unpause_engine(self.crawler, reason="429_backoff")
+            self.crawler.stats.inc_value(
+                "retry/429_backoff_seconds", time.monotonic() - backoff_start
+            )
+            self.crawler.stats.inc_value("retry/429_backoff_count")
             reason = response_status_message(response.status)
             return self._retry(request, reason, spider) or response
         elif response.status in self.retry_http_codes:
@@ -142,6 +162,425 @@ class TooManyRequestsRetryMiddleware(RetryMiddleware):
         return response
 
 
+class NodeAliasIndexMiddleware(object):
+    """Drop requests whose URL resolves to a Drupal content node already processed,
+    in this run or a previous one. A same content can be reached through a custom
+    alias (/geotribu_reborn/GeoRDP/20150220) and through node/N.
+
+    The URL-to-node index is filled from the node id that spiders extract from the
+    shortlink and stored in the file set by `NODE_ALIAS_INDEX_FILE`. Only http(s)
+    URLs are learnt and checked: the requests of the Drupal database spider (data:
+    URL) always go through. Opt-in with `NODE_ALIAS_INDEX_ENABLED`.
+    """
+
+    def __init__(self, crawler):
+        self.stats = crawler.stats
+        self.index = NodeAliasIndex(
+            index_path=Path(crawler.settings.get("NODE_ALIAS_INDEX_FILE"))
+        )
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("NODE_ALIAS_INDEX_ENABLED"):
+            raise NotConfigured
+        s = cls(crawler)
+        crawler.signals.connect(s.item_scraped, signal=signals.item_scraped)
+        crawler.signals.connect(s.spider_closed, signal=signals.spider_closed)
+        return s
+
+    def process_request(self, request, spider):
+        if self.index.is_processed(request.url):
+            self.stats.inc_value("node_alias_index/hit", spider=spider)
+            raise IgnoreRequest(
+                "Node {} already processed: {}".format(
+                    self.index.resolve(request.url), request.url
+                )
+            )
+        self.stats.inc_value("node_alias_index/miss", spider=spider)
+        return None
+
+    def item_scraped(self, item, response, spider):
+        node = item.get("drupal_node")
+        if not node:
+            return
+
+        urls = [response.url, response.urljoin(item.get("url_full") or "")]
+        learnt = self.index.learn(node, *urls)
+        self.stats.inc_value("node_alias_index/learnt", count=learnt, spider=spider)
+
+    def spider_closed(self, spider):
+        self.index.save()
+        self.stats.set_value(
+            "node_alias_index/size", len(self.index.aliases), spider=spider
+        )
+        logging.info(
+            "URL-to-node index saved: {} URLs for {} nodes".format(
+                len(self.index.aliases), len(self.index.processed_nodes)
+            )
+        )
+
+
+class HttpCacheReplayMiddleware(object):
+    """Serve every request from the HTTP cache storage, without any download, when
+    `HTTPCACHE_REPLAY_ENABLED` is set. Requests missing from the cache are dropped:
+    the replay never reaches the network.
+
+    Placed before the other downloader middlewares, so that robots.txt, delays and
+    retries are skipped.
+    """
+
+    def __init__(self, crawler):
+        self.stats = crawler.stats
+        self.storage = load_object(crawler.settings.get("HTTPCACHE_STORAGE"))(
+            crawler.settings
+        )
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("HTTPCACHE_REPLAY_ENABLED"):
+            raise NotConfigured
+        s = cls(crawler)
+        crawler.signals.connect(s.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(s.spider_closed, signal=signals.spider_closed)
+        return s
+
+    def spider_opened(self, spider):
+        self.storage.open_spider(spider)
+
+    def spider_closed(self, spider):
+        self.storage.close_spider(spider)
+
+    def process_request(self, request, spider):
+        response = self.storage.retrieve_response(spider, request)
+        if response is None:
+            self.stats.inc_value("httpcache_replay/miss", spider=spider)
+            raise IgnoreRequest("Not in HTTP cache: {}".format(request.url))
+
+        self.stats.inc_value("httpcache_replay/hit", spider=spider)
+        # 'cached' prevents the HTTP cache middleware from storing it again
+        response.flags.extend(["cached", "replayed"])
+        return response
+
+
+class DepthFirstSchedulingMiddleware(object):
+    """Schedule content pages before listing pages, so that items reach the
+    pipelines early and the scheduler queue stays small on large sites.
+
+    Requests to the content callback of the spider get `DEPTH_FIRST_DETAIL_PRIORITY`
+    added to their priority. Listing requests (default `parse` callback) are held in
+    this middleware and released when fewer than `DEPTH_FIRST_MAX_LISTINGS` of them
+    are outstanding (scheduled, but no response yet) and the scheduler queue is down
+    to `DEPTH_FIRST_QUEUE_LOW_WATER` requests. Released listings go just before the
+    remaining content pages, so that the next content pages are discovered before
+    the downloader runs dry. When the spider is idle, held listings are released
+    whatever the counts, since no listing can still be outstanding (failed or ignored
+    downloads).
+
+    Start requests stay lazy: they are read up to the first listing which has to be
+    held, then again once the held listings have all been released.
+
+    The scheduler queue size is sampled every `DEPTH_FIRST_SAMPLE_INTERVAL` seconds
+    into the stats.
+    """
+
+    # meta key marking the listing requests
+    meta_key = "depth_first_listing"
+
+    def __init__(self, crawler):
+        self.crawler = crawler
+        self.stats = crawler.stats
+        self.detail_priority = crawler.settings.getint("DEPTH_FIRST_DETAIL_PRIORITY")
+        self.max_listings = max(crawler.settings.getint("DEPTH_FIRST_MAX_LISTINGS"), 1)
+        self.queue_low_water = crawler.settings.getint(
+            "DEPTH_FIRST_QUEUE_LOW_WATER"
+        ) or crawler.settings.getint("CONCURRENT_REQUESTS")
+        self.sample_interval = crawler.settings.getfloat("DEPTH_FIRST_SAMPLE_INTERVAL")
+        self.max_samples = crawler.settings.getint("DEPTH_FIRST_MAX_SAMPLES")
+
+        self.held = deque()
+        self.outstanding = 0
+        self.start_requests = None
+        self.samples = []
+        self.started = None
+        self.sampling_task = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("DEPTH_FIRST_ENABLED"):
+            raise NotConfigured
+        s = cls(crawler)
+        crawler.signals.connect(s.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(s.spider_idle, signal=signals.spider_idle)
+        crawler.signals.connect(s.spider_closed, signal=signals.spider_closed)
+        crawler.signals.connect(s.request_dropped, signal=signals.request_dropped)
+        crawler.signals.connect(s.item_scraped, signal=signals.item_scraped)
+        return s
+
+    def spider_opened(self, spider):
+        self.started = time.monotonic()
+        self.stats.set_value("depth_first/max_listings", self.max_listings)
+        if self.sample_interval > 0:
+            self.sampling_task = task.LoopingCall(self.sample)
+            self.sampling_task.start(self.sample_interval, now=False)
+
+    def spider_closed(self, spider):
+        if self.sampling_task and self.sampling_task.running:
+            self.sampling_task.stop()
+        self.sample()
+        self.stats.set_value("depth_first/queue_size_samples", self.samples)
+
+    def is_listing(self, request: Request, spider) -> bool:
+        return request.callback is None or request.callback == spider.parse
+
+    def is_detail(self, request: Request, spider) -> bool:
+        content_callback = getattr(spider, "content_callback", None)
+        return content_callback not in (None, "parse") and request.callback == getattr(
+            spider, content_callback, None
+        )
+
+    def prioritize(self, request, spider):
+        """Prioritize a detail request or hold back a listing one.
+
+        :param request: request or item yielded by the spider
+        :param Spider spider: running spider
+
+        :return: the request or item to pass on, None if it is held
+        """
+        if not isinstance(request, Request):
+            return request
+        if self.is_detail(request, spider):
+            request.priority += self.detail_priority
+            self.stats.inc_value("depth_first/detail_requests")
+        elif self.is_listing(request, spider):
+            request.meta[self.meta_key] = True
+            self.held.append(request)
+            self.stats.inc_value("depth_first/listing_requests")
+            return None
+        return request
+
+    def schedule(self, requests, spider):
+        """Prioritize the detail requests, hold back the listing ones, then release
+        the held listings that fit under the cap.
+
+        :param requests: requests and items yielded by the spider
+        :param Spider spider: running spider
+        """
+        for request in requests:
+            request = self.prioritize(request, spider)
+            if request is not None:
+                yield request
+        yield from self.release(spider)
+
+    def queue_size(self) -> int:
+        engine = self.crawler.engine
+        if engine is None or engine.slot is None:
+            return 0
+        return len(engine.slot.scheduler)
+
+    def release(self, spider, force: bool = False):
+        """Yield the held listings, as long as fewer than the cap are outstanding and
+        the scheduler queue is low. Once none is held, read the start requests up to
+        the next listing.
+
+        :param Spider spider: running spider
+        :param bool force: ignore the queue size. Defaults to False.
+        """
+        while True:
+            while (
+                self.held
+                and self.outstanding < self.max_listings
+                and (force or self.queue_size() <= self.queue_low_water)
+            ):
+                self.outstanding += 1
+                request = self.held.popleft()
+                request.priority += self.detail_priority + 1
+                self.stats.max_value(
+                    "depth_first/listings_outstanding_max", self.outstanding
+                )
+                yield request
+            if self.held or self.start_requests is None:
+                break
+
+            request = next(self.start_requests, None)
+            if request is None:
+                self.start_requests = None
+                break
+            request = self.prioritize(request, spider)
+            if request is not None:
+                yield request
+        self.stats.max_value("depth_first/listings_held_max", len(self.held))
+
+    def process_start_requests(self, start_requests, spider):
+        self.start_requests = iter(start_requests)
+        return self.release(spider)
+
+    def process_spider_input(self, response, spider):
+        if response.meta.get(self.meta_key):
+            self.outstanding = max(self.outstanding - 1, 0)
+        return None
+
+    def process_spider_output(self, response, result, spider):
+        return self.schedule(result, spider)
+
+    def request_dropped(self, request, spider):
+        # filtered by the scheduler (duplicate): it will never get a response
+        if request.meta.get(self.meta_key):
+            self.outstanding = max(self.outstanding - 1, 0)
+
+    def spider_idle(self, spider):
+        if not self.held and self.start_requests is None:
+            return
+        # nothing is in progress: listings counted as outstanding have failed
+        self.outstanding = 0
+        for request in self.release(spider, force=True):
+            # the spider argument is required before Scrapy 2.6, deprecated since
+            if scrapy_version_info < (2, 6):
+                self.crawler.engine.crawl(request, spider)
+            else:
+                self.crawler.engine.crawl(request)
+        raise DontCloseSpider
+
+    def item_scraped(self, item, response, spider):
+        if not self.stats.get_value("depth_first/first_item_seconds"):
+            self.stats.set_value(
+                "depth_first/first_item_seconds",
+                round(time.monotonic() - self.started, 3),
+            )
+
+    def sample(self):
+        """Record the scheduler queue size. When there are too many samples, every
+        other one is dropped and the interval is doubled, so that the whole crawl is
+        covered with a bounded count of samples."""
+        if self.started is None:
+            return
+        queue_size = self.queue_size()
+        self.stats.set_value("depth_first/queue_size", queue_size)
+        self.stats.max_value("depth_first/queue_size_max", queue_size)
+        self.samples.append(
+            (round(time.monotonic() - self.started, 1), queue_size, len(self.held))
+        )
+        if self.max_samples and len(self.samples) > self.max_samples:
+            self.samples = self.samples[::2]
+            if self.sampling_task:
+                self.sampling_task.interval *= 2
+
+
+class SharedRateLimitMiddleware(object):
+    """Delay the requests so that all the crawls running on the machine, in separate
+    processes, share a single requests-per-second budget by host.
+
+    Budgets are token buckets stored in the SQLite database set by
+    `SHARED_RATE_LIMIT_DB` (see `geotribu_scraper.rate_limit`). Placed after the
+    HTTP cache middleware, so that cached responses are not delayed. A 429 response
+    empties the bucket of its host for every process, for the `Retry-After` delay or
+    `SHARED_RATE_LIMIT_429_DELAY` seconds.
+    """
+
+    def __init__(self, crawler):
+        self.crawler = crawler
+        self.stats = crawler.stats
+        settings = crawler.settings
+        self.rates = settings.getdict("SHARED_RATE_LIMIT_HOST_RATES")
+        self.default_rate = settings.getfloat("SHARED_RATE_LIMIT_RATE")
+        self.burst = settings.getfloat("SHARED_RATE_LIMIT_BURST", 1)
+        self.penalty = settings.getfloat("SHARED_RATE_LIMIT_429_DELAY")
+        self.db_path = Path(
+            settings.get("SHARED_RATE_LIMIT_DB")
+            or Path(tempfile.gettempdir()) / "geotribu_scraper_rate_limit.sqlite"
+        )
+        # one bucket store by rate, all in the same database
+        self.buckets = {}
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("SHARED_RATE_LIMIT_ENABLED"):
+            raise NotConfigured
+        s = cls(crawler)
+        crawler.signals.connect(s.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(s.spider_closed, signal=signals.spider_closed)
+        return s
+
+    def spider_opened(self, spider):
+        logging.info(
+            "Shared rate limit: {} requests/s by host ({}) in {}".format(
+                self.default_rate,
+                ", ".join(
+                    "{}: {}".format(host, rate) for host, rate in self.rates.items()
+                )
+                or "no specific host",
+                self.db_path,
+            )
+        )
+
+    def spider_closed(self, spider):
+        for bucket in self.buckets.values():
+            bucket.close()
+
+    def bucket(self, host: str) -> Optional[SharedTokenBucket]:
+        rate = float(self.rates.get(host, self.default_rate))
+        if rate <= 0:
+            return None
+        if rate not in self.buckets:
+            self.buckets[rate] = SharedTokenBucket(
+                db_path=self.db_path, rate=rate, burst=self.burst
+            )
+        return self.buckets.get(rate)
+
+    def process_request(self, request, spider):
+        host = urlparse_cached(request).hostname
+        bucket = self.bucket(host) if host else None
+        if bucket is None:
+            return None
+
+        self.stats.inc_value("shared_rate_limit/requests", spider=spider)
+        return self.wait_token(bucket, host, spider, time.monotonic())
+
+    def wait_token(self, bucket: SharedTokenBucket, host: str, spider, since: float):
+        """Take a token for the host, or try again when the next one is available.
+
+        :return: None once a token is taken, else a Deferred fired then
+        """
+        slot = self.crawler.engine.slot
+        if slot is not None and slot.closing:
+            # do not hold the spider closing (CLOSESPIDER_TIMEOUT...) any longer
+            raise IgnoreRequest("Spider closing: {}".format(spider.name))
+        delay = bucket.acquire(host)
+        if delay <= 0:
+            waited = time.monotonic() - since
+            if waited > 0:
+                self.stats.inc_value("shared_rate_limit/delayed", spider=spider)
+                self.stats.inc_value(
+                    "shared_rate_limit/delay_seconds", waited, spider=spider
+                )
+                self.stats.max_value(
+                    "shared_rate_limit/delay_max", waited, spider=spider
+                )
+            return None
+
+        # imported here: the reactor must not be installed when the module is loaded
+        # (Scrapy installs the one of TWISTED_REACTOR)
+        from twisted.internet import reactor
+        from twisted.internet.task import deferLater
+
+        return deferLater(reactor, delay, self.wait_token, bucket, host, spider, since)
+
+    def process_response(self, request, response, spider):
+        if response.status != 429:
+            return response
+        host = urlparse_cached(request).hostname
+        bucket = self.bucket(host) if host else None
+        if bucket is not None:
+            retry_after = response.headers.get("Retry-After", b"").decode().strip()
+            delay = float(retry_after) if retry_after.isdigit() else self.penalty
+            bucket.penalize(host, delay)
+            self.stats.inc_value("shared_rate_limit/penalties", spider=spider)
+            logging.info(
+                "429 from {}: requests to this host held back {}s for every "
+                "process.".format(host, delay)
+            )
+        return response
+
+
 # #############################################################################
 # ##### Main #######################
 # ##################################
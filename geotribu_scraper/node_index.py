@@ -0,0 +1,149 @@
+#! python3  # noqa: E265
+
+"""
+    Persistent index mapping content URLs (custom aliases or node/N) to the Drupal
+    content node they resolve to.
+"""
+
+# #############################################################################
+# ########## Libraries #############
+# ##################################
+
+# Standard library
+import json
+import logging
+import re
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlsplit
+
+# #############################################################################
+# ########## Globals ###############
+# ##################################
+
+# matches Drupal default paths: /node/1234 or /node/1234/
+RE_NODE_PATH = re.compile(r"/node/(\d+)/?$")
+# only web pages are indexed: not the data: URL of the Drupal database spider
+WEB_SCHEMES = ("http", "https")
+
+
+# #############################################################################
+# ########## Classes ###############
+# ##################################
+class NodeAliasIndex(object):
+    """URL-to-node index, learnt from the scraped items and stored as JSON between
+    runs.
+
+    :param Path index_path: path to the JSON file storing the index
+    """
+
+    def __init__(self, index_path: Path):
+        self.index_path = Path(index_path)
+        self.aliases: dict = {}
+        self.processed_nodes: set = set()
+        self.load()
+
+    @staticmethod
+    def url_key(url: str) -> str:
+        """Normalize an URL into the key used by the index: path and query, without
+        trailing slash. Scheme and domain are ignored so that relative hrefs and
+        absolute URLs share the same key.
+
+        :param str url: absolute or relative URL
+
+        :return: index key
+        :rtype: str
+        """
+        splitted_url = urlsplit(url)
+        key = splitted_url.path.rstrip("/")
+        if splitted_url.query:
+            key += "?" + splitted_url.query
+        return key
+
+    @staticmethod
+    def is_web_url(url: str) -> bool:
+        """Check if an URL is an absolute http(s) URL, the only ones indexed.
+
+        :param str url: URL to check
+
+        :return: True for http and https URLs
+        :rtype: bool
+        """
+        return bool(url) and urlsplit(url).scheme.lower() in WEB_SCHEMES
+
+    def load(self):
+        """Load index from the JSON file, if it exists."""
+        if not self.index_path.is_file():
+            logging.debug("No URL-to-node index found at {}".format(self.index_path))
+            return
+
+        with self.index_path.open(mode="r", encoding="UTF8") as in_index:
+            self.aliases = json.load(in_index).get("aliases", {})
+        self.processed_nodes = set(self.aliases.values())
+        logging.info(
+            "URL-to-node index loaded: {} URLs for {} nodes".format(
+                len(self.aliases), len(self.processed_nodes)
+            )
+        )
+
+    def save(self):
+        """Write index into the JSON file."""
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_suffix(".tmp")
+        with tmp_path.open(mode="w", encoding="UTF8") as out_index:
+            json.dump({"aliases": self.aliases}, out_index, indent=1, sort_keys=True)
+        tmp_path.replace(self.index_path)
+
+    def learn(self, node: int, *urls: str) -> int:
+        """Record that URLs resolve to the node and mark the node as processed.
+
+        :param int node: Drupal content node id
+        :param str urls: URLs (aliases or node/N) pointing to the node. Other than
+            http(s) URLs are ignored.
+
+        :return: count of new URLs added to the index
+        :rtype: int
+        """
+        urls = [url for url in urls if self.is_web_url(url)]
+        if not urls:
+            return 0
+        self.processed_nodes.add(node)
+        count_new = 0
+        for url in urls:
+            key = self.url_key(url)
+            if self.aliases.get(key) != node:
+                self.aliases[key] = node
+                count_new += 1
+        return count_new
+
+    def resolve(self, url: str) -> Optional[int]:
+        """Return the node an URL resolves to, from the learnt aliases or the node/N
+        pattern.
+
+        :param str url: URL to resolve
+
+        :return: node id or None if unknown
+        :rtype: Optional[int]
+        """
+        key = self.url_key(url)
+        if key in self.aliases:
+            return self.aliases.get(key)
+
+        node_match = RE_NODE_PATH.search(key)
+        if node_match:
+            return int(node_match.group(1))
+
+        return None
+
+    def is_processed(self, url: str) -> bool:
+        """Check if the URL resolves to a node already processed.
+
+        :param str url: URL to check
+
+        :return: True if the node has already been processed, always False for
+            other than http(s) URLs
+        :rtype: bool
+        """
+        if not self.is_web_url(url):
+            return False
+        return self.resolve(url) in self.processed_nodes
@@ -0,0 +1,115 @@
+#! python3  # noqa: E265
+
+"""
+    Allocation of the output paths of the generated markdown files.
+"""
+
+# #############################################################################
+# ########## Libraries #############
+# ##################################
+
+# Standard library
+import logging
+from functools import lru_cache
+from hashlib import sha1
+from pathlib import Path
+from typing import Union
+
+# #############################################################################
+# ########## Functions #############
+# ##################################
+
+
+@lru_cache(maxsize=4096)
+def slugify_title(title: str) -> str:
+    """Slugify a content title to be used in a filename. Results are memoized.
+
+    :param str title: content title
+
+    :return: slug
+    :rtype: str
+    """
+    from slugify import slugify
+
+    return slugify(title, separator="_", stopwords=["du", "dans", "le", "la"])
+
+
+# #############################################################################
+# ########## Classes ###############
+# ##################################
+class OutputPathAllocator(object):
+    """Keep track of the output paths allocated during a run. When a path is
+    already used by another content, a stable suffix based on the legacy node (or on
+    the URL if the node is unknown) is appended to the filename.
+
+    The allocations of the previous runs can be given: a path keeps its owner, even
+    if another content colliding with it arrives first, so the result does not depend
+    on the crawl order once the path has been allocated.
+
+    :param dict reserved: owner (legacy node or URL) of each path allocated by the
+        previous runs. Defaults to None.
+    """
+
+    def __init__(self, reserved: dict = None):
+        self.reserved: dict = {
+            Path(path): owner for path, owner in (reserved or {}).items()
+        }
+        self.allocated: dict = {}
+        self.collisions: list = []
+        self.suffixed: dict = {}
+
+    def allocate(self, out_file: Path, legacy_node: Union[int, None], url: str) -> Path:
+        """Return the path to use for a content.
+
+        :param Path out_file: expected output path
+        :param Union[int, None] legacy_node: Drupal content node id
+        :param str url: content URL, used when the node is unknown
+
+        :return: output path, suffixed in case of collision
+        :rtype: Path
+        """
+        owner = legacy_node or url
+        if (out_file, owner) in self.suffixed:
+            return self.suffixed.get((out_file, owner))
+
+        current_owner = self.allocated.get(out_file)
+        if current_owner is None:
+            current_owner = self.reserved.get(out_file, owner)
+            if current_owner == owner:
+                self.allocated[out_file] = owner
+                return out_file
+        elif current_owner == owner:
+            return out_file
+
+        if legacy_node:
+            suffix = "_n{}".format(legacy_node)
+        else:
+            suffix = "_{}".format(sha1(str(url).encode("UTF8")).hexdigest()[:8])
+        out_file_suffixed = out_file.with_name(
+            "{}{}{}".format(out_file.stem, suffix, out_file.suffix)
+        )
+        self.allocated[out_file_suffixed] = owner
+        self.suffixed[(out_file, owner)] = out_file_suffixed
+
+        logging.warning(
+            "Output path collision: {} is already used by {}. {} written to {}".format(
+                out_file, current_owner, owner, out_file_suffixed
+            )
+        )
+        self.collisions.append((out_file, out_file_suffixed, current_owner, owner))
+        return out_file_suffixed
+
+    def allocations(self) -> dict:
+        """Allocations to give to the next run: the paths allocated during this run,
+        and the reserved paths of the contents which did not get any path this run
+        (not crawled, e.g. a partial run).
+
+        :return: owner of each path
+        :rtype: dict
+        """
+        owners = set(self.allocated.values())
+        allocations = {
+            path: owner for path, owner in self.reserved.items() if owner not in owners
+        }
+        allocations.update(self.allocated)
+        return allocations
@@ -0,0 +1,168 @@
+#! python3  # noqa: E265
+
+"""
+    Packed single-file export of the converted contents, stored into a SQLite
+    database to get random access by legacy node and bulk loading.
+"""
+
+# #############################################################################
+# ########## Libraries #############
+# ##################################
+
+# Standard library
+import json
+import sqlite3
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+# #############################################################################
+# ########## Globals ###############
+# ##################################
+
+SQL_CREATE = """
+CREATE TABLE IF NOT EXISTS documents (
+    path TEXT PRIMARY KEY,
+    node INTEGER,
+    kind TEXT,
+    title TEXT,
+    date TEXT,
+    frontmatter TEXT NOT NULL,
+    body TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_documents_node ON documents (node);
+"""
+
+SQL_COLUMNS = "path, node, kind, title, date, frontmatter, body"
+
+
+# #############################################################################
+# ########## Classes ###############
+# ##################################
+class PackedCorpus(object):
+    """Converted documents packed into a single SQLite file. Each entry holds the
+    output path, the legacy node, the front-matter fields (as JSON) and the
+    markdown body.
+
+    :param Path db_path: path to the SQLite file
+    :param int batch_size: count of documents inserted per transaction
+    """
+
+    def __init__(self, db_path: Path, batch_size: int = 200):
+        self.db_path = Path(db_path)
+        self.batch_size = batch_size
+        self.pending: List[tuple] = []
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(str(self.db_path))
+        self.connection.executescript(SQL_CREATE)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def add(self, path: str, frontmatter: dict, body: str, kind: str = None):
+        """Queue a document for insertion. An existing document with the same path
+        is replaced.
+
+        :param str path: output path, relative to the output folder
+        :param dict frontmatter: front-matter fields
+        :param str body: markdown body
+        :param str kind: content kind (art, rdp...)
+        """
+        self.pending.append(
+            (
+                path,
+                frontmatter.get("legacy", {}).get("node"),
+                kind,
+                frontmatter.get("title"),
+                str(frontmatter.get("date", "")),
+                json.dumps(
+                    frontmatter, ensure_ascii=False, default=str, sort_keys=True
+                ),
+                body,
+            )
+        )
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Insert queued documents in a single transaction."""
+        if not self.pending:
+            return
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO documents ({}) VALUES (?, ?, ?, ?, ?, ?, ?)".format(
+                    SQL_COLUMNS
+                ),
+                self.pending,
+            )
+        self.pending = []
+
+    def prune(self, paths) -> int:
+        """Delete the documents whose path is not in the given ones, e.g. the contents
+        not produced by the last run.
+
+        :param paths: output paths to keep
+
+        :return: count of deleted documents
+        :rtype: int
+        """
+        self.flush()
+        with self.connection:
+            self.connection.execute("CREATE TEMP TABLE IF NOT EXISTS kept (path TEXT)")
+            self.connection.execute("DELETE FROM kept")
+            self.connection.executemany(
+                "INSERT INTO kept (path) VALUES (?)", ((path,) for path in paths)
+            )
+            deleted = self.connection.execute(
+                "DELETE FROM documents WHERE path NOT IN (SELECT path FROM kept)"
+            ).rowcount
+        return deleted
+
+    def close(self):
+        """Flush queued documents and close the database."""
+        self.flush()
+        self.connection.close()
+
+    @staticmethod
+    def _as_dict(row: tuple) -> dict:
+        path, node, kind, title, date, frontmatter, body = row
+        return {
+            "path": path,
+            "node": node,
+            "kind": kind,
+            "title": title,
+            "date": date,
+            "frontmatter": json.loads(frontmatter),
+            "body": body,
+        }
+
+    def get(self, node: int) -> Optional[dict]:
+        """Return the document of a legacy node.
+
+        :param int node: Drupal content node id
+
+        :return: document or None if not found
+        :rtype: Optional[dict]
+        """
+        self.flush()
+        row = self.connection.execute(
+            "SELECT {} FROM documents WHERE node = ? LIMIT 1".format(SQL_COLUMNS),
+            (node,),
+        ).fetchone()
+        return self._as_dict(row) if row else None
+
+    def __len__(self) -> int:
+        self.flush()
+        return self.connection.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def __iter__(self) -> Iterator[dict]:
+        """Bulk loading: iterate over all the documents, ordered by path."""
+        self.flush()
+        cursor = self.connection.execute(
+            "SELECT {} FROM documents ORDER BY path".format(SQL_COLUMNS)
+        )
+        for row in cursor:
+            yield self._as_dict(row)
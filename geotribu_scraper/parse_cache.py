@@ -0,0 +1,268 @@
+#! python3  # noqa: E265
+
+"""
+    Persistent cache of the extraction results, stored into a SQLite database: the
+    item fields extracted from a content page are kept under the hash of the page
+    (extraction function, URL and body), so an unchanged page is not parsed again by
+    the next runs.
+
+    Entries are scoped by spider and extraction version
+    (`geotribu_scraper.extraction.EXTRACTION_VERSION`): the entries of another version
+    are deleted when the cache is opened. The total size of the entries is bounded,
+    the least recently used ones are evicted first.
+
+    Fields are stored pickled (as the parse pool sends them), since they hold tuples
+    which JSON would turn into lists.
+"""
+
+# #############################################################################
+# ########## Libraries #############
+# ##################################
+
+# Standard library
+import hashlib
+import logging
+import pickle
+import sqlite3
+import zlib
+from pathlib import Path
+from typing import List, Optional
+
+# 3rd party library
+from scrapy.http.response import Response
+
+# #############################################################################
+# ########## Globals ###############
+# ##################################
+
+SQL_CREATE = """
+CREATE TABLE IF NOT EXISTS entries (
+    spider TEXT NOT NULL,
+    version TEXT NOT NULL,
+    hash BLOB NOT NULL,
+    fields BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    used INTEGER NOT NULL,
+    PRIMARY KEY (spider, version, hash)
+);
+CREATE INDEX IF NOT EXISTS idx_entries_used ON entries (used);
+"""
+
+# share of the maximum size kept after an eviction, so the next entries do not
+# trigger another one right away
+EVICTION_LOW_WATER = 0.9
+
+
+# #############################################################################
+# ########## Classes ###############
+# ##################################
+class ParseCache(object):
+    """Extraction results of a spider, by page hash. Reads are immediate, writes and
+    usage updates are queued and saved by batches.
+
+    :param Path db_path: path to the SQLite file, can be shared by the spiders
+    :param str spider: spider name
+    :param str version: version of the extraction functions
+    :param int max_bytes: maximum total size of the stored fields (compressed), 0 for
+        no limit. Defaults to 256 MiB.
+    :param int batch_size: count of writes saved per transaction. Defaults to 100.
+    :param stats: crawler stats collector. Defaults to None.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        spider: str,
+        version: str,
+        max_bytes: int = 256 * 1024 * 1024,
+        batch_size: int = 100,
+        stats=None,
+    ):
+        self.db_path = Path(db_path)
+        self.spider = spider
+        self.version = str(version)
+        self.max_bytes = max_bytes
+        self.batch_size = max(batch_size, 1)
+        self.stats = stats
+
+        self.pending_puts: List[tuple] = []
+        self.pending_uses: List[tuple] = []
+        self.hits = self.misses = self.evictions = 0
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(str(self.db_path), timeout=30)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(SQL_CREATE)
+
+        # results of the previous extraction versions can not be used anymore
+        with self.connection:
+            deleted = self.connection.execute(
+                "DELETE FROM entries WHERE spider = ? AND version != ?",
+                (self.spider, self.version),
+            ).rowcount
+        if deleted:
+            logging.info(
+                "Parse cache: {} entries of {} deleted (extraction version "
+                "changed to {}).".format(deleted, self.spider, self.version)
+            )
+
+        # usage clock: higher is more recent
+        self.clock = (
+            self.connection.execute("SELECT MAX(used) FROM entries").fetchone()[0] or 0
+        )
+        self.size = self.connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()[0]
+
+    @classmethod
+    def from_settings(cls, settings, spider: str, version: str, stats=None):
+        from scrapy.utils.project import data_path
+
+        return cls(
+            db_path=Path(data_path(settings.get("PARSE_CACHE_FILE"))),
+            spider=spider,
+            version=settings.get("PARSE_CACHE_VERSION") or version,
+            max_bytes=settings.getint("PARSE_CACHE_MAX_BYTES"),
+            batch_size=settings.getint("PARSE_CACHE_BATCH_SIZE", 100),
+            stats=stats,
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @staticmethod
+    def key(extractor, response: Response) -> bytes:
+        """Hash of a content page for an extraction function.
+
+        :param extractor: extraction function
+        :param Response response: content page
+
+        :return: SHA-256 digest of the function name, the URL (used to make the
+            image links absolute) and the body
+        :rtype: bytes
+        """
+        digest = hashlib.sha256()
+        digest.update(
+            "{}\n{}\n".format(
+                getattr(extractor, "__name__", extractor), response.url
+            ).encode("UTF8")
+        )
+        digest.update(response.body)
+        return digest.digest()
+
+    def _inc_stat(self, key: str, count: int = 1):
+        if self.stats:
+            self.stats.inc_value("parse_cache/{}".format(key), count)
+
+    def get(self, key: bytes) -> Optional[dict]:
+        """Return the stored fields of a page hash, if any.
+
+        :param bytes key: page hash, see `key`
+
+        :return: item fields or None if the page is not in the cache
+        :rtype: Optional[dict]
+        """
+        row = self.connection.execute(
+            "SELECT fields FROM entries WHERE spider = ? AND version = ? AND hash = ?",
+            (self.spider, self.version, key),
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            self._inc_stat("misses")
+            return None
+
+        self.hits += 1
+        self._inc_stat("hits")
+        self.clock += 1
+        self.pending_uses.append((self.clock, self.spider, self.version, key))
+        if len(self.pending_uses) >= self.batch_size:
+            self.flush()
+        return pickle.loads(zlib.decompress(row[0]))
+
+    def put(self, key: bytes, fields: dict):
+        """Queue the fields extracted from a page.
+
+        :param bytes key: page hash, see `key`
+        :param dict fields: item fields
+        """
+        data = zlib.compress(pickle.dumps(fields, protocol=pickle.HIGHEST_PROTOCOL))
+        self.clock += 1
+        self.pending_puts.append(
+            (self.spider, self.version, key, data, len(data), self.clock)
+        )
+        self.size += len(data)
+        self._inc_stat("stored")
+        if len(self.pending_puts) >= self.batch_size:
+            self.flush()
+        if self.max_bytes and self.size > self.max_bytes:
+            self.evict()
+
+    def flush(self):
+        """Save the queued entries and usage updates."""
+        if not (self.pending_puts or self.pending_uses):
+            return
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO entries "
+                "(spider, version, hash, fields, size, used) VALUES (?, ?, ?, ?, ?, ?)",
+                self.pending_puts,
+            )
+            self.connection.executemany(
+                "UPDATE entries SET used = ? "
+                "WHERE spider = ? AND version = ? AND hash = ?",
+                self.pending_uses,
+            )
+        self.pending_puts = []
+        self.pending_uses = []
+
+    def evict(self):
+        """Delete the least recently used entries (of every spider) until the total
+        size is back under the low water mark.
+        """
+        self.flush()
+        with self.connection:
+            # other processes may have written into the same file
+            self.size = self.connection.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()[0]
+            target = self.size - int(self.max_bytes * EVICTION_LOW_WATER)
+            if target <= 0:
+                return
+            freed = 0
+            evicted = []
+            for rowid, size in self.connection.execute(
+                "SELECT rowid, size FROM entries ORDER BY used"
+            ):
+                evicted.append((rowid,))
+                freed += size
+                if freed >= target:
+                    break
+            self.connection.executemany("DELETE FROM entries WHERE rowid = ?", evicted)
+        self.size -= freed
+        self.evictions += len(evicted)
+        self._inc_stat("evictions", len(evicted))
+        logging.debug(
+            "Parse cache: {} entries evicted ({} bytes).".format(len(evicted), freed)
+        )
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of the pages found in the cache, since it was opened."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def close(self):
+        """Save the queued entries, report the hit rate and close the database."""
+        self.flush()
+        if self.stats:
+            self.stats.set_value("parse_cache/hit_rate", round(self.hit_rate, 4))
+            self.stats.set_value("parse_cache/size_bytes", self.size)
+        logging.info(
+            "Parse cache: {} hits, {} misses (hit rate {:.1%}), {} evictions.".format(
+                self.hits, self.misses, self.hit_rate, self.evictions
+            )
+        )
+        self.connection.close()
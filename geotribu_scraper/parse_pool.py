@@ -0,0 +1,137 @@
+#! python3  # noqa: E265
+
+"""
+    Pool of worker processes running the extraction functions of
+    `geotribu_scraper.extraction`, so parsing the pages does not block the reactor
+    thread (and uses more than one core) when downloads are fast: local mirror, warm
+    HTTP cache or cache replay.
+
+    Only the response URL, headers and body are sent to the workers, which return the
+    item fields as a plain dictionary.
+"""
+
+# #############################################################################
+# ########## Libraries #############
+# ##################################
+
+# Standard library
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# 3rd party library
+from scrapy.http import Headers
+from scrapy.http.response import Response
+from twisted.internet import reactor
+from twisted.internet.defer import Deferred, DeferredSemaphore
+from twisted.python.failure import Failure
+
+# #############################################################################
+# ########## Functions #############
+# ##################################
+
+
+def run_extractor(
+    extractor, response_class: type, url: str, headers: dict, body: bytes
+) -> dict:
+    """Rebuild the response in the worker process and run the extraction function
+    on it.
+
+    :param extractor: extraction function, taking a response and returning a dict
+    :param type response_class: class of the original response (HtmlResponse...)
+    :param str url: response URL
+    :param dict headers: response headers used to detect the encoding
+    :param bytes body: response body
+
+    :return: item fields
+    :rtype: dict
+    """
+    response = response_class(url=url, headers=Headers(headers), body=body)
+    return extractor(response)
+
+
+# #############################################################################
+# ########## Classes ###############
+# ##################################
+class ParsePool(object):
+    """Process pool running extraction functions, with results returned as Twisted
+    Deferreds.
+
+    :param int workers: count of worker processes. Defaults to one per CPU.
+    :param int max_in_flight: maximum count of responses sent to the workers at the
+        same time, the others wait on the reactor side. Defaults to 2 per worker.
+    :param stats: crawler stats collector. Defaults to None.
+    """
+
+    def __init__(self, workers: int = None, max_in_flight: int = None, stats=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_in_flight = max_in_flight or 2 * self.workers
+        self.stats = stats
+        # spawn: forking a process running the reactor (and its threads) is unsafe
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        self.semaphore = DeferredSemaphore(self.max_in_flight)
+        logging.info(
+            "Parse pool: {} worker processes, up to {} responses in flight.".format(
+                self.workers, self.max_in_flight
+            )
+        )
+
+    @classmethod
+    def from_settings(cls, settings, stats=None):
+        return cls(
+            workers=settings.getint("PARSE_POOL_WORKERS") or None,
+            max_in_flight=settings.getint("PARSE_POOL_MAX_IN_FLIGHT") or None,
+            stats=stats,
+        )
+
+    def submit(self, extractor, response: Response) -> Deferred:
+        """Run an extraction function on a response in a worker process.
+
+        :param extractor: module-level extraction function (must be picklable)
+        :param Response response: response to parse
+
+        :return: Deferred fired with the item fields
+        :rtype: Deferred
+        """
+        if self.stats:
+            self.stats.inc_value("parse_pool/tasks")
+        headers = {}
+        if response.headers.get("Content-Type"):
+            headers["Content-Type"] = response.headers.get("Content-Type")
+        return self.semaphore.run(
+            self._submit,
+            extractor,
+            type(response),
+            response.url,
+            headers,
+            response.body,
+        )
+
+    def _submit(self, extractor, *args) -> Deferred:
+        if self.stats:
+            self.stats.max_value(
+                "parse_pool/in_flight_max",
+                self.max_in_flight - self.semaphore.tokens,
+            )
+        dfd = Deferred()
+        future = self.executor.submit(run_extractor, extractor, *args)
+        future.add_done_callback(
+            lambda done: reactor.callFromThread(self._fire, done, dfd)
+        )
+        return dfd
+
+    def _fire(self, future, dfd: Deferred):
+        """Hand the result of a worker over to the Deferred, in the reactor thread."""
+        error = future.exception()
+        if error is not None:
+            if self.stats:
+                self.stats.inc_value("parse_pool/errors")
+            dfd.errback(Failure(error))
+        else:
+            dfd.callback(future.result())
+
+    def close(self):
+        self.executor.shutdown(wait=True)
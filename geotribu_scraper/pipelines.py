@@ -11,65 +11,282 @@ import json
 import locale
 import logging
 from datetime import datetime
+from hashlib import sha256
+from io import StringIO
 from os import path
 from pathlib import Path
+from time import perf_counter
 from typing import Union
+from urllib.parse import urljoin
 
 # 3rd party
-import httpx
-from markdownify import markdownify as md
 from scrapy import Item, Request, Spider
 from scrapy.pipelines.images import ImagesPipeline
-from slugify import slugify
-from yaml import safe_dump
 
 # package module
+from geotribu_scraper.frontmatter import dump_frontmatter
+from geotribu_scraper.git_export import GitFastImport
 from geotribu_scraper.items import ArticleItem, GeoRdpItem
+from geotribu_scraper.items_index import index_entry, index_path_for
+from geotribu_scraper.jsonlines_export import JsonLinesWriter
+from geotribu_scraper.links_rewriter import LinksRewriter, PageImages
+from geotribu_scraper.output_paths import OutputPathAllocator, slugify_title
+from geotribu_scraper.packed_export import PackedCorpus
 from geotribu_scraper.replacers import AUTHORS_QUADRIGRAMME, URLS_BASE_REPLACEMENTS
+from geotribu_scraper.search import SearchIndexBuilder
+from geotribu_scraper.signals import document_rendered
+from geotribu_scraper.utils import MONTHS_NAMES_MATRIX
 
 # #############################################################################
 # ########## Globals ###############
 # ##################################
 # folder_output = Path("_output/" + datetime.now().strftime("%d%m%Y_%H%M"))
+# created when a spider is opened, not at import
 folder_output = Path("_output")
-folder_output.mkdir(exist_ok=True, parents=True)
-
-# matching matrix between non standardized dates in Drupal and Python ISO months name
-MONTHS_NAMES_MATRIX = {
-    "jan": "janv.",
-    "fév": "févr.",
-    "mar": "mars",
-    "avr": "avr.",
-    "mai": "mai",
-    "juin": "juin",
-    "juil": "juil.",
-    "aoû": "août",
-    "sep": "sept.",
-    "oct": "oct.",
-    "nov": "nov.",
-    "déc": "déc.",
-}
+
+# legacy URLs and images links, rewritten in a single pass
+links_rewriter = LinksRewriter(URLS_BASE_REPLACEMENTS)
+
+
+# #############################################################################
+# ########## Functions #############
+# ##################################
+
+
+def spider_output_name(spider: Spider) -> str:
+    """Name of the spider used in the output filenames. Shards of a same spider
+    (HTTP cache replay split across processes) get distinct names.
+
+    :param Spider spider: Scrapy spider which is used
+
+    :return: name to use in filenames
+    :rtype: str
+    """
+    return getattr(spider, "output_name", spider.name)
 
 
 # #############################################################################
 # ######### Pipelines ##############
 # ##################################
 class ScrapyCrawlerPipeline(object):
+    """Convert the items into markdown documents, written as files into the output
+    folder or, with `MARKDOWN_OUTPUT_BACKEND = "git"`, committed into a git
+    repository (see `geotribu_scraper.git_export`).
+
+    Every rendered document is also sent with the `document_rendered` signal (see
+    `geotribu_scraper.signals`) to the stages which need it, such as the search index
+    and the packed export, so they do not read it back.
+    """
+
     MAPPING_REDIRECTIONS: list = []
 
+    def __init__(self, stats=None, settings=None, signals=None):
+        self.stats = stats
+        self.settings = settings
+        self.signals = signals
+        self.output_backend = (
+            settings.get("MARKDOWN_OUTPUT_BACKEND", "files") if settings else "files"
+        )
+        if self.output_backend not in ("files", "git"):
+            raise ValueError(
+                "Unknown markdown output backend: {}. Available: files, git".format(
+                    self.output_backend
+                )
+            )
+        self.git_export = None
+        self.url_base = settings.get("DEFAULT_URL_BASE") if settings else None
+        self.images_store = settings.get("IMAGES_STORE") if settings else None
+        self.images_links_base = settings.get("IMAGES_LINKS_BASE") if settings else None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(
+            stats=crawler.stats, settings=crawler.settings, signals=crawler.signals
+        )
+
+    def open_spider(self, spider):
+        """This method is called when the spider is opened. Loads the hashes of the
+        markdown files written by the previous run, with their size and modification
+        time, and the output paths allocated by the previous runs.
+
+        :param spider: Scrapy spider which is used
+        :type spider: Spider
+        """
+        folder_output.mkdir(exist_ok=True, parents=True)
+
+        self.hashes_index_path = folder_output / Path(
+            f"hashes_{spider_output_name(spider)}.json"
+        )
+        if self.hashes_index_path.is_file():
+            with self.hashes_index_path.open(mode="r", encoding="UTF8") as in_hashes:
+                self.previous_hashes = json.load(in_hashes)
+        else:
+            self.previous_hashes = {}
+
+        self.current_hashes = {}
+        self.changes = {"added": [], "changed": [], "unchanged": 0}
+
+        # output paths allocated by the previous runs, kept by their contents
+        self.paths_index_path = folder_output / Path(
+            f"output_paths_{spider_output_name(spider)}.json"
+        )
+        if self.paths_index_path.is_file():
+            with self.paths_index_path.open(mode="r", encoding="UTF8") as in_paths:
+                reserved_paths = {
+                    folder_output / Path(path): owner
+                    for path, owner in json.load(in_paths).items()
+                }
+        else:
+            reserved_paths = {}
+        self.paths_allocator = OutputPathAllocator(reserved=reserved_paths)
+
+        # images needed by each page, for the upload to the CDN
+        self.images_manifest = {}
+
+        if self.output_backend == "git":
+            self.git_export = GitFastImport.from_settings(
+                self.settings, spider_name=spider_output_name(spider)
+            )
+
     def close_spider(self, spider):
         """This method is called when the spider is closed.
 
         :param spider: _description_
         :type spider: _type_
         """
-        out_filename = folder_output / Path(f"redirection_mapping_{spider.name}.txt")
+        out_filename = folder_output / Path(
+            f"redirection_mapping_{spider_output_name(spider)}.txt"
+        )
         with out_filename.open(mode="w", encoding="UTF8") as fifi:
             for pair_url_redirection in self.MAPPING_REDIRECTIONS:
                 fifi.write(pair_url_redirection.replace("\\", "/"))
 
+        # images manifest (JSON lines)
+        out_manifest = folder_output / Path(
+            f"images_manifest_{spider_output_name(spider)}.jsonl"
+        )
+        with out_manifest.open(mode="w", encoding="UTF8") as out_images:
+            for page in sorted(self.images_manifest):
+                out_images.write(
+                    json.dumps(self.images_manifest.get(page), ensure_ascii=False)
+                    + "\n"
+                )
+
+        # output paths index
+        with self.paths_index_path.open(mode="w", encoding="UTF8") as out_paths:
+            json.dump(
+                {
+                    path.relative_to(folder_output).as_posix(): owner
+                    for path, owner in self.paths_allocator.allocations().items()
+                },
+                out_paths,
+                indent=1,
+                sort_keys=True,
+            )
+
+        # hashes index and changes report
+        with self.hashes_index_path.open(mode="w", encoding="UTF8") as out_hashes:
+            json.dump(self.current_hashes, out_hashes, indent=1, sort_keys=True)
+
+        # the run may be partial (shard, item count limit, errors): these documents
+        # are not necessarily removed from the legacy website
+        self.changes["not_produced"] = sorted(
+            set(self.previous_hashes).difference(self.current_hashes)
+        )
+        out_report = folder_output / Path(f"changes_{spider_output_name(spider)}.json")
+        with out_report.open(mode="w", encoding="UTF8") as out_changes:
+            json.dump(self.changes, out_changes, indent=1)
+
+        if self.git_export is not None:
+            self.git_export.close()
+
+        logging.info(
+            "Markdown output: {} added, {} changed, {} unchanged, {} of the previous "
+            "run not produced by this one. "
+            "Details: {}".format(
+                len(self.changes.get("added")),
+                len(self.changes.get("changed")),
+                self.changes.get("unchanged"),
+                len(self.changes.get("not_produced")),
+                out_report,
+            )
+        )
+
+    def write_output(self, out_file: Path, content: str, date: datetime = None) -> bool:
+        """Write the rendered document, unless the file on disk already has the same
+        content. The hash stored by the previous run is trusted only if the file still
+        has the size and modification time recorded with it, else the file is hashed
+        again: a file edited or corrupted since is rewritten.
+
+        With the git backend, the document is streamed to git fast-import instead,
+        unless the branch already has the same content.
+
+        :param Path out_file: output markdown file
+        :param str content: rendered markdown document
+        :param datetime date: publication date, for the backdated commits. Defaults
+            to None.
+
+        :return: True if the file has been written
+        :rtype: bool
+        """
+        content_bytes = content.encode("UTF8")
+        content_hash = sha256(content_bytes).hexdigest()
+        out_key = out_file.relative_to(folder_output).as_posix()
+        self.current_hashes[out_key] = {"hash": content_hash}
+
+        if self.git_export is not None:
+            change = self.git_export.add(out_key, content_bytes, date)
+            if change is None:
+                logging.debug("Unchanged on the branch: {}".format(out_key))
+                self.changes["unchanged"] += 1
+                return False
+            self.changes.get(change).append(out_key)
+            if self.stats:
+                self.stats.inc_value("git_export/documents")
+                self.stats.inc_value("git_export/bytes", len(content_bytes))
+            return True
+
+        if out_file.is_file():
+            on_disk = out_file.stat()
+            previous = self.previous_hashes.get(out_key)
+            if (
+                isinstance(previous, dict)
+                and previous.get("size") == on_disk.st_size
+                and previous.get("mtime_ns") == on_disk.st_mtime_ns
+            ):
+                disk_hash = previous.get("hash")
+            else:
+                disk_hash = sha256(
+                    out_file.read_text(encoding="UTF8", errors="replace").encode("UTF8")
+                ).hexdigest()
+
+            if disk_hash == content_hash:
+                logging.debug("Unchanged, not rewritten: {}".format(out_file))
+                self.changes["unchanged"] += 1
+                self.current_hashes[out_key].update(
+                    size=on_disk.st_size, mtime_ns=on_disk.st_mtime_ns
+                )
+                return False
+
+            self.changes.get("changed").append(out_key)
+        else:
+            self.changes.get("added").append(out_key)
+
+        with out_file.open(mode="w", encoding="UTF8") as out_item_as_md:
+            out_item_as_md.write(content)
+        written = out_file.stat()
+        self.current_hashes[out_key].update(
+            size=written.st_size, mtime_ns=written.st_mtime_ns
+        )
+        if self.stats:
+            self.stats.inc_value("markdown/files_written")
+            self.stats.inc_value("markdown/bytes_written", len(content_bytes))
+        return True
+
     @staticmethod
     def check_url(url: str) -> bool:
+        import httpx
+
         with httpx.Client() as client:
             r = client.get(url)
 
@@ -177,7 +394,7 @@ class ScrapyCrawlerPipeline(object):
             )
             locale.setlocale(locale.LC_ALL, expected_locale)
 
-    def yaml_frontmatter_as_str(
+    def frontmatter_fields(
         self,
         author: str,
         category: str,
@@ -187,7 +404,7 @@ class ScrapyCrawlerPipeline(object):
         tags: list,
         title: str,
     ) -> str:
-        """Build and return YAML FrontMatter.
+        """Build and return the YAML front-matter fields.
 
         :param author: author name
         :type author: str
@@ -204,8 +421,8 @@ class ScrapyCrawlerPipeline(object):
         :param title: content title
         :type title: str
 
-        :return: YAML frontmatter ready to be written
-        :rtype: str
+        :return: front-matter fields, to be dumped with `dump_frontmatter`
+        :rtype: dict
         """
         if category == "GeoRDP":
             category = [
@@ -218,7 +435,7 @@ class ScrapyCrawlerPipeline(object):
 
         description = "{}...".format(introduction[:160])
 
-        dico_frontmatter = {
+        return {
             "authors": [author],
             "categories": category,
             "date": "{} 10:20".format(in_date.strftime("%Y-%m-%d")),
@@ -231,39 +448,107 @@ class ScrapyCrawlerPipeline(object):
             "title": title,
         }
 
-        return safe_dump(
-            data=dico_frontmatter,
-            allow_unicode=True,
-            # default_style='"',
-            explicit_start=True,
-            # explicit_end="---",
-            indent=4,
-            width=1000,
+    def send_document(
+        self,
+        out_file: Path,
+        document: str,
+        yaml_frontmatter: str,
+        frontmatter: dict,
+        item: Item,
+        spider: Spider,
+    ):
+        """Send a rendered document with the `document_rendered` signal.
+
+        :param Path out_file: output markdown file
+        :param str document: rendered markdown document
+        :param str yaml_frontmatter: front-matter block the document starts with,
+            followed by its closing line
+        :param dict frontmatter: front-matter fields
+        :param Item item: converted item
+        :param Spider spider: Scrapy spider which is used
+        """
+        if self.signals is None:
+            return
+        self.signals.send_catch_log(
+            signal=document_rendered,
+            path=out_file.relative_to(folder_output).as_posix(),
+            frontmatter=frontmatter,
+            # body as split_frontmatter returns it: after the closing line
+            body=document[len(yaml_frontmatter) + len("---\n") :],
+            item=item,
+            spider=spider,
         )
 
-    def process_content(self, in_md_str: str) -> str:
-        """Check images in content and try to replace broken paths using a dict (stored in settings).
+    def process_content(self, in_md_str: str, page_images: PageImages = None) -> str:
+        """Replace broken paths using a dict (stored in settings) and images sources
+        with the downloaded images, in a single pass.
 
         :param str in_md_str: markdown content
+        :param PageImages page_images: images of the page. Defaults to None.
 
         :return: markdown content with images paths replaced
         :rtype: str
         """
-        for old_url in URLS_BASE_REPLACEMENTS:
-            if old_url in in_md_str:
-                logging.debug("Old URL spotted: {}".format(old_url))
+        out_md_str, count_replaced = links_rewriter.rewrite(in_md_str, page_images)
+        if count_replaced:
+            logging.debug("{} legacy URLs replaced.".format(count_replaced))
+            return out_md_str
 
-                # new_url = URLS_BASE_REPLACEMENTS.get(old_url)
+        return in_md_str.strip(" \t")
 
-                # # check if new url will work
-                # r = self.check_url(new_url)
-                # # if r.is_error:
-                # if r.status_code >= 400:
-                #     logging.error("Image new URL is not correct: {}".format(new_url))
+    def page_images(self, item: Item, out_file: Path) -> PageImages:
+        """Images of an item, linked to the files stored by the images pipeline (if
+        enabled before this one): relative to the markdown file, or under
+        IMAGES_LINKS_BASE if set.
 
-                return in_md_str.replace(old_url, URLS_BASE_REPLACEMENTS.get(old_url))
+        :param Item item: item processed
+        :param Path out_file: output markdown file
 
-        return in_md_str.strip(" \t")
+        :return: images of the page
+        :rtype: PageImages
+        """
+        downloaded = {}
+        for image in item.get("images") or []:
+            if self.images_links_base:
+                link = self.images_links_base + image.get("path")
+            else:
+                link = Path(
+                    path.relpath(
+                        Path(self.images_store or "", image.get("path")),
+                        out_file.parent,
+                    )
+                ).as_posix()
+            downloaded[image.get("url")] = link
+
+        return PageImages(
+            page_url=urljoin(self.url_base, item.get("url_full") or "")
+            if self.url_base
+            else None,
+            downloaded=downloaded,
+        )
+
+    def write_images_manifest(self, out_file: Path, legacy_node, page: PageImages):
+        """Add the images referenced by a page to the images manifest, written when
+        the spider is closed.
+
+        :param Path out_file: output markdown file
+        :param legacy_node: Drupal node of the content
+        :param PageImages page: images of the page
+        """
+        if not page.referenced:
+            return
+
+        page_path = out_file.relative_to(folder_output).as_posix()
+        self.images_manifest[page_path] = {
+            "page": page_path,
+            "node": legacy_node,
+            "images": [
+                {"url": url, "link": link}
+                for url, link in page.referenced.items()
+                if link
+            ],
+            "missing": [url for url, link in page.referenced.items() if not link],
+        }
 
     @staticmethod
     def title_builder(
@@ -310,6 +595,25 @@ class ScrapyCrawlerPipeline(object):
         yield new_url
 
     def process_item(self, item: Item, spider: Spider) -> Item:
+        """Convert the item (see `convert_item`) and record the time spent in the
+        stats.
+
+        :param GeoRdpItem item: output item to process
+        :param Spider spider: Scrapy spider which is used
+
+        :return: item passed
+        :rtype: Item
+        """
+        start = perf_counter()
+        item = self.convert_item(item, spider)
+        if self.stats:
+            duration = perf_counter() - start
+            self.stats.inc_value("pipeline/process_item_seconds", duration)
+            self.stats.inc_value("pipeline/process_item_count")
+            self.stats.max_value("pipeline/process_item_max_seconds", duration)
+        return item
+
+    def convert_item(self, item: Item, spider: Spider) -> Item:
         """Process each item output by a spider. It performs these steps:
 
             1. Extract date handling different formats
@@ -324,6 +628,9 @@ class ScrapyCrawlerPipeline(object):
         """
         # -- Common
 
+        # heavy modules, imported only once a spider runs
+        from geotribu_scraper.markdown_converter import html_to_markdown
+
         # category
         if item.get("kind") in ("art", "tuto"):
             category_long = "articles"
@@ -374,11 +681,7 @@ class ScrapyCrawlerPipeline(object):
                         category_long,
                         item_date_clean.strftime("%Y"),
                         item_date_clean.strftime("%Y-%m-%d"),
-                        slugify(
-                            item.get("title"),
-                            separator="_",
-                            stopwords=["du", "dans", "le", "la"],
-                        ),
+                        slugify_title(item.get("title")),
                     )
                 )
             else:
@@ -394,7 +697,30 @@ class ScrapyCrawlerPipeline(object):
                 "{}_{}.md".format(item.get("kind"), item_date_clean)
             )
 
-        out_file.parent.mkdir(parents=True, exist_ok=True)
+        # avoid overwriting another content written to the same path in this run
+        out_file_expected = out_file
+        count_collisions = len(self.paths_allocator.collisions)
+        out_file = self.paths_allocator.allocate(
+            out_file=out_file_expected,
+            legacy_node=item_legacy_node,
+            url=item.get("url_full"),
+        )
+        if len(self.paths_allocator.collisions) > count_collisions:
+            if self.stats:
+                self.stats.inc_value("output_paths/collisions", spider=spider)
+            self.MAPPING_REDIRECTIONS.append(
+                "# collision: {} already used, node {} written to {}\n".format(
+                    out_file_expected.relative_to(folder_output).as_posix(),
+                    item_legacy_node,
+                    out_file.relative_to(folder_output).as_posix(),
+                )
+            )
+
+        # no folder to create with the git backend
+        if self.git_export is None:
+            out_file.parent.mkdir(parents=True, exist_ok=True)
+
+        page_images = self.page_images(item, out_file)
 
         # add URLS to redirections mapping
         self.MAPPING_REDIRECTIONS.append(
@@ -403,7 +729,9 @@ class ScrapyCrawlerPipeline(object):
 
         # introduction
         if item.get("intro"):
-            intro_clean = self.process_content(md(item.get("intro")))
+            intro_clean = self.process_content(
+                html_to_markdown.convert_fragments([item.get("intro")])[0], page_images
+            )
         else:
             intro_clean = ""
 
@@ -411,7 +739,7 @@ class ScrapyCrawlerPipeline(object):
         author = item.get("author")
 
         # YAML front-matter
-        yaml_frontmatter = self.yaml_frontmatter_as_str(
+        frontmatter = self.frontmatter_fields(
             author=author.get("name"),
             category=category_long,
             introduction=intro_clean,
@@ -420,6 +748,7 @@ class ScrapyCrawlerPipeline(object):
             tags=item.get("tags"),
             legacy_content_node=item_legacy_node,
         )
+        yaml_frontmatter = dump_frontmatter(frontmatter)
 
         # -- Specific
         if isinstance(item, GeoRdpItem):
@@ -428,7 +757,7 @@ class ScrapyCrawlerPipeline(object):
             )
 
             # out_item_md = Path(item.get("title"))
-            with out_file.open(mode="w", encoding="UTF8") as out_item_as_md:
+            with StringIO() as out_item_as_md:
                 # write YAMl front-matter
                 out_item_as_md.write(yaml_frontmatter)
                 out_item_as_md.write("---\n\n")
@@ -455,19 +784,37 @@ class ScrapyCrawlerPipeline(object):
                     "News sections in this RDP: {}".format(" | ".join(sections))
                 )
 
+                # news contents of the whole RDP are converted at once
+                news_contents_md = iter(
+                    html_to_markdown.convert_fragments(
+                        [
+                            element
+                            for news_list in item.get("news_details").values()
+                            for news in news_list
+                            for element in news[2]
+                        ]
+                    )
+                )
+
                 for k, v in item.get("news_details").items():
                     # insert section
-                    out_item_as_md.write("\n## {}\n".format(md(k)))
+                    out_item_as_md.write(
+                        "\n## {}\n".format(html_to_markdown.convert(k))
+                    )
 
                     # parse news details
                     for news in v:
                         # news title
                         if news[0]:
-                            out_item_as_md.write("### {}\n".format(md(news[0])))
+                            out_item_as_md.write(
+                                "### {}\n".format(html_to_markdown.convert(news[0]))
+                            )
 
                         # news thumbnail
                         if news[1]:
-                            img_clean = self.process_content(md(news[1]))
+                            img_clean = self.process_content(
+                                html_to_markdown.convert(news[1]), page_images
+                            )
                             out_item_as_md.write(
                                 "\n{}{}\n\n".format(
                                     img_clean, "{: .img-rdp-news-thumb }"
@@ -476,16 +823,24 @@ class ScrapyCrawlerPipeline(object):
 
                         # news content
                         for element in news[2]:
+                            element_md = next(news_contents_md)
                             # exception for iframes
                             if element.startswith("<iframe "):
                                 news_detail_img_clean = "{}\n".format(element)
                             else:
                                 news_detail_img_clean = self.process_content(
-                                    md(element, strip=["iframe"])
+                                    element_md, page_images
                                 )
 
                             out_item_as_md.write("{}\n".format(news_detail_img_clean))
 
+                document = out_item_as_md.getvalue()
+                self.write_output(out_file, document, date=item_date_clean)
+                self.write_images_manifest(out_file, item_legacy_node, page_images)
+                self.send_document(
+                    out_file, document, yaml_frontmatter, frontmatter, item, spider
+                )
+
             return item
         elif isinstance(item, ArticleItem):
             logging.debug(
@@ -495,7 +850,7 @@ class ScrapyCrawlerPipeline(object):
             )
 
             # out_item_md = Path(item.get("title"))
-            with out_file.open(mode="w", encoding="UTF8") as out_item_as_md:
+            with StringIO() as out_item_as_md:
                 if item.get("kind") == "art":
                     category_long = "articles"
                 else:
@@ -541,13 +896,16 @@ class ScrapyCrawlerPipeline(object):
                 out_item_as_md.write("{}\n\n----\n".format(intro_clean.strip()))
 
                 # corps
-                for element in item.get("body"):
+                body = item.get("body")
+                for element, element_md in zip(
+                    body, html_to_markdown.convert_fragments(body)
+                ):
                     # exception for iframes
                     if element.startswith("<iframe "):
                         body_element_clean = "\n{}\n".format(element)
                     else:
                         body_element_clean = self.process_content(
-                            md(element, heading_style="ATX")
+                            element_md, page_images
                         )
 
                     final_body_txt = ""
@@ -571,39 +929,188 @@ class ScrapyCrawlerPipeline(object):
                         thumb_url = author.get("thumbnail").split("?")[0]
 
                         # write output
-                        img_clean = self.process_content(thumb_url)
+                        img_clean = links_rewriter.rewrite_src(thumb_url, page_images)
                         out_item_as_md.write(
                             "![Portait de {}]({}){}\n".format(
-                                md(author.get("name")),
-                                md(img_clean),
+                                html_to_markdown.convert(author.get("name")),
+                                html_to_markdown.convert(img_clean),
                                 "{: .img-rdp-news-thumb }",
                             )
                         )
                         out_item_as_md.write(
                             "**{}**\n\n".format(
-                                self.process_content(md(author.get("name")))
+                                self.process_content(
+                                    html_to_markdown.convert(author.get("name"))
+                                )
                             )
                         )
 
-                        for author_d in author.get("description"):
+                        for author_d in html_to_markdown.convert_fragments(
+                            author.get("description")
+                        ):
                             out_item_as_md.write(
-                                "{}".format(self.process_content(md(author_d)))
+                                "{}".format(self.process_content(author_d, page_images))
                             )
 
+                document = out_item_as_md.getvalue()
+                self.write_output(out_file, document, date=item_date_clean)
+                self.write_images_manifest(out_file, item_legacy_node, page_images)
+                self.send_document(
+                    out_file, document, yaml_frontmatter, frontmatter, item, spider
+                )
+
             return item
 
 
+class SearchIndexPipeline(object):
+    """Build a full-text search index (MkDocs search compatible) from the markdown
+    documents rendered by ScrapyCrawlerPipeline, which must be enabled too. Documents
+    are received with the `document_rendered` signal. The index is written once, when
+    the spider is closed."""
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        s = cls()
+        crawler.signals.connect(s.document_rendered, signal=document_rendered)
+        return s
+
+    def open_spider(self, spider):
+        self.search_index = SearchIndexBuilder(
+            max_postings=spider.settings.getint("SEARCH_INDEX_MAX_POSTINGS", 500000)
+        )
+        self.indexed_locations = set()
+
+    def close_spider(self, spider):
+        self.search_index.write(
+            folder_output
+            / Path("search_index_{}.json".format(spider_output_name(spider)))
+        )
+
+    def document_rendered(
+        self, path: str, frontmatter: dict, body: str, item: Item, spider: Spider
+    ):
+        # location as served by MkDocs with directory URLs
+        location = "{}/".format(Path(path).with_suffix("").as_posix())
+        if location in self.indexed_locations:
+            logging.debug("Already indexed: {}".format(location))
+            return
+        self.indexed_locations.add(location)
+
+        self.search_index.add_document(
+            location=location,
+            title=frontmatter.get("title", item.get("title")),
+            tags=frontmatter.get("tags", item.get("tags")),
+            description=frontmatter.get("description", ""),
+            body=body,
+        )
+
+
+class PackedExportPipeline(object):
+    """Pack every markdown document rendered by ScrapyCrawlerPipeline, which must be
+    enabled too, into a single SQLite file with random access by legacy node.
+    Documents are received with the `document_rendered` signal. Documents of a
+    previous run which were not produced by this one are deleted when the spider is
+    closed."""
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        s = cls()
+        crawler.signals.connect(s.document_rendered, signal=document_rendered)
+        return s
+
+    def open_spider(self, spider):
+        self.packed_corpus = PackedCorpus(
+            db_path=folder_output
+            / Path("packed_{}.sqlite".format(spider_output_name(spider)))
+        )
+        self.packed_paths = set()
+
+    def close_spider(self, spider):
+        stale = self.packed_corpus.prune(self.packed_paths)
+        logging.info(
+            "Packed export: {} documents into {} ({} not produced by this run "
+            "deleted)".format(
+                len(self.packed_corpus), self.packed_corpus.db_path, stale
+            )
+        )
+        self.packed_corpus.close()
+
+    def document_rendered(
+        self, path: str, frontmatter: dict, body: str, item: Item, spider: Spider
+    ):
+        self.packed_paths.add(path)
+        self.packed_corpus.add(
+            path=path, frontmatter=frontmatter, body=body, kind=item.get("kind")
+        )
+
+
 class JsonWriterPipeline(object):
+    """Write the items as JSON lines into `items_<spider>.jl`, with a sidecar index of
+    the byte offset and length of each item (see `geotribu_scraper.items_index`)."""
+
     def open_spider(self, spider):
-        out_filename = folder_output / Path("items.jl")
-        self.file = out_filename.open(mode="w", encoding="UTF8")
+        folder_output.mkdir(exist_ok=True, parents=True)
+        out_filename = folder_output / Path(
+            "items_{}.jl".format(spider_output_name(spider))
+        )
+        # binary mode: offsets are byte positions
+        self.file = out_filename.open(mode="wb")
+        self.index_file = index_path_for(out_filename).open(mode="w", encoding="UTF8")
+        self.offset = 0
 
     def close_spider(self, spider):
         self.file.close()
+        self.index_file.close()
 
     def process_item(self, item, spider):
-        line = json.dumps(dict(item)) + "\n"
+        line = (json.dumps(dict(item)) + "\n").encode("UTF8")
         self.file.write(line)
+        self.index_file.write(
+            json.dumps(index_entry(item, self.offset, len(line), type(item).__name__))
+            + "\n"
+        )
+        self.offset += len(line)
+        return item
+
+
+class JsonLinesExportPipeline(object):
+    """Export the items as JSON lines in UTF-8, into compressed files written by
+    batches and rotated by size (see `geotribu_scraper.jsonlines_export`)."""
+
+    def open_spider(self, spider):
+        settings = spider.settings
+        self.writer = JsonLinesWriter(
+            base_path=Path(
+                settings.get("JSONLINES_EXPORT_FILE").format(
+                    spider=spider_output_name(spider)
+                )
+            ),
+            compression=settings.get("JSONLINES_EXPORT_COMPRESSION") or None,
+            level=settings.getint("JSONLINES_EXPORT_LEVEL") or None,
+            batch_size=settings.getint("JSONLINES_EXPORT_BATCH_SIZE", 100),
+            max_bytes=settings.getint("JSONLINES_EXPORT_MAX_BYTES"),
+            fast_json=settings.getbool("JSONLINES_EXPORT_FAST_JSON", True),
+        )
+
+    def close_spider(self, spider):
+        self.writer.close()
+        stats = spider.crawler.stats
+        stats.set_value("jsonlines_export/items", self.writer.count_items)
+        stats.set_value("jsonlines_export/bytes_in", self.writer.bytes_in)
+        stats.set_value("jsonlines_export/bytes_out", self.writer.bytes_out)
+        stats.set_value("jsonlines_export/files", len(self.writer.paths))
+        logging.info(
+            "JSON lines export: {} items, {} bytes written into {} file(s) "
+            "({} bytes before compression).".format(
+                self.writer.count_items,
+                self.writer.bytes_out,
+                len(self.writer.paths),
+                self.writer.bytes_in,
+            )
+        )
+
+    def process_item(self, item: Item, spider: Spider) -> Item:
+        self.writer.write(dict(item))
         return item
 
 
@@ -649,16 +1156,13 @@ class CustomImagesPipeline(ImagesPipeline):
         return "thumbs/%s/%s.jpg" % (thumb_id, image_guid)
 
     def get_media_requests(self, item, info):
-        """Retrieve meta from request
+        """Request the images of the item (`image_urls`), except the inline ones
+        (data: URIs...). Files already stored are not downloaded again (see
+        IMAGES_EXPIRES).
 
-        :param [type] item: [description]
-        :param [type] info: [description]
+        :param Item item: item processed
+        :param info: media pipeline spider info
         """
-        if "images" in item:
-            for image_url, img_name in item["images"].iteritems():
-                if not path.exists(path.join(item["images_path"], img_name)):
-                    request = Request(url=image_url)
-                    request.meta["img_name"] = img_name
-                    request.meta["this_prod_img_folder"] = item["img_name_here"]
-                    request.dont_filter = True
-                    yield request
+        for image_url in item.get(self.images_urls_field) or []:
+            if image_url.startswith(("http://", "https://")):
+                yield Request(url=image_url)
@@ -0,0 +1,129 @@
+#! python3  # noqa: E265
+
+"""
+    Token buckets shared by all the processes of a machine, stored into a SQLite
+    database, so that several crawls against a same host (one per spider, or
+    shards) share a single requests-per-second budget.
+
+    Tokens are not reserved ahead: a request takes a token if one is available, else
+    it is told when the next one will be and tries again then. Requests cancelled
+    while waiting (spider closed) do not waste the budget of the other processes.
+"""
+
+# #############################################################################
+# ########## Libraries #############
+# ##################################
+
+# Standard library
+import sqlite3
+import time
+from pathlib import Path
+
+# #############################################################################
+# ########## Globals ###############
+# ##################################
+
+SQL_CREATE = """
+CREATE TABLE IF NOT EXISTS buckets (
+    host TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated REAL NOT NULL
+);
+"""
+
+
+# #############################################################################
+# ########## Classes ###############
+# ##################################
+class SharedTokenBucket(object):
+    """Token buckets by host, refilled at `rate` tokens per second up to `burst`
+    tokens. Every change is made in an immediate transaction, which locks the
+    database against the other processes.
+
+    :param Path db_path: path to the SQLite database, shared by the processes
+    :param float rate: tokens (requests) per second
+    :param float burst: size of the buckets. Defaults to 1.
+    :param float timeout: maximum time to wait for the database lock. Defaults to 30.
+    """
+
+    def __init__(
+        self, db_path: Path, rate: float, burst: float = 1, timeout: float = 30
+    ):
+        if rate <= 0:
+            raise ValueError("Rate must be positive: {}".format(rate))
+        self.db_path = Path(db_path)
+        self.rate = rate
+        self.burst = max(burst, 1)
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # autocommit mode: transactions are explicit
+        self.connection = sqlite3.connect(
+            str(self.db_path), timeout=timeout, isolation_level=None
+        )
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(SQL_CREATE)
+
+    def close(self):
+        self.connection.close()
+
+    def _update(self, host: str, change) -> float:
+        """Refill the bucket of a host, apply a change to its tokens and save it, in
+        a single transaction.
+
+        :param str host: host name
+        :param change: function taking and returning the count of tokens
+
+        :return: new count of tokens, negative after a penalty
+        :rtype: float
+        """
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            row = self.connection.execute(
+                "SELECT tokens, updated FROM buckets WHERE host = ?", (host,)
+            ).fetchone()
+            if row is None:
+                tokens = self.burst
+            else:
+                tokens = min(self.burst, row[0] + (now - row[1]) * self.rate)
+            tokens = change(tokens)
+            self.connection.execute(
+                "INSERT OR REPLACE INTO buckets (host, tokens, updated) "
+                "VALUES (?, ?, ?)",
+                (host, tokens, now),
+            )
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            raise
+        self.connection.execute("COMMIT")
+        return tokens
+
+    def acquire(self, host: str) -> float:
+        """Take a token for a request to a host, if one is available.
+
+        :param str host: host name
+
+        :return: 0 if a token was taken, else the delay in seconds before the next
+            token is available (to try again then)
+        :rtype: float
+        """
+        delay = 0.0
+
+        def take(tokens: float) -> float:
+            nonlocal delay
+            if tokens >= 1:
+                return tokens - 1
+            delay = (1 - tokens) / self.rate
+            return tokens
+
+        self._update(host, take)
+        return delay
+
+    def penalize(self, host: str, delay: float):
+        """Hold back every process for a host, e.g. after a 429 response: no token
+        is available before `delay` seconds.
+
+        :param str host: host name
+        :param float delay: delay in seconds
+        """
+        self._update(host, lambda tokens: min(tokens, -delay * self.rate))
@@ -0,0 +1,303 @@
+#! python3  # noqa: E265
+
+"""
+    Full-text search index built incrementally from the generated markdown documents.
+
+    The output is a JSON file compatible with the MkDocs search plugin
+    (`config` and `docs` keys), completed with a compact inverted index
+    (`postings` key) built with French stemming and stop-words.
+"""
+
+# #############################################################################
+# ########## Libraries #############
+# ##################################
+
+# Standard library
+import heapq
+import json
+import logging
+import re
+import tempfile
+from collections import Counter
+from pathlib import Path
+from typing import Iterator, List, Tuple
+
+# #############################################################################
+# ########## Globals ###############
+# ##################################
+
+# same list as lunr-languages for French
+FRENCH_STOP_WORDS = frozenset(
+    "ai aie aient aies ait as au aura aurai auraient aurais aurait auras aurez "
+    "auriez aurions aurons auront aux avaient avais avait avec avez aviez avions "
+    "avons ayant ayez ayons c ce ceci celà ces cet cette d dans de des du elle en "
+    "es est et eu eue eues eurent eus eusse eussent eusses eussiez eussions eut "
+    "eûmes eût eûtes furent fus fusse fussent fusses fussiez fussions fut fûmes "
+    "fût fûtes ici il ils j je l la le les leur leurs lui m ma mais me mes moi mon "
+    "même n ne nos notre nous on ont ou par pas pour qu que quel quelle quelles "
+    "quels qui s sa sans se sera serai seraient serais serait seras serez seriez "
+    "serions serons seront ses soi soient sois soit sommes son sont soyez soyons "
+    "suis sur t ta te tes toi ton tu un une vos votre vous y à étaient étais était "
+    "étant étiez étions été étée étées étés êtes".split()
+)
+
+# fields of a document and their flag in postings
+SEARCH_FIELDS = {"title": 1, "tags": 2, "description": 4, "text": 8}
+
+# light French suffixes, longest first
+FRENCH_SUFFIXES = (
+    "issements",
+    "issement",
+    "atrices",
+    "ements",
+    "atrice",
+    "ateurs",
+    "ations",
+    "ement",
+    "ateur",
+    "ation",
+    "ismes",
+    "istes",
+    "ances",
+    "ences",
+    "isme",
+    "iste",
+    "ance",
+    "ence",
+    "euses",
+    "euse",
+    "ités",
+    "ité",
+    "ives",
+    "ive",
+    "ifs",
+    "if",
+    "eux",
+    "aux",
+    "es",
+    "s",
+    "x",
+    "e",
+)
+
+RE_MD_IMAGES_LINKS = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+RE_HTML_TAGS = re.compile(r"<[^>]+>")
+RE_MD_ATTRIBUTES = re.compile(r"\{:[^}]*\}")
+RE_MD_MARKUP = re.compile(r"[#*_`>|~\\]+")
+RE_WORDS = re.compile(r"\w+", flags=re.UNICODE)
+RE_WHITESPACES = re.compile(r"\s+")
+
+
+# #############################################################################
+# ########## Functions #############
+# ##################################
+
+
+def stem_fr(word: str) -> str:
+    """Light French stemmer: removes the most frequent inflectional and
+    derivational suffixes, keeping at least 3 characters.
+
+    :param str word: lowercased word
+
+    :return: stem
+    :rtype: str
+    """
+    if len(word) < 4 or word.isdigit():
+        return word
+
+    for suffix in FRENCH_SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[: -len(suffix)]
+
+    return word
+
+
+def markdown_to_text(in_md_str: str) -> str:
+    """Strip markdown and HTML markup to get the plain text to index.
+
+    :param str in_md_str: markdown content
+
+    :return: plain text
+    :rtype: str
+    """
+    out_text = RE_MD_IMAGES_LINKS.sub(r"\1", in_md_str)
+    out_text = RE_HTML_TAGS.sub(" ", out_text)
+    out_text = RE_MD_ATTRIBUTES.sub(" ", out_text)
+    out_text = RE_MD_MARKUP.sub(" ", out_text)
+    return RE_WHITESPACES.sub(" ", out_text).strip()
+
+
+def tokenize_fr(in_text: str) -> Iterator[str]:
+    """Split text into stemmed terms, skipping French stop-words.
+
+    :param str in_text: plain text
+
+    :return: terms
+    :rtype: Iterator[str]
+    """
+    for word in RE_WORDS.findall(in_text.lower()):
+        if len(word) < 2 or word in FRENCH_STOP_WORDS:
+            continue
+        yield stem_fr(word)
+
+
+# #############################################################################
+# ########## Classes ###############
+# ##################################
+class SearchIndexBuilder(object):
+    """Build a full-text inverted index one document at a time. To keep memory
+    bounded, postings are spilled to sorted run files once their count exceeds
+    `max_postings` and are merged when the index is written.
+
+    :param int max_postings: maximum count of postings kept in memory
+    :param str lang: language declared in the MkDocs search config
+    """
+
+    def __init__(self, max_postings: int = 500000, lang: str = "fr"):
+        self.max_postings = max_postings
+        self.lang = lang
+        self.count_docs = 0
+        self.count_postings = 0
+        self.postings: dict = {}
+        self.runs: List[Path] = []
+
+        self.tmp_dir = tempfile.TemporaryDirectory(prefix="geotribu_search_")
+        self.docs_spool = (Path(self.tmp_dir.name) / "docs.jl").open(
+            mode="w", encoding="UTF8"
+        )
+
+    def add_document(
+        self, location: str, title: str, tags: list, description: str, body: str
+    ) -> int:
+        """Index a document.
+
+        :param str location: document location, relative to the site root
+        :param str title: document title
+        :param list tags: document keywords
+        :param str description: document description
+        :param str body: markdown body
+
+        :return: document id in the index
+        :rtype: int
+        """
+        doc_id = self.count_docs
+        self.count_docs += 1
+
+        text = markdown_to_text(body)
+        self.docs_spool.write(
+            json.dumps(
+                {"location": location, "title": title, "text": text},
+                ensure_ascii=False,
+            )
+            + "\n"
+        )
+
+        # term -> [fields flags, term frequency]
+        terms_stats: dict = {}
+        for field_name, field_value in (
+            ("title", title or ""),
+            ("tags", " ".join(tags or [])),
+            ("description", description or ""),
+            ("text", text),
+        ):
+            for term, frequency in Counter(tokenize_fr(field_value)).items():
+                term_stats = terms_stats.setdefault(term, [0, 0])
+                term_stats[0] |= SEARCH_FIELDS.get(field_name)
+                term_stats[1] += frequency
+
+        for term, (fields_flags, frequency) in terms_stats.items():
+            self.postings.setdefault(term, []).append((doc_id, fields_flags, frequency))
+        self.count_postings += len(terms_stats)
+
+        if self.count_postings >= self.max_postings:
+            self._spill()
+
+        return doc_id
+
+    def _spill(self):
+        """Write in-memory postings into a sorted run file and reset them."""
+        run_path = Path(self.tmp_dir.name) / "run_{}.tsv".format(len(self.runs))
+        with run_path.open(mode="w", encoding="UTF8") as out_run:
+            for term in sorted(self.postings):
+                out_run.write(
+                    "{}\t{}\n".format(term, json.dumps(self.postings.get(term)))
+                )
+        logging.debug(
+            "Search index: {} postings spilled to {}".format(
+                self.count_postings, run_path
+            )
+        )
+        self.runs.append(run_path)
+        self.postings = {}
+        self.count_postings = 0
+
+    @staticmethod
+    def _read_run(run_path: Path) -> Iterator[Tuple[str, list]]:
+        with run_path.open(mode="r", encoding="UTF8") as in_run:
+            for line in in_run:
+                term, postings = line.rstrip("\n").split("\t", 1)
+                yield term, json.loads(postings)
+
+    def _merged_postings(self) -> Iterator[Tuple[str, list]]:
+        """Merge spilled runs and in-memory postings, term by term. Runs are spilled
+        in document order so postings stay sorted by document id."""
+        in_memory = ((term, self.postings.get(term)) for term in sorted(self.postings))
+        sources = [self._read_run(run) for run in self.runs] + [in_memory]
+
+        current_term, current_postings = None, []
+        for term, postings in heapq.merge(*sources, key=lambda x: x[0]):
+            if term != current_term:
+                if current_term is not None:
+                    yield current_term, current_postings
+                current_term, current_postings = term, []
+            current_postings.extend(postings)
+
+        if current_term is not None:
+            yield current_term, current_postings
+
+    def write(self, out_path: Path):
+        """Write the index as a compact JSON file and clean temporary files.
+
+        :param Path out_path: output JSON file
+        """
+        self.docs_spool.close()
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+
+        with out_path.open(mode="w", encoding="UTF8") as out_index:
+            out_index.write(
+                '{{"config":{},"docs":['.format(
+                    json.dumps(
+                        {
+                            "lang": [self.lang],
+                            "separator": r"[\s\-]+",
+                            "pipeline": ["stopWordFilter", "stemmer"],
+                        },
+                        separators=(",", ":"),
+                    )
+                )
+            )
+            with (Path(self.tmp_dir.name) / "docs.jl").open(
+                mode="r", encoding="UTF8"
+            ) as in_docs:
+                for i, line in enumerate(in_docs):
+                    out_index.write("{}{}".format("," if i else "", line.rstrip("\n")))
+
+            out_index.write(
+                '],"fields":{},"postings":{{'.format(json.dumps(SEARCH_FIELDS))
+            )
+            for i, (term, postings) in enumerate(self._merged_postings()):
+                out_index.write(
+                    "{}{}:{}".format(
+                        "," if i else "",
+                        json.dumps(term, ensure_ascii=False),
+                        json.dumps(postings, separators=(",", ":")),
+                    )
+                )
+            out_index.write("}}")
+
+        self.tmp_dir.cleanup()
+        logging.info(
+            "Search index written: {} documents into {}".format(
+                self.count_docs, out_path
+            )
+        )
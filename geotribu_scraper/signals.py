@@ -0,0 +1,20 @@
+#! python3  # noqa: E265
+
+"""
+    Custom signals of the project, sent through the signals manager of the crawler.
+
+    See: https://docs.scrapy.org/en/latest/topics/signals.html
+"""
+
+# #############################################################################
+# ########## Globals ###############
+# ##################################
+
+# markdown document rendered by ScrapyCrawlerPipeline, for every converted item,
+# whether it is written or not (unchanged file, git backend). Arguments:
+#   - path: path of the document, relative to the output folder (POSIX)
+#   - frontmatter: front-matter fields (dict)
+#   - body: markdown body, after the front-matter
+#   - item: converted item
+#   - spider: running spider
+document_rendered = object()
@@ -0,0 +1,213 @@
+#! python3  # noqa: E265
+
+# #############################################################################
+# ########## Libraries #############
+# ##################################
+
+# Standard library
+import logging
+from pathlib import Path
+from urllib.parse import urlparse
+
+# 3rd party library
+from scrapy import Request, Spider, signals
+from scrapy.http.response import Response
+from scrapy.utils.project import data_path
+
+
+# #############################################################################
+# ########## Classes ###############
+# ##################################
+class GeotribuBaseSpider(Spider):
+    """Common behavior of Geotribu spiders. Not a spider by itself (no name).
+
+    Start URLs are built from the `DEFAULT_URL_BASE` setting of the running
+    crawler, once the spider is opened, instead of loading project settings when
+    the module is imported.
+
+    With `HTTPCACHE_REPLAY_ENABLED`, the pages stored in the HTTP cache are sent
+    straight to the content callback instead (see
+    `geotribu_scraper.http_cache_replay`). With `WAYBACK_CDX_SOURCE`, the content
+    pages listed in a Wayback Machine CDX are requested directly, without crawling
+    the listing pages (see `geotribu_scraper.wayback`).
+
+    With `PARSE_POOL_ENABLED`, content pages are parsed in worker processes (see
+    `geotribu_scraper.parse_pool`). With `PARSE_CACHE_ENABLED`, the fields extracted
+    from a page are stored and unchanged pages are not parsed again by the next runs
+    (see `geotribu_scraper.parse_cache`).
+    """
+
+    # start pages, relative to DEFAULT_URL_BASE
+    start_paths: list = []
+    # name of the callback parsing a content page
+    content_callback: str = "parse"
+    # regular expressions matching the content URLs in a Wayback CDX listing
+    wayback_url_patterns: list = []
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        spider.parse_pool = None
+        if crawler.settings.getbool("PARSE_POOL_ENABLED"):
+            from geotribu_scraper.parse_pool import ParsePool
+
+            spider.parse_pool = ParsePool.from_settings(
+                crawler.settings, stats=crawler.stats
+            )
+            crawler.signals.connect(
+                spider.parse_pool.close, signal=signals.spider_closed
+            )
+        spider.parse_cache = None
+        if crawler.settings.getbool("PARSE_CACHE_ENABLED"):
+            from geotribu_scraper.extraction import EXTRACTION_VERSION
+            from geotribu_scraper.parse_cache import ParseCache
+
+            spider.parse_cache = ParseCache.from_settings(
+                crawler.settings,
+                spider=spider.name,
+                version=EXTRACTION_VERSION,
+                stats=crawler.stats,
+            )
+            crawler.signals.connect(
+                spider.parse_cache.close, signal=signals.spider_closed
+            )
+        return spider
+
+    @property
+    def output_name(self) -> str:
+        """Name used in the output filenames (indexes, reports...): the spider name,
+        suffixed with the shard when the HTTP cache replay is split.
+        """
+        shards = self.settings.getint("HTTPCACHE_REPLAY_SHARDS", 1)
+        if self.settings.getbool("HTTPCACHE_REPLAY_ENABLED") and shards > 1:
+            return "{}_shard{}of{}".format(
+                self.name, self.settings.getint("HTTPCACHE_REPLAY_SHARD"), shards
+            )
+        return self.name
+
+    def start_requests(self):
+        if self.settings.getbool("HTTPCACHE_REPLAY_ENABLED"):
+            yield from self.replay_requests()
+            return
+        if self.settings.get("WAYBACK_CDX_SOURCE"):
+            yield from self.wayback_requests()
+            return
+
+        url_base = self.settings.get("DEFAULT_URL_BASE")
+        for start_path in self.start_paths:
+            yield Request(url_base + start_path, dont_filter=True)
+
+    def extract(self, response: Response, extractor, item_class):
+        """Run an extraction function of `geotribu_scraper.extraction` on a content
+        page and wrap its result into an item, in the parse pool if enabled. Pages
+        found in the parse cache are not parsed.
+
+        :param Response response: content page
+        :param extractor: extraction function
+        :param item_class: item class, e.g. GeoRdpItem
+
+        :return: items, or a Deferred fired with them when the parse pool is enabled
+        :rtype: list or Deferred
+        """
+        parse_cache = getattr(self, "parse_cache", None)
+        if parse_cache is not None:
+            key = parse_cache.key(extractor, response)
+            fields = parse_cache.get(key)
+            if fields is not None:
+                return [item_class(fields)]
+
+        def wrap(fields: dict) -> list:
+            if parse_cache is not None:
+                parse_cache.put(key, fields)
+            return [item_class(fields)]
+
+        if getattr(self, "parse_pool", None) is None:
+            return wrap(extractor(response))
+        return self.parse_pool.submit(extractor, response).addCallback(wrap)
+
+    def replay_requests(self):
+        """Yield a request to the content callback for each page of the HTTP cache,
+        except the listing ones (start pages, their pagination and sub-pages).
+        """
+        from geotribu_scraper.http_cache_replay import iter_cached_urls
+
+        url_base = self.settings.get("DEFAULT_URL_BASE")
+        listing_paths = {
+            urlparse(url_base + start_path).path.rstrip("/")
+            for start_path in self.start_paths
+        }
+        listing_prefixes = tuple("{}/".format(path) for path in listing_paths)
+        callback = getattr(self, self.content_callback)
+
+        for url in iter_cached_urls(
+            cache_dir=Path(data_path(self.settings.get("HTTPCACHE_DIR"))),
+            spider_name=self.name,
+            use_gzip=self.settings.getbool("HTTPCACHE_GZIP"),
+            shard=self.settings.getint("HTTPCACHE_REPLAY_SHARD"),
+            shards=self.settings.getint("HTTPCACHE_REPLAY_SHARDS", 1),
+        ):
+            path = urlparse(url).path.rstrip("/")
+            if path in listing_paths or path.startswith(listing_prefixes):
+                continue
+            yield Request(url, callback=callback, dont_filter=True)
+
+    def wayback_requests(self):
+        """Read the Wayback CDX listing set in `WAYBACK_CDX_SOURCE`: a local file, or
+        the URL of a CDX endpoint which is requested first.
+        """
+        source = self.settings.get("WAYBACK_CDX_SOURCE")
+        if source.startswith(("http://", "https://")):
+            yield Request(source, callback=self.parse_cdx, dont_filter=True)
+        else:
+            from geotribu_scraper.wayback import read_cdx_file
+
+            yield from self.schedule_snapshots(read_cdx_file(Path(source)))
+
+    def parse_cdx(self, response):
+        yield from self.schedule_snapshots(response.text)
+
+    def schedule_snapshots(self, cdx_text: str):
+        """Request the best snapshot of each content page listed in a CDX.
+
+        :param str cdx_text: CDX listing content
+        """
+        from geotribu_scraper.wayback import parse_cdx, select_snapshots, snapshot_url
+
+        url_patterns = self.settings.getdict("WAYBACK_URL_PATTERNS").get(
+            self.name, self.wayback_url_patterns
+        )
+        if not url_patterns:
+            logging.warning(
+                "No Wayback URL pattern for {}: nothing to crawl.".format(self.name)
+            )
+            return
+
+        records = parse_cdx(cdx_text)
+        snapshots = select_snapshots(
+            records=records,
+            url_patterns=url_patterns,
+            target_timestamp=self.settings.get("WAYBACK_TARGET_TIMESTAMP"),
+        )
+        self.crawler.stats.inc_value("wayback/cdx_records", len(records))
+        self.crawler.stats.inc_value("wayback/snapshots", len(snapshots))
+        logging.info(
+            "{} snapshots selected out of {} CDX records.".format(
+                len(snapshots), len(records)
+            )
+        )
+
+        callback = getattr(self, self.content_callback)
+        wayback_base = self.settings.get("WAYBACK_BASE_URL")
+        for record in snapshots:
+            yield Request(
+                snapshot_url(record, wayback_base),
+                callback=callback,
+                meta={"wayback_record": record},
+            )
+
+
+# #############################################################################
+# ##### Main #######################
+# ##################################
+if __name__ == "__main__":
+    pass
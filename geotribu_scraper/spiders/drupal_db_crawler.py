@@ -0,0 +1,210 @@
+#! python3  # noqa: E265
+
+# #############################################################################
+# ########## Libraries #############
+# ##################################
+
+# Standard library
+import logging
+from datetime import datetime
+from urllib.parse import urljoin, urlparse
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:  # Python < 3.9: dates are computed in the local time zone
+    ZoneInfo = None
+
+# 3rd party library
+from scrapy import Request
+from scrapy.exceptions import CloseSpider
+from scrapy.selector import Selector
+
+# project
+from geotribu_scraper.drupal_db import DrupalDatabase, autop
+from geotribu_scraper.extraction import extract_rdp_intro, extract_rdp_news
+from geotribu_scraper.items import ArticleItem, GeoRdpItem
+from geotribu_scraper.spiders.base_crawler import GeotribuBaseSpider
+from geotribu_scraper.utils import MONTHS_NAMES_MATRIX
+
+
+# #############################################################################
+# ########## Classes ###############
+# ##################################
+class DrupalDatabaseSpider(GeotribuBaseSpider):
+    """Export the contents straight from the Drupal 7 database set in
+    `DRUPAL_DB_SOURCE`, without crawling the website. Items are the same as the
+    ones of the other spiders, so they go through the same pipelines.
+    """
+
+    name = "geotribu_drupal_db"
+
+    def start_requests(self):
+        # a single local request, just to hand over to the engine
+        yield Request(
+            "data:,",
+            callback=self.parse_database,
+            dont_filter=True,
+            meta={"dont_obey_robotstxt": True, "dont_cache": True},
+        )
+
+    def parse_database(self, response):
+        """Read the published nodes from the database and yield the matching items.
+
+        :param Response response: placeholder response of the start request
+        """
+        source = self.settings.get("DRUPAL_DB_SOURCE")
+        if not source:
+            raise CloseSpider("DRUPAL_DB_SOURCE is not set")
+
+        rdp_types = self.settings.getlist("DRUPAL_DB_RDP_TYPES")
+        article_types = self.settings.getlist("DRUPAL_DB_ARTICLE_TYPES")
+        url_base = self.settings.get("DEFAULT_URL_BASE")
+
+        with DrupalDatabase.open(
+            source, table_prefix=self.settings.get("DRUPAL_DB_TABLE_PREFIX", "")
+        ) as database:
+            for content in database.contents(
+                node_types=rdp_types + article_types,
+                files_url=urljoin(
+                    url_base, self.settings.get("DRUPAL_DB_AUTHOR_PHOTO_PATH")
+                ),
+            ):
+                self.crawler.stats.inc_value(
+                    "drupal_db/nodes/{}".format(content.get("type"))
+                )
+                if content.get("type") in rdp_types:
+                    yield self.build_rdp(content, url_base)
+                else:
+                    yield self.build_article(content, url_base)
+
+    def as_html(self, value: str, text_format: str) -> str:
+        """Apply the line breaks filter to the field value if its text format uses
+        it (see `DRUPAL_DB_AUTOP_FORMATS`).
+
+        :param str value: field value
+        :param str text_format: field text format
+
+        :return: HTML
+        :rtype: str
+        """
+        if value and text_format in self.settings.getlist("DRUPAL_DB_AUTOP_FORMATS"):
+            return autop(value)
+        return value
+
+    def fill_common(self, item, content: dict, url_base: str):
+        """Fill the fields shared by all the items, as the website spiders do.
+
+        :param item: GeoRdpItem or ArticleItem
+        :param dict content: node read from the database
+        :param str url_base: website base URL
+        """
+        item["title"] = content.get("title")
+
+        # jusqu'en 2013, les revues de presse étaient des articles comme les autres
+        if "revue de presse" in content.get("title").lower():
+            item["kind"] = "rdp"
+        else:
+            item["kind"] = "art"
+
+        # relative URL, as in the website links
+        item["url_full"] = urlparse(url_base).path + content.get("alias")
+        item["drupal_node"] = content.get("nid")
+
+        # date de publication, as displayed in the date block of the website
+        timezone = self.settings.get("DRUPAL_DB_TIMEZONE")
+        created = datetime.fromtimestamp(
+            content.get("created"), tz=ZoneInfo(timezone) if ZoneInfo else None
+        )
+        item["published_date"] = (
+            "{:02d}".format(created.day),
+            list(MONTHS_NAMES_MATRIX)[created.month - 1],
+            str(created.year),
+        )
+        item["tags"] = content.get("tags")
+
+    def build_rdp(self, content: dict, url_base: str) -> GeoRdpItem:
+        """Build a revue de presse item from a node.
+
+        :param dict content: node read from the database
+        :param str url_base: website base URL
+
+        :return: item
+        :rtype: GeoRdpItem
+        """
+        logging.info("Start exporting RDP: {}".format(content.get("title")))
+        item = GeoRdpItem()
+        self.fill_common(item, content, url_base)
+
+        body = self.as_html(content.get("body"), content.get("body_format"))
+        rdp = Selector(text="<div>{}</div>".format(body or ""))
+        item["intro"] = extract_rdp_intro(rdp)
+        item["news_sections"] = rdp.css("p.typeNews::text").getall()
+        item["news_details"] = extract_rdp_news(rdp)
+        item["image_urls"] = [
+            urljoin(url_base, i) for i in rdp.css("img").xpath("@src").getall()
+        ]
+
+        # pseudo author to fit others crawlers structure
+        item["author"] = {
+            "thumbnail": "?",
+            "name": "Geotribu",
+            "description": "",
+        }
+
+        return item
+
+    def build_article(self, content: dict, url_base: str) -> ArticleItem:
+        """Build an article item from a node.
+
+        :param dict content: node read from the database
+        :param str url_base: website base URL
+
+        :return: item
+        :rtype: ArticleItem
+        """
+        logging.info("Start exporting ARTICLE: {}".format(content.get("title")))
+        item = ArticleItem()
+        self.fill_common(item, content, url_base)
+
+        intro = self.as_html(content.get("intro"), content.get("intro_format"))
+        body = self.as_html(content.get("body"), content.get("body_format"))
+        item["intro"] = intro or None
+        item["body"] = [body] if body else []
+
+        # images URLS (converted into absolute)
+        item["image_urls"] = [
+            urljoin(url_base, i)
+            for i in Selector(text="<div>{}{}</div>".format(intro or "", body or ""))
+            .css("img")
+            .xpath("@src")
+            .getall()
+        ]
+
+        # author
+        author = content.get("author")
+        if author.get("full_name"):
+            description = self.as_html(
+                author.get("description"), author.get("description_format")
+            )
+            item["author"] = {
+                "thumbnail": author.get("photo") or "?",
+                "name": author.get("full_name"),
+                "description": Selector(text="<div>{}</div>".format(description or ""))
+                .css("p")
+                .getall(),
+            }
+        else:
+            item["author"] = {
+                "thumbnail": "?",
+                "name": author.get("name"),
+                "description": "",
+            }
+
+        return item
+
+
+# #############################################################################
+# ##### Main #######################
+# ##################################
+if __name__ == "__main__":
+    pass
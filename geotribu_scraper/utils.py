@@ -0,0 +1,62 @@
+#! python3  # noqa: E265
+
+"""
+    Light helpers and constants shared by the pipelines, the spiders and the stages
+    working on the generated markdown files. Heavy imports stay inside the functions.
+"""
+
+# #############################################################################
+# ########## Libraries #############
+# ##################################
+
+# Standard library
+from typing import Tuple
+
+# #############################################################################
+# ########## Globals ###############
+# ##################################
+
+# matching matrix between non standardized dates in Drupal and Python ISO months name
+MONTHS_NAMES_MATRIX = {
+    "jan": "janv.",
+    "fév": "févr.",
+    "mar": "mars",
+    "avr": "avr.",
+    "mai": "mai",
+    "juin": "juin",
+    "juil": "juil.",
+    "aoû": "août",
+    "sep": "sept.",
+    "oct": "oct.",
+    "nov": "nov.",
+    "déc": "déc.",
+}
+
+# #############################################################################
+# ########## Functions #############
+# ##################################
+
+
+def split_frontmatter(in_md_str: str) -> Tuple[dict, str]:
+    """Split a markdown document written by the pipeline into its YAML front-matter
+    and its body.
+
+    :param str in_md_str: markdown document, starting with a YAML front-matter
+
+    :return: parsed front-matter (empty if missing) and markdown body
+    :rtype: Tuple[dict, str]
+    """
+    import yaml
+
+    # libyaml bindings, much faster, when PyYAML was built with them
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+    if not in_md_str.startswith("---\n"):
+        return {}, in_md_str
+
+    frontmatter_end = in_md_str.find("\n---\n", 3)
+    if frontmatter_end < 0:
+        return {}, in_md_str
+
+    frontmatter = yaml.load(in_md_str[4:frontmatter_end], Loader=loader) or {}
+    return frontmatter, in_md_str[frontmatter_end + 5 :]
@@ -0,0 +1,273 @@
+#! python3  # noqa: E265
+
+"""
+    Post-crawl validation of the generated markdown files, in a process pool:
+
+    - YAML front-matter: present, parseable, required fields, types, date format
+    - author snippets (`--8<--`) pointing to missing files
+    - legacy URLs (localhost, geotribu.net) left by the replacements
+    - legacy nodes written into several files
+
+    The results are written as a JSON report. The exit code is 1 if anything was
+    found.
+
+    .. code-block:: bash
+
+        python -m geotribu_scraper.validator _output --snippets-base ../website
+"""
+
+# #############################################################################
+# ########## Libraries #############
+# ##################################
+
+# Standard library
+import argparse
+import json
+import logging
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from time import perf_counter
+
+# project
+from geotribu_scraper.frontmatter import FRONTMATTER_SCHEMA
+from geotribu_scraper.replacers import AUTHORS_QUADRIGRAMME
+from geotribu_scraper.utils import split_frontmatter
+
+# #############################################################################
+# ########## Globals ###############
+# ##################################
+
+# front-matter fields which must be set, with their expected type
+REQUIRED_FIELDS = ("authors", "categories", "date", "legacy", "title")
+FIELDS_TYPES = dict(FRONTMATTER_SCHEMA)
+# as written by ScrapyCrawlerPipeline.frontmatter_fields
+DATE_FORMAT = "%Y-%m-%d %H:%M"
+
+RE_SNIPPET = re.compile(r'^--8<--\s+"([^"]+)"', re.MULTILINE)
+# URLs of the legacy website, which should have been replaced
+RE_LEGACY_URL = re.compile(
+    r"https?://(?:localhost|(?:[\w-]+\.)*geotribu\.net)(?::\d+)?[^\s)\]\"'<>]*",
+    re.IGNORECASE,
+)
+
+# #############################################################################
+# ########## Functions #############
+# ##################################
+
+
+def validate_document(path: Path, root: Path) -> dict:
+    """Check a markdown file on its own. Snippet targets and legacy nodes are only
+    collected: they are checked across all the files.
+
+    :param Path path: markdown file
+    :param Path root: output folder, the paths are reported relative to it
+
+    :return: relative path, legacy node, problems (check and message), snippet
+        targets and legacy URLs of the document
+    :rtype: dict
+    """
+    result = {
+        "path": path.relative_to(root).as_posix(),
+        "node": None,
+        "problems": [],
+        "snippets": [],
+        "urls": [],
+    }
+
+    def problem(check: str, message: str):
+        result.get("problems").append({"check": check, "message": message})
+
+    try:
+        content = path.read_text(encoding="UTF8")
+    except (OSError, UnicodeDecodeError) as err:
+        problem("read", str(err))
+        return result
+
+    try:
+        frontmatter, body = split_frontmatter(content)
+    except Exception as err:
+        problem("frontmatter", "invalid YAML: {}".format(err).splitlines()[0])
+        frontmatter, body = {}, content
+    else:
+        if not frontmatter:
+            problem("frontmatter", "missing front-matter")
+
+    if frontmatter:
+        for field in REQUIRED_FIELDS:
+            if frontmatter.get(field) in (None, "", []):
+                problem("required_field", "missing {}".format(field))
+        for field, value in frontmatter.items():
+            expected = FIELDS_TYPES.get(field)
+            if value is not None and expected and not isinstance(value, expected):
+                problem(
+                    "field_type",
+                    "{} is {}, expected {}".format(
+                        field, type(value).__name__, expected.__name__
+                    ),
+                )
+
+        date = frontmatter.get("date")
+        if date not in (None, ""):
+            try:
+                datetime.strptime(str(date), DATE_FORMAT)
+            except ValueError:
+                problem(
+                    "date_format", "{!r} does not match {}".format(date, DATE_FORMAT)
+                )
+
+        legacy = frontmatter.get("legacy")
+        if isinstance(legacy, dict):
+            result["node"] = legacy.get("node")
+            if legacy.get("node") is None:
+                problem("required_field", "missing legacy.node")
+
+    result["snippets"] = RE_SNIPPET.findall(body)
+    result["urls"] = RE_LEGACY_URL.findall(content)
+    return result
+
+
+def validate_tree(
+    root: Path, snippets_base: Path = None, processes: int = None
+) -> dict:
+    """Check every markdown file of a folder, in a process pool.
+
+    :param Path root: output folder
+    :param Path snippets_base: folder the snippet targets are relative to (the
+        website repository). Defaults to None: targets are only checked against
+        AUTHORS_QUADRIGRAMME.
+    :param int processes: count of worker processes. Defaults to one per CPU.
+
+    :return: report
+    :rtype: dict
+    """
+    start = perf_counter()
+    root = Path(root)
+    paths = sorted(root.rglob("*.md"))
+    processes = processes or os.cpu_count() or 1
+
+    results = []
+    if paths:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            results = list(
+                executor.map(
+                    validate_document,
+                    paths,
+                    [root] * len(paths),
+                    chunksize=max(1, len(paths) // (processes * 4)),
+                )
+            )
+
+    documents = {}
+    flagged = set()
+    nodes = {}
+    snippets = {}
+    urls = {}
+    for result in results:
+        if result.get("problems"):
+            documents[result.get("path")] = result.get("problems")
+            flagged.add(result.get("path"))
+        if result.get("urls"):
+            flagged.add(result.get("path"))
+        if result.get("node") is not None:
+            nodes.setdefault(result.get("node"), []).append(result.get("path"))
+        for target in result.get("snippets"):
+            snippets.setdefault(target, []).append(result.get("path"))
+        for url in result.get("urls"):
+            urls[url] = urls.get(url, 0) + 1
+
+    # each target is checked once
+    known_targets = set(AUTHORS_QUADRIGRAMME.values())
+    missing_snippets = {}
+    for target, target_paths in snippets.items():
+        if snippets_base:
+            exists = (Path(snippets_base) / target).is_file()
+        else:
+            exists = target in known_targets
+        if not exists:
+            missing_snippets[target] = sorted(set(target_paths))
+            flagged.update(target_paths)
+
+    duplicate_nodes = {
+        str(node): node_paths
+        for node, node_paths in sorted(nodes.items(), key=lambda i: str(i[0]))
+        if len(node_paths) > 1
+    }
+    for node_paths in duplicate_nodes.values():
+        flagged.update(node_paths)
+
+    summary = {}
+    for problems in documents.values():
+        for problem in problems:
+            summary[problem.get("check")] = summary.get(problem.get("check"), 0) + 1
+    summary["missing_snippets"] = len(missing_snippets)
+    summary["legacy_urls"] = sum(urls.values())
+    summary["duplicate_nodes"] = len(duplicate_nodes)
+
+    return {
+        "root": str(root),
+        "snippets_base": str(snippets_base) if snippets_base else None,
+        "files": len(paths),
+        "files_with_problems": len(flagged),
+        "processes": processes,
+        "duration_seconds": round(perf_counter() - start, 3),
+        "summary": summary,
+        "documents": documents,
+        "missing_snippets": missing_snippets,
+        "legacy_urls": dict(sorted(urls.items(), key=lambda i: (-i[1], i[0]))),
+        "duplicate_nodes": duplicate_nodes,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check the generated markdown files and write a JSON report."
+    )
+    parser.add_argument(
+        "root", type=Path, nargs="?", default=Path("_output"), help="output folder"
+    )
+    parser.add_argument(
+        "--snippets-base",
+        type=Path,
+        help="website repository, to check that the snippet targets exist",
+    )
+    parser.add_argument("--processes", type=int, help="defaults to one per CPU")
+    parser.add_argument(
+        "--report",
+        type=Path,
+        help="report path. Defaults to validation_report.json in the output folder.",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    if not args.root.is_dir():
+        parser.error("Output folder not found: {}".format(args.root))
+
+    report = validate_tree(
+        root=args.root, snippets_base=args.snippets_base, processes=args.processes
+    )
+    report_path = args.report or args.root / "validation_report.json"
+    with report_path.open(mode="w", encoding="UTF8") as out_report:
+        json.dump(report, out_report, indent=1, ensure_ascii=False)
+
+    summary = report.get("summary")
+    logging.info(
+        "{} files checked in {:.2f} s, {} with problems: {}. Report: {}".format(
+            report.get("files"),
+            report.get("duration_seconds"),
+            report.get("files_with_problems"),
+            ", ".join("{} {}".format(count, check) for check, count in summary.items()),
+            report_path,
+        )
+    )
+    sys.exit(1 if any(summary.values()) else 0)
+
+
+# #############################################################################
+# ##### Main #######################
+# ##################################
+if __name__ == "__main__":
+    main()
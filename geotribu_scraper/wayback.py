@@ -0,0 +1,195 @@
+#! python3  # noqa: E265
+
+"""
+    Wayback Machine CDX listings: parsing and selection of the snapshot to crawl for
+    each content URL.
+
+    Supported formats:
+
+    - CDX server text output (`urlkey timestamp original mimetype statuscode digest
+      length`), the default of http://web.archive.org/cdx/search/cdx;
+    - CDX server JSON output (`output=json`), whose first row lists the fields;
+    - CDX files starting with a legend line, e.g. ` CDX N b a m s k r M S V g`.
+"""
+
+# #############################################################################
+# ########## Libraries #############
+# ##################################
+
+# Standard library
+import gzip
+import json
+import re
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import urlsplit
+
+# #############################################################################
+# ########## Globals ###############
+# ##################################
+
+# fields of the CDX server text output
+CDX_SERVER_FIELDS = (
+    "urlkey",
+    "timestamp",
+    "original",
+    "mimetype",
+    "statuscode",
+    "digest",
+    "length",
+)
+
+# letters of a CDX legend line and their matching field
+# see: https://archive.org/web/researcher/cdx_legend.php
+CDX_LEGEND = {
+    "N": "urlkey",
+    "b": "timestamp",
+    "a": "original",
+    "m": "mimetype",
+    "s": "statuscode",
+    "k": "digest",
+    "r": "redirect",
+    "M": "robotflags",
+    "S": "length",
+    "V": "offset",
+    "g": "filename",
+}
+
+WAYBACK_TIMESTAMP_FORMAT = "%Y%m%d%H%M%S"
+
+
+# #############################################################################
+# ########## Functions #############
+# ##################################
+
+
+def parse_cdx(cdx_text: str) -> list:
+    """Parse a CDX listing (text or JSON) into records.
+
+    :param str cdx_text: CDX listing content
+
+    :return: list of records, as dictionaries of fields
+    :rtype: list
+    """
+    if cdx_text.lstrip().startswith("["):
+        rows = json.loads(cdx_text)
+        if not rows:
+            return []
+        return [dict(zip(rows[0], row)) for row in rows[1:]]
+
+    records = []
+    fields = CDX_SERVER_FIELDS
+    for line in cdx_text.splitlines():
+        if not line.strip():
+            continue
+        values = line.split()
+        if values[0] == "CDX":
+            fields = tuple(CDX_LEGEND.get(letter, letter) for letter in values[1:])
+            continue
+        records.append(dict(zip(fields, values)))
+
+    return records
+
+
+def read_cdx_file(cdx_path: Path) -> str:
+    """Read a local CDX file, gzipped or not.
+
+    :param Path cdx_path: path to the CDX file
+
+    :return: CDX listing content
+    :rtype: str
+    """
+    cdx_path = Path(cdx_path)
+    if cdx_path.suffix == ".gz":
+        with gzip.open(cdx_path, "rt", encoding="UTF8") as cdx_file:
+            return cdx_file.read()
+    return cdx_path.read_text(encoding="UTF8")
+
+
+def parse_timestamp(timestamp: str) -> datetime:
+    """Convert a Wayback timestamp (up to 14 digits: YYYYMMDDhhmmss) into a datetime.
+
+    :param str timestamp: Wayback timestamp
+
+    :return: matching datetime
+    :rtype: datetime
+    """
+    timestamp = timestamp[:14]
+    # missing month and day default to 01, missing time to 00
+    timestamp += "0101000000"[len(timestamp) - 4 :] if len(timestamp) < 14 else ""
+    return datetime.strptime(timestamp, WAYBACK_TIMESTAMP_FORMAT)
+
+
+def content_key(url: str) -> str:
+    """Key identifying a content whatever the scheme, the www prefix, the port or the
+    trailing slash of its URL.
+
+    :param str url: original URL
+
+    :return: key
+    :rtype: str
+    """
+    parts = urlsplit(url if "://" in url else "http://" + url)
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    key = host + parts.path.rstrip("/")
+    if parts.query:
+        key += "?" + parts.query
+    return key
+
+
+def select_snapshots(
+    records: list, url_patterns: list, target_timestamp: str = None
+) -> list:
+    """Pick the best snapshot of each content URL: a successful HTML capture, the
+    closest to the target timestamp if any, else the most recent one.
+
+    :param list records: CDX records
+    :param list url_patterns: regular expressions, at least one of them must be found
+        in the original URL
+    :param str target_timestamp: Wayback timestamp to get close to. Defaults to None.
+
+    :return: selected records, sorted by content key
+    :rtype: list
+    """
+    patterns = [re.compile(pattern) for pattern in url_patterns]
+    target = parse_timestamp(target_timestamp) if target_timestamp else None
+
+    best_by_key = {}
+    for record in records:
+        original = record.get("original", "")
+        if (
+            record.get("statuscode") != "200"
+            or not record.get("mimetype", "").startswith("text/html")
+            or not any(pattern.search(original) for pattern in patterns)
+        ):
+            continue
+
+        captured = parse_timestamp(record.get("timestamp"))
+        if target:
+            # closest first, then the most recent one on ties
+            rank = (-abs((captured - target).total_seconds()), captured)
+        else:
+            rank = (0, captured)
+
+        key = content_key(original)
+        if key not in best_by_key or rank > best_by_key.get(key)[0]:
+            best_by_key[key] = (rank, record)
+
+    return [best_by_key.get(key)[1] for key in sorted(best_by_key)]
+
+
+def snapshot_url(record: dict, wayback_base: str) -> str:
+    """Build the URL of the raw archived page (`id_` flag: without the Wayback
+    toolbar nor rewritten links).
+
+    :param dict record: CDX record
+    :param str wayback_base: Wayback Machine base URL, e.g. https://web.archive.org/web/
+
+    :return: snapshot URL
+    :rtype: str
+    """
+    return "{}{}id_/{}".format(
+        wayback_base, record.get("timestamp"), record.get("original")
+    )
@@ -0,0 +1,55 @@
+-- Drupal 7 database sample: subset of the core and fields tables used by the
+-- geotribu_drupal_db spider, in a SQL dialect understood by SQLite.
+
+CREATE TABLE node (nid INTEGER PRIMARY KEY, vid INTEGER, type VARCHAR(32), language VARCHAR(12), title VARCHAR(255), uid INTEGER, status INTEGER, created INTEGER, changed INTEGER);
+CREATE TABLE node_revision (nid INTEGER, vid INTEGER PRIMARY KEY, uid INTEGER, title VARCHAR(255), log TEXT, timestamp INTEGER, status INTEGER);
+CREATE TABLE users (uid INTEGER PRIMARY KEY, name VARCHAR(60), mail VARCHAR(254), status INTEGER);
+CREATE TABLE url_alias (pid INTEGER PRIMARY KEY, source VARCHAR(255), alias VARCHAR(255), language VARCHAR(12));
+CREATE TABLE taxonomy_term_data (tid INTEGER PRIMARY KEY, vid INTEGER, name VARCHAR(255), description TEXT, format VARCHAR(255), weight INTEGER);
+CREATE TABLE taxonomy_index (nid INTEGER, tid INTEGER, sticky INTEGER, created INTEGER);
+CREATE TABLE file_managed (fid INTEGER PRIMARY KEY, uid INTEGER, filename VARCHAR(255), uri VARCHAR(255), filemime VARCHAR(255), filesize INTEGER, status INTEGER, timestamp INTEGER);
+CREATE TABLE field_revision_body (entity_type VARCHAR(128), bundle VARCHAR(128), deleted INTEGER, entity_id INTEGER, revision_id INTEGER, language VARCHAR(32), delta INTEGER, body_value TEXT, body_summary TEXT, body_format VARCHAR(255));
+CREATE TABLE field_revision_field_introduction (entity_type VARCHAR(128), bundle VARCHAR(128), deleted INTEGER, entity_id INTEGER, revision_id INTEGER, language VARCHAR(32), delta INTEGER, field_introduction_value TEXT, field_introduction_format VARCHAR(255));
+CREATE TABLE field_revision_field_tags (entity_type VARCHAR(128), bundle VARCHAR(128), deleted INTEGER, entity_id INTEGER, revision_id INTEGER, language VARCHAR(32), delta INTEGER, field_tags_tid INTEGER);
+CREATE TABLE field_data_field_nom_complet (entity_type VARCHAR(128), bundle VARCHAR(128), deleted INTEGER, entity_id INTEGER, revision_id INTEGER, language VARCHAR(32), delta INTEGER, field_nom_complet_value VARCHAR(255), field_nom_complet_format VARCHAR(255));
+CREATE TABLE field_data_field_description (entity_type VARCHAR(128), bundle VARCHAR(128), deleted INTEGER, entity_id INTEGER, revision_id INTEGER, language VARCHAR(32), delta INTEGER, field_description_value TEXT, field_description_format VARCHAR(255));
+CREATE TABLE field_data_field_photo (entity_type VARCHAR(128), bundle VARCHAR(128), deleted INTEGER, entity_id INTEGER, revision_id INTEGER, language VARCHAR(32), delta INTEGER, field_photo_fid INTEGER, field_photo_alt VARCHAR(512), field_photo_title VARCHAR(1024));
+
+INSERT INTO users VALUES (0, '', '', 0);
+INSERT INTO users VALUES (1, 'geotribu', 'contact@geotribu.net', 1);
+INSERT INTO users VALUES (2, 'jmou', 'jmou@example.org', 1);
+INSERT INTO file_managed VALUES (10, 2, 'profil_pro_jm.JPG', 'public://img/contributeurs/profil_pro_jm.JPG', 'image/jpeg', 12345, 1, 1357038000);
+INSERT INTO field_data_field_nom_complet VALUES ('user', 'user', 0, 2, 2, 'und', 0, 'Julien Moura', NULL);
+INSERT INTO field_data_field_description VALUES ('user', 'user', 0, 2, 2, 'und', 0, 'Géomaticien', 'plain_text');
+INSERT INTO field_data_field_photo VALUES ('user', 'user', 0, 2, 2, 'und', 0, 10, '', '');
+INSERT INTO taxonomy_term_data VALUES (1, 1, 'QGIS', '', 'plain_text', 0);
+INSERT INTO taxonomy_term_data VALUES (2, 1, 'OpenLayers', '', 'plain_text', 0);
+INSERT INTO taxonomy_term_data VALUES (3, 1, 'PostGIS', '', 'plain_text', 0);
+INSERT INTO node VALUES (1001, 11, 'revue_de_presse', 'fr', 'Revue de presse du 20150220', 1, 1, 1424422800, 1424451600);
+INSERT INTO node_revision VALUES (1001, 10, 1, 'Brouillon de revue de presse', '', 1424336400, 1);
+INSERT INTO node_revision VALUES (1001, 11, 1, 'Revue de presse du 20150220', '', 1424451600, 1);
+INSERT INTO field_revision_body VALUES ('node', 'revue_de_presse', 0, 1001, 10, 'und', 0, '<p>Brouillon</p>', '', 'full_html');
+INSERT INTO field_revision_body VALUES ('node', 'revue_de_presse', 0, 1001, 11, 'und', 0, '<p>Bonjour à tous, voici la <strong>revue de presse</strong> du jour : « l''été » est là.</p><script>track();</script>
+<p class="typeNews">Client</p>
+<div class="news-details"><span class="news-title">QGIS 2.8 est sorti</span><img src="http://localhost/sites/default/public/public_res/default_images/News.png"/>
+<p>La version <a href="http://qgis.org">QGIS</a> 2.8 est <em>disponible</em>.<br/>Enjoy</p><!-- comment --><div style="color:red"><p>Encore</p></div>
+<iframe src="https://www.youtube.com/embed/xyz" width="560"></iframe><ul><li>un</li><li>deux</li></ul></div>
+<p class="typeNews">Serveur</p>
+<div class="news-details"><span class="news-title">GeoServer</span><img src="/geotribu_reborn/sites/default/files/img/geoserver.png"/>
+<p>Texte du <span class="x">serveur</span> avec http://localhost/geotribu_reborn/sites/default/public/public_res/default_images/world.png dedans.</p></div>', '', 'full_html');
+INSERT INTO field_revision_field_tags VALUES ('node', 'revue_de_presse', 0, 1001, 11, 'und', 0, 1);
+INSERT INTO field_revision_field_tags VALUES ('node', 'revue_de_presse', 0, 1001, 11, 'und', 1, 2);
+INSERT INTO url_alias VALUES (1, 'node/1001', 'GeoRDP/20150220', 'fr');
+INSERT INTO node VALUES (2001, 21, 'article', 'fr', 'Découvrir PostGIS 20150206', 2, 1, 1423211400, 1423211400);
+INSERT INTO node_revision VALUES (2001, 21, 2, 'Découvrir PostGIS 20150206', '', 1423211400, 1);
+INSERT INTO field_revision_field_introduction VALUES ('node', 'article', 0, 2001, 21, 'und', 0, '<p>Une <em>introduction</em> à PostGIS: "requêtes" #spatial.</p>', 'full_html');
+INSERT INTO field_revision_body VALUES ('node', 'article', 0, 2001, 21, 'und', 0, '<div><div><h2>Installer</h2><p>Il faut <code>apt install postgis</code> puis :</p>
+<pre>SELECT PostGIS_version();</pre><p><img src="/geotribu_reborn/sites/default/files/Tuto/img/postgis.png" alt="logo"/></p>
+<h3>Étape 2</h3><ul><li>un <a href="http://localhost/geotribu_reborn/node/1001">lien</a></li><li>deux</li></ul><style>.x{}</style>
+<iframe src="https://player.vimeo.com/1"></iframe><p style="text-align:center"> </p><h4>Fin</h4><table><tr><td>a</td></tr></table></div></div>', '', 'full_html');
+INSERT INTO field_revision_field_tags VALUES ('node', 'article', 0, 2001, 21, 'und', 0, 3);
+INSERT INTO url_alias VALUES (2, 'node/2001', 'Article/20150206', 'fr');
+INSERT INTO node VALUES (2003, 23, 'article', 'fr', 'Article en cours de rédaction', 2, 0, 1425196800, 1425196800);
+INSERT INTO node_revision VALUES (2003, 23, 2, 'Article en cours de rédaction', '', 1425196800, 0);
+INSERT INTO node VALUES (3001, 31, 'page', 'fr', 'À propos', 1, 1, 1325404800, 1325404800);
+INSERT INTO node_revision VALUES (3001, 31, 1, 'À propos', '', 1325404800, 1);
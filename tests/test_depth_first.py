@@ -0,0 +1,208 @@
+#! python3  # noqa: E265
+
+"""
+    Tests of the depth-first scheduling middleware, with a fake engine.
+
+    .. code-block:: bash
+
+        python -m pytest tests/test_depth_first.py
+"""
+
+# #############################################################################
+# ########## Libraries #############
+# ##################################
+
+# Standard library
+from types import SimpleNamespace
+
+# 3rd party
+import pytest
+from scrapy import Request, Spider
+from scrapy.exceptions import DontCloseSpider
+from scrapy.http import Response
+from scrapy.utils.test import get_crawler
+
+# project
+from geotribu_scraper.middlewares import DepthFirstSchedulingMiddleware
+
+# #############################################################################
+# ########## Classes ###############
+# ##################################
+
+
+class ListingSpider(Spider):
+    name = "geotribu_test"
+    content_callback = "parse_content"
+
+    def parse(self, response):
+        pass
+
+    def parse_content(self, response):
+        pass
+
+
+class FakeEngine(object):
+    """Engine with a scheduler queue, recording the requests it is given."""
+
+    def __init__(self):
+        self.slot = SimpleNamespace(scheduler=[])
+        self.crawled = []
+
+    def crawl(self, request, spider=None):
+        self.crawled.append(request)
+
+
+# #############################################################################
+# ########## Functions #############
+# ##################################
+
+
+def middleware_and_spider(**settings):
+    settings_dict = {
+        "DEPTH_FIRST_ENABLED": True,
+        "DEPTH_FIRST_DETAIL_PRIORITY": 10,
+        "DEPTH_FIRST_MAX_LISTINGS": 1,
+        "DEPTH_FIRST_QUEUE_LOW_WATER": 2,
+        "DEPTH_FIRST_SAMPLE_INTERVAL": 0,
+    }
+    settings_dict.update(settings)
+    crawler = get_crawler(ListingSpider, settings_dict=settings_dict)
+    crawler.engine = FakeEngine()
+    spider = crawler._create_spider()
+    return DepthFirstSchedulingMiddleware(crawler), spider
+
+
+def listing(spider, page: int) -> Request:
+    return Request("http://localhost/geotribu_reborn/GeoRDP?page={}".format(page))
+
+
+def content(spider, node: int) -> Request:
+    return Request(
+        "http://localhost/geotribu_reborn/node/{}".format(node),
+        callback=spider.parse_content,
+    )
+
+
+def answer(middleware, spider, request: Request, result: list) -> list:
+    """Response of a request, going through the middleware with the spider output."""
+    response = Response(request.url, request=request)
+    middleware.process_spider_input(response, spider)
+    return list(middleware.process_spider_output(response, result, spider))
+
+
+# #############################################################################
+# ########## Tests #################
+# ##################################
+
+
+def test_listings_held_under_cap():
+    middleware, spider = middleware_and_spider(DEPTH_FIRST_MAX_LISTINGS=2)
+    first = listing(spider, 0)
+    first.meta[middleware.meta_key] = True
+    middleware.outstanding = 1
+
+    output = answer(
+        middleware,
+        spider,
+        first,
+        [content(spider, 1), listing(spider, 1), listing(spider, 2), {"title": "x"}],
+    )
+    # the content page first, then the listings which fit under the cap
+    assert [getattr(r, "url", r) for r in output] == [
+        "http://localhost/geotribu_reborn/node/1",
+        {"title": "x"},
+        "http://localhost/geotribu_reborn/GeoRDP?page=1",
+        "http://localhost/geotribu_reborn/GeoRDP?page=2",
+    ]
+    assert output[0].priority == 10
+    # released listings go just before the remaining content pages
+    assert output[2].priority == 11
+    assert middleware.outstanding == 2
+
+    released = output[2:]
+    output = answer(middleware, spider, content(spider, 1), [listing(spider, 3)])
+    assert output == []
+    assert [r.url for r in middleware.held] == [
+        "http://localhost/geotribu_reborn/GeoRDP?page=3"
+    ]
+
+    # a released listing was a duplicate: its slot is free again
+    middleware.request_dropped(content(spider, 3), spider)
+    assert middleware.outstanding == 2
+    middleware.request_dropped(released[1], spider)
+    assert middleware.outstanding == 1
+    assert [r.url for r in answer(middleware, spider, content(spider, 2), [])] == [
+        "http://localhost/geotribu_reborn/GeoRDP?page=3"
+    ]
+
+
+def test_listings_wait_for_queue_low_water():
+    middleware, spider = middleware_and_spider()
+    middleware.crawler.engine.slot.scheduler.extend(["queued"] * 3)
+
+    output = answer(middleware, spider, content(spider, 1), [listing(spider, 1)])
+    assert output == []
+    assert middleware.outstanding == 0
+
+    # the queue drained: released with the next spider output
+    middleware.crawler.engine.slot.scheduler.pop()
+    output = answer(middleware, spider, content(spider, 2), [])
+    assert [r.url for r in output] == ["http://localhost/geotribu_reborn/GeoRDP?page=1"]
+    assert middleware.stats.get_value("depth_first/listings_held_max") == 1
+
+
+def test_idle_force_release():
+    middleware, spider = middleware_and_spider()
+    middleware.crawler.engine.slot.scheduler.extend(["queued"] * 5)
+    answer(middleware, spider, content(spider, 1), [listing(spider, 1)])
+    # a released listing which never got a response (failed download)
+    middleware.outstanding = 1
+
+    with pytest.raises(DontCloseSpider):
+        middleware.spider_idle(spider)
+    assert [r.url for r in middleware.crawler.engine.crawled] == [
+        "http://localhost/geotribu_reborn/GeoRDP?page=1"
+    ]
+    assert middleware.outstanding == 1
+    assert not middleware.held
+
+    # nothing held: the spider can be closed
+    assert middleware.spider_idle(spider) is None
+
+
+def test_start_requests_lazy():
+    middleware, spider = middleware_and_spider()
+    read = []
+
+    def start_requests():
+        for page in range(3):
+            read.append(page)
+            yield listing(spider, page)
+            yield content(spider, page)
+
+    output = list(middleware.process_start_requests(start_requests(), spider))
+    # read up to the second listing, which is held
+    assert read == [0, 1]
+    assert [r.url for r in output] == [
+        "http://localhost/geotribu_reborn/GeoRDP?page=0",
+        "http://localhost/geotribu_reborn/node/0",
+    ]
+    assert len(middleware.held) == 1
+
+    output = answer(middleware, spider, output[0], [])
+    assert read == [0, 1, 2]
+    assert [r.url for r in output] == [
+        "http://localhost/geotribu_reborn/GeoRDP?page=1",
+        "http://localhost/geotribu_reborn/node/1",
+    ]
+
+    # the last listing is released when the spider is idle, then the start
+    # requests are exhausted
+    with pytest.raises(DontCloseSpider):
+        middleware.spider_idle(spider)
+    assert [r.url for r in middleware.crawler.engine.crawled] == [
+        "http://localhost/geotribu_reborn/GeoRDP?page=2",
+        "http://localhost/geotribu_reborn/node/2",
+    ]
+    assert middleware.start_requests is None
+    assert middleware.spider_idle(spider) is None
@@ -0,0 +1,137 @@
+#! python3  # noqa: E265
+
+"""
+    Tests of the Drupal database reader and of the items built by the database
+    spider, on tests/fixtures/drupal7_sample.sql loaded into SQLite.
+
+    .. code-block:: bash
+
+        python -m pytest tests/test_drupal_db.py
+"""
+
+# #############################################################################
+# ########## Libraries #############
+# ##################################
+
+# Standard library
+import sqlite3
+from pathlib import Path
+
+# 3rd party
+import pytest
+from scrapy.utils.test import get_crawler
+
+# project
+from geotribu_scraper import settings as project_settings
+from geotribu_scraper.drupal_db import DrupalDatabase, autop
+from geotribu_scraper.items import ArticleItem, GeoRdpItem
+from geotribu_scraper.spiders.drupal_db_crawler import DrupalDatabaseSpider
+
+# #############################################################################
+# ########## Globals ###############
+# ##################################
+
+SQL_FIXTURE = Path(__file__).resolve().parent / "fixtures" / "drupal7_sample.sql"
+NODE_TYPES = ["revue_de_presse", "article", "tutoriel"]
+
+# #############################################################################
+# ########## Fixtures ##############
+# ##################################
+
+
+@pytest.fixture
+def drupal_sqlite(tmp_path) -> Path:
+    """SQLite database file loaded from the SQL sample."""
+    db_path = tmp_path / "drupal7.sqlite"
+    connection = sqlite3.connect(str(db_path))
+    connection.executescript(SQL_FIXTURE.read_text(encoding="UTF8"))
+    connection.commit()
+    connection.close()
+    return db_path
+
+
+# #############################################################################
+# ########## Tests #################
+# ##################################
+
+
+def test_contents(drupal_sqlite):
+    with DrupalDatabase.open(str(drupal_sqlite)) as database:
+        contents = list(
+            database.contents(node_types=NODE_TYPES, files_url="http://x/files/")
+        )
+
+    # published nodes of the given types only, by creation date
+    assert [c.get("nid") for c in contents] == [2001, 1001]
+    article, rdp = contents
+
+    assert article.get("title") == "Découvrir PostGIS 20150206"
+    assert article.get("alias") == "Article/20150206"
+    assert article.get("tags") == ["PostGIS"]
+    assert article.get("intro").startswith("<p>Une <em>introduction</em>")
+    assert article.get("author") == {
+        "name": "jmou",
+        "full_name": "Julien Moura",
+        "description": "Géomaticien",
+        "description_format": "plain_text",
+        "photo": "http://x/files/img/contributeurs/profil_pro_jm.JPG",
+    }
+
+    # current revision, not the draft one
+    assert rdp.get("title") == "Revue de presse du 20150220"
+    assert "Brouillon" not in rdp.get("body")
+    assert rdp.get("body_format") == "full_html"
+    assert rdp.get("tags") == ["QGIS", "OpenLayers"]
+    assert rdp.get("author").get("full_name") is None
+
+
+def test_sql_dump_source():
+    with DrupalDatabase.open(str(SQL_FIXTURE)) as database:
+        nodes = [c.get("nid") for c in database.contents(["article"], "")]
+    assert nodes == [2001]
+
+
+def test_autop():
+    assert autop("un\n\ndeux\ntrois") == "<p>un</p>\n<p>deux<br />\ntrois</p>"
+
+
+def test_spider_items(drupal_sqlite):
+    settings = {
+        key: getattr(project_settings, key)
+        for key in dir(project_settings)
+        if key.isupper()
+    }
+    settings.update(
+        DRUPAL_DB_SOURCE=str(drupal_sqlite),
+        DEFAULT_URL_BASE="http://localhost/geotribu_reborn/",
+    )
+    crawler = get_crawler(DrupalDatabaseSpider, settings_dict=settings)
+    spider = crawler._create_spider()
+
+    article, rdp = list(spider.parse_database(response=None))
+    assert crawler.stats.get_value("drupal_db/nodes/article") == 1
+
+    assert isinstance(article, ArticleItem)
+    assert article.get("kind") == "art"
+    assert article.get("url_full") == "/geotribu_reborn/Article/20150206"
+    assert article.get("drupal_node") == 2001
+    assert article.get("published_date") == ("06", "fév", "2015")
+    assert article.get("image_urls") == [
+        "http://localhost/geotribu_reborn/sites/default/files/Tuto/img/postgis.png"
+    ]
+    assert article.get("author").get("name") == "Julien Moura"
+    assert article.get("author").get("description") == ["<p>Géomaticien</p>"]
+
+    assert isinstance(rdp, GeoRdpItem)
+    assert rdp.get("kind") == "rdp"
+    assert rdp.get("url_full") == "/geotribu_reborn/GeoRDP/20150220"
+    assert rdp.get("published_date") == ("20", "fév", "2015")
+    assert rdp.get("news_sections") == ["Client", "Serveur"]
+    assert [
+        [news[0] for news in section] for section in rdp.get("news_details").values()
+    ] == [["QGIS 2.8 est sorti"], ["GeoServer"]]
+    assert rdp.get("author") == {
+        "thumbnail": "?",
+        "name": "Geotribu",
+        "description": "",
+    }
@@ -0,0 +1,67 @@
+#! python3  # noqa: E265
+
+"""
+    Tests of the engine pause shared by several components.
+
+    .. code-block:: bash
+
+        python -m pytest tests/test_engine_pause.py
+"""
+
+# #############################################################################
+# ########## Libraries #############
+# ##################################
+
+# project
+from geotribu_scraper.engine_pause import pause_engine, pause_reasons, unpause_engine
+
+# #############################################################################
+# ########## Classes ###############
+# ##################################
+
+
+class FakeEngine(object):
+    def __init__(self):
+        self.paused = False
+        self.calls = []
+
+    def pause(self):
+        self.paused = True
+        self.calls.append("pause")
+
+    def unpause(self):
+        self.paused = False
+        self.calls.append("unpause")
+
+
+class FakeCrawler(object):
+    def __init__(self):
+        self.engine = FakeEngine()
+
+
+# #############################################################################
+# ########## Tests #################
+# ##################################
+
+
+def test_resumed_when_no_reason_remains():
+    crawler = FakeCrawler()
+    pause_engine(crawler, reason="backpressure")
+    pause_engine(crawler, reason="429_backoff")
+    assert pause_reasons(crawler) == {"backpressure", "429_backoff"}
+
+    # the backoff ends while the pipelines are still full
+    assert not unpause_engine(crawler, reason="429_backoff")
+    assert crawler.engine.paused
+
+    assert unpause_engine(crawler, reason="backpressure")
+    assert not crawler.engine.paused
+    assert crawler.engine.calls == ["pause", "unpause"]
+
+
+def test_unknown_reason_ignored():
+    crawler = FakeCrawler()
+    assert not unpause_engine(crawler, reason="backpressure")
+    pause_engine(crawler, reason="backpressure")
+    assert not unpause_engine(crawler, reason="429_backoff")
+    assert crawler.engine.paused
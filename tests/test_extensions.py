@@ -0,0 +1,242 @@
+#! python3  # noqa: E265
+
+"""
+    Tests of the custom Scrapy extensions, with a fake engine.
+
+    .. code-block:: bash
+
+        python -m pytest tests/test_extensions.py
+"""
+
+# #############################################################################
+# ########## Libraries #############
+# ##################################
+
+# Standard library
+from types import SimpleNamespace
+from urllib.parse import urlparse
+
+# 3rd party
+import pytest
+from scrapy import Request
+from scrapy.http import Response
+from scrapy.utils.test import get_crawler
+
+# project
+from geotribu_scraper import settings as project_settings
+from geotribu_scraper.engine_pause import pause_engine, pause_reasons
+from geotribu_scraper.extensions import AdaptiveThrottle, Backpressure, SlotThrottle
+
+# #############################################################################
+# ########## Globals ###############
+# ##################################
+
+PROFILES = project_settings.ADAPTIVE_THROTTLE_PROFILES
+
+# #############################################################################
+# ########## Classes ###############
+# ##################################
+
+
+class FakeEngine(object):
+    """Engine with the pipelines queue read by the backpressure."""
+
+    def __init__(self):
+        self.paused = False
+        self.scraper = SimpleNamespace(
+            slot=SimpleNamespace(itemproc_size=0, active=set())
+        )
+        self.slot = SimpleNamespace(nextcall=SimpleNamespace(schedule=lambda: None))
+
+    def pause(self):
+        self.paused = True
+
+    def unpause(self):
+        self.paused = False
+
+
+# #############################################################################
+# ########## Functions #############
+# ##################################
+
+
+def slot_throttle(profile_name: str) -> SlotThrottle:
+    return SlotThrottle(
+        profile_name=profile_name,
+        profile=PROFILES.get(profile_name),
+        alpha=0.2,
+        window=10,
+        max_error_rate=0.1,
+    )
+
+
+def crawler_with_engine(**settings):
+    """Crawler with the project settings and a fake engine, whose download slots
+    are added by `download_request`."""
+    settings_dict = {
+        key: getattr(project_settings, key)
+        for key in dir(project_settings)
+        if key.isupper()
+    }
+    settings_dict.update(settings)
+    crawler = get_crawler(settings_dict=settings_dict)
+    crawler.engine = SimpleNamespace(
+        downloader=SimpleNamespace(total_concurrency=8, slots={}),
+    )
+    return crawler
+
+
+def download_request(crawler, url: str) -> Request:
+    """Request assigned to the download slot of its host."""
+    request = Request(url)
+    request.meta["download_slot"] = urlparse(url).hostname
+    crawler.engine.downloader.slots.setdefault(
+        request.meta.get("download_slot"), SimpleNamespace(concurrency=0, delay=0)
+    )
+    return request
+
+
+# #############################################################################
+# ########## Tests #################
+# ##################################
+
+
+def test_latency_ewma():
+    throttle = slot_throttle("local")
+    throttle.record(latency=1.0, is_error=False)
+    assert throttle.latency_ewma == 1.0
+    throttle.record(latency=2.0, is_error=False)
+    assert throttle.latency_ewma == pytest.approx(1.2)
+    throttle.record(latency=None, is_error=True)
+    assert throttle.latency_ewma == pytest.approx(1.2)
+    assert throttle.error_rate_ewma == pytest.approx(0.2)
+
+
+def test_adjusted_once_per_window():
+    throttle = slot_throttle("local")
+    changes = [throttle.record(latency=0.1, is_error=False) for _ in range(30)]
+    assert changes.count("speedups") == 3
+    assert all(change is None for i, change in enumerate(changes) if i % 10 != 9)
+    assert throttle.concurrency == PROFILES.get("local").get("concurrency") + 3
+
+
+def test_speedups_bounded():
+    throttle = slot_throttle("local")
+    for _ in range(1000):
+        throttle.record(latency=0.1, is_error=False)
+    assert throttle.concurrency == PROFILES.get("local").get("max_concurrency")
+    assert throttle.delay == PROFILES.get("local").get("delay")
+
+
+def test_slowdowns_on_latency_bounded():
+    throttle = slot_throttle("local")
+    delays = []
+    for _ in range(10):
+        for _ in range(10):
+            throttle.record(latency=5, is_error=False)
+        delays.append(throttle.delay)
+    # from no delay: a minimal one, then doubled up to the maximum
+    assert delays[:5] == [0.25, 0.5, 1, 2, 2]
+    assert throttle.concurrency == PROFILES.get("local").get("min_concurrency")
+
+
+def test_errors_slow_down_at_once_then_recover():
+    throttle = slot_throttle("public")
+    changes = [throttle.record(latency=None, is_error=True) for _ in range(5)]
+    assert changes == ["slowdowns"] * 5
+    assert throttle.concurrency == PROFILES.get("public").get("min_concurrency")
+    assert throttle.delay == PROFILES.get("public").get("max_delay")
+
+    # fast responses again: back to the profile limits once the error rate is low
+    for _ in range(500):
+        throttle.record(latency=0.5, is_error=False)
+    assert throttle.error_rate_ewma < 0.05
+    assert throttle.delay == PROFILES.get("public").get("delay")
+    assert throttle.concurrency == PROFILES.get("public").get("max_concurrency")
+
+
+def test_profile_by_host():
+    crawler = crawler_with_engine()
+    throttle = AdaptiveThrottle(crawler)
+    downloader = crawler.engine.downloader
+
+    local = download_request(crawler, "http://localhost/geotribu_reborn/GeoRDP")
+    throttle.request_reached_downloader(local, spider=None)
+    public = download_request(crawler, "https://web.archive.org/web/2015/")
+    throttle.request_reached_downloader(public, spider=None)
+
+    assert throttle.slots.get("localhost").profile_name == "local"
+    assert throttle.slots.get("web.archive.org").profile_name == "public"
+    assert downloader.slots.get("localhost").concurrency == 8
+    assert downloader.slots.get("web.archive.org").delay == 5
+    # room for the concurrency of every slot
+    assert downloader.total_concurrency == 32
+    assert crawler.stats.get_value("adaptive_throttle/localhost/profile") == "local"
+
+
+def test_errors_applied_to_the_slot():
+    crawler = crawler_with_engine(ADAPTIVE_THROTTLE_PROFILE="local")
+    throttle = AdaptiveThrottle(crawler)
+
+    request = download_request(crawler, "http://localhost/geotribu_reborn/node/1")
+    throttle.request_reached_downloader(request, spider=None)
+    request.meta["download_latency"] = 0.1
+    throttle.response_downloaded(
+        Response(request.url, status=503), request, spider=None
+    )
+    throttle.request_left_downloader(request, spider=None)
+
+    slot = crawler.engine.downloader.slots.get("localhost")
+    assert (slot.concurrency, slot.delay) == (4, 0.25)
+
+    # no response: download exception
+    request = download_request(crawler, "http://localhost/geotribu_reborn/node/2")
+    throttle.request_reached_downloader(request, spider=None)
+    throttle.request_left_downloader(request, spider=None)
+    assert (slot.concurrency, slot.delay) == (2, 0.5)
+    assert crawler.stats.get_value("adaptive_throttle/download_errors") == 1
+    assert crawler.stats.get_value("adaptive_throttle/slowdowns") == 2
+
+
+def test_backpressure_pause_and_resume():
+    crawler = crawler_with_engine(BACKPRESSURE_HIGH_WATER=5, BACKPRESSURE_LOW_WATER=2)
+    crawler.engine = FakeEngine()
+    backpressure = Backpressure(crawler)
+    scraper_slot = crawler.engine.scraper.slot
+
+    # items in the pipelines and responses being parsed
+    scraper_slot.itemproc_size = 3
+    scraper_slot.active = {"response_1"}
+    backpressure.check()
+    assert not crawler.engine.paused
+
+    scraper_slot.active = {"response_1", "response_2"}
+    backpressure.check()
+    assert crawler.engine.paused
+    assert pause_reasons(crawler) == {"backpressure"}
+
+    # between the marks: still paused
+    scraper_slot.itemproc_size = 1
+    backpressure.check()
+    assert crawler.engine.paused
+
+    scraper_slot.active = {"response_1"}
+    backpressure.check()
+    assert not crawler.engine.paused
+    assert crawler.stats.get_value("backpressure/pauses") == 1
+    assert crawler.stats.get_value("backpressure/pending_items_max") == 5
+
+
+def test_backpressure_resume_kept_by_other_reason():
+    crawler = crawler_with_engine(BACKPRESSURE_HIGH_WATER=5, BACKPRESSURE_LOW_WATER=2)
+    crawler.engine = FakeEngine()
+    backpressure = Backpressure(crawler)
+
+    crawler.engine.scraper.slot.itemproc_size = 5
+    backpressure.check()
+    pause_engine(crawler, reason="429_backoff")
+
+    crawler.engine.scraper.slot.itemproc_size = 0
+    backpressure.check()
+    assert crawler.engine.paused
+    assert pause_reasons(crawler) == {"429_backoff"}
@@ -0,0 +1,105 @@
+#! python3  # noqa: E265
+
+"""
+    Tests of the front-matter serializer.
+
+    .. code-block:: bash
+
+        python -m pytest tests/test_frontmatter.py
+"""
+
+# #############################################################################
+# ########## Libraries #############
+# ##################################
+
+# 3rd party
+from hypothesis import given
+from hypothesis import strategies as st
+from yaml import safe_load
+
+# project
+from geotribu_scraper.frontmatter import dump_frontmatter
+
+# #############################################################################
+# ########## Globals ###############
+# ##################################
+
+# pieces which are meaningful to YAML: indicators, quotes, line breaks, non
+# printable characters, reserved words, implicitly typed scalars...
+TRICKY_CHUNKS = (
+    " ",
+    ":",
+    ": ",
+    " #",
+    "-",
+    "- ",
+    "?",
+    "'",
+    '"',
+    "\\",
+    "\n",
+    "\r\n",
+    "\t",
+    "\x00",
+    "\x85",
+    "\xa0",
+    "\u2028",
+    "\ufeff",
+    "\U0001f30d",
+    "---",
+    "...",
+    "[",
+    "{",
+    ",",
+    "&",
+    "*",
+    "!",
+    "|",
+    ">",
+    "%",
+    "@",
+    "`",
+    "~",
+    "yes",
+    "No",
+    "null",
+    "0x1F",
+    "1:20",
+    "1_000",
+    ".inf",
+    "2015-02-20",
+    "<<",
+)
+
+tricky_text = st.one_of(
+    st.text(),
+    st.lists(st.sampled_from(TRICKY_CHUNKS) | st.text(max_size=3), max_size=6).map(
+        "".join
+    ),
+)
+
+frontmatters = st.fixed_dictionaries(
+    {
+        "authors": st.lists(tricky_text, min_size=1, max_size=3),
+        "categories": st.lists(st.sampled_from(("article", "revue de presse"))),
+        "date": tricky_text,
+        "description": tricky_text,
+        "image": tricky_text,
+        "legacy": st.fixed_dictionaries(
+            {"node": st.none() | st.integers(min_value=-(2**63), max_value=2**63)}
+        ),
+        "license": tricky_text,
+        "robots": tricky_text,
+        "tags": st.lists(tricky_text, max_size=5),
+        "title": tricky_text,
+    }
+)
+
+# #############################################################################
+# ########## Tests #################
+# ##################################
+
+
+@given(frontmatters)
+def test_dump_frontmatter_round_trip(frontmatter):
+    assert safe_load(dump_frontmatter(frontmatter)) == frontmatter
@@ -0,0 +1,135 @@
+#! python3  # noqa: E265
+
+"""
+    Tests of the export of the documents into a git repository with fast-import,
+    on a temporary bare repository.
+
+    .. code-block:: bash
+
+        python -m pytest tests/test_git_export.py
+"""
+
+# #############################################################################
+# ########## Libraries #############
+# ##################################
+
+# Standard library
+import subprocess
+from datetime import datetime, timezone
+
+# 3rd party
+import pytest
+
+# project
+from geotribu_scraper.git_export import GitFastImport, git_blob_hash
+
+# #############################################################################
+# ########## Globals ###############
+# ##################################
+
+BRANCH = "import/geotribu_rdp"
+
+DOCUMENTS = {
+    "rdp/2015/rdp_2015-02-20.md": (b"# RDP 20\n", datetime(2015, 2, 20)),
+    "rdp/2015/rdp_2015-02-06.md": (b"# RDP 06\n", datetime(2015, 2, 6)),
+    "rdp/2015/rdp_2015-02-06_bis.md": (b"# RDP 06 bis\n", datetime(2015, 2, 6)),
+    "rdp/unknown.md": (b"# RDP ?\n", None),
+}
+
+# #############################################################################
+# ########## Functions #############
+# ##################################
+
+
+def git(repository, *args) -> str:
+    return subprocess.run(
+        ["git", "-C", str(repository)] + list(args),
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout.strip("\n")
+
+
+def export(repository, documents: dict, **kwargs) -> list:
+    """Run an export and return the result of each addition."""
+    with GitFastImport(repository, branch=BRANCH, **kwargs) as git_export:
+        return [
+            git_export.add(path, content, date)
+            for path, (content, date) in documents.items()
+        ]
+
+
+# #############################################################################
+# ########## Fixtures ##############
+# ##################################
+
+
+@pytest.fixture
+def repository(tmp_path):
+    """Path of a bare repository, created by the first export."""
+    return tmp_path / "website.git"
+
+
+# #############################################################################
+# ########## Tests #################
+# ##################################
+
+
+def test_backdated_commits(repository):
+    assert export(repository, DOCUMENTS) == ["added"] * 4
+    assert git(repository, "rev-parse", "--is-bare-repository") == "true"
+
+    log = git(repository, "log", "--reverse", "--format=%ad|%s", "--date=short", BRANCH)
+    dates, subjects = zip(*(line.split("|") for line in log.splitlines()))
+    # by publication date, the documents without one last, of the current date
+    assert dates[:2] == ("2015-02-06", "2015-02-20")
+    assert dates[2] == datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    assert subjects == (
+        "Import legacy contents published on 2015-02-06",
+        "Import legacy contents published on 2015-02-20",
+        "Import legacy contents published on an unknown date",
+    )
+    assert git(repository, "show", "--format=", "--name-only", BRANCH + "~2") == (
+        "rdp/2015/rdp_2015-02-06.md\nrdp/2015/rdp_2015-02-06_bis.md"
+    )
+    assert git(repository, "show", BRANCH + ":rdp/2015/rdp_2015-02-20.md") == (
+        "# RDP 20"
+    )
+
+
+def test_unchanged_run_no_commit(repository):
+    export(repository, DOCUMENTS)
+    tip = git(repository, "rev-parse", BRANCH)
+
+    assert export(repository, DOCUMENTS) == [None] * 4
+    assert git(repository, "rev-parse", BRANCH) == tip
+
+
+def test_incremental_change_on_tip(repository):
+    export(repository, DOCUMENTS)
+    tip = git(repository, "rev-parse", BRANCH)
+
+    documents = dict(DOCUMENTS)
+    documents["rdp/2015/rdp_2015-02-20.md"] = (
+        b"# RDP 20 (v2)\n",
+        datetime(2015, 2, 20),
+    )
+    documents["rdp/2015/rdp_2015-02-27.md"] = (b"# RDP 27\n", datetime(2015, 2, 27))
+    assert export(repository, documents) == ["changed", None, None, None, "added"]
+
+    # one commit by publication date of the changes, on top of the previous tip
+    assert git(repository, "rev-list", "--count", tip + ".." + BRANCH) == "2"
+    assert git(repository, "rev-parse", BRANCH + "~2") == tip
+    # the other documents are kept
+    files = git(repository, "ls-tree", "-r", "--name-only", BRANCH).splitlines()
+    assert sorted(files) == sorted(documents)
+    assert git(repository, "rev-parse", BRANCH + ":rdp/2015/rdp_2015-02-20.md") == (
+        git_blob_hash(b"# RDP 20 (v2)\n")
+    )
+
+
+def test_single_commit(repository):
+    export(repository, DOCUMENTS, backdate=False, prefix="content/")
+    assert git(repository, "log", "--format=%s", BRANCH) == "Import 4 legacy contents"
+    files = git(repository, "ls-tree", "-r", "--name-only", BRANCH).splitlines()
+    assert files == sorted("content/" + path for path in DOCUMENTS)
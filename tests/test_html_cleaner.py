@@ -0,0 +1,86 @@
+#! python3  # noqa: E265
+
+"""
+    Tests of the pre-conversion HTML cleaning, on the legacy pages of
+    tests/fixtures.
+
+    .. code-block:: bash
+
+        python -m pytest tests/test_html_cleaner.py
+"""
+
+# #############################################################################
+# ########## Libraries #############
+# ##################################
+
+# Standard library
+from pathlib import Path
+
+# 3rd party
+import pytest
+from lxml import html as lxml_html
+from parsel import Selector
+
+# project
+from geotribu_scraper.html_cleaner import NOISE_TAGS, clean_html
+
+# #############################################################################
+# ########## Globals ###############
+# ##################################
+
+FIXTURES_FOLDER = Path(__file__).resolve().parent / "fixtures"
+
+# text before the first element of a fragment, with characters which must stay
+# escaped: the markup written as text must not become elements
+LEADING_TEXT = "1 &lt; 2 &amp;&amp; &lt;b&gt;pas en gras&lt;/b&gt; "
+
+# #############################################################################
+# ########## Functions #############
+# ##################################
+
+
+def fixture_fragments() -> list:
+    """HTML fragments of the content of each fixture page: paragraphs, news,
+    article body and author description."""
+    fragments = []
+    for fixture in sorted(FIXTURES_FOLDER.glob("*.html")):
+        article = Selector(text=fixture.read_text(encoding="UTF8")).css("article")[0]
+        fragments.extend(
+            pytest.param(fragment, id="{}-{}".format(fixture.stem, i))
+            for i, fragment in enumerate(
+                article.css(
+                    "p, li, div.news-details, div.field-name-field-introduction, "
+                    "div.field-name-body"
+                ).getall()
+            )
+        )
+    return fragments
+
+
+def text_of(fragment: str) -> str:
+    """Text of a fragment, without the noise elements and with whitespace
+    normalized."""
+    root = lxml_html.fragment_fromstring(fragment, create_parent="div")
+    for element in list(root.iter(*NOISE_TAGS)):
+        element.drop_tree()
+    return " ".join(root.text_content().split())
+
+
+# #############################################################################
+# ########## Tests #################
+# ##################################
+
+
+@pytest.mark.parametrize("fragment", fixture_fragments())
+def test_text_preserved(fragment):
+    assert text_of(clean_html(fragment)) == text_of(fragment)
+
+
+@pytest.mark.parametrize("fragment", fixture_fragments())
+def test_leading_text_escaped(fragment):
+    """The wrapper is unwrapped, its text becomes the text before the first
+    element of the cleaned fragment."""
+    wrapped = "<div>{}{}</div>".format(LEADING_TEXT, fragment)
+    cleaned = clean_html(wrapped)
+    assert cleaned.startswith(LEADING_TEXT)
+    assert text_of(cleaned) == text_of(wrapped)
@@ -0,0 +1,175 @@
+#! python3  # noqa: E265
+
+"""
+    Tests of the items file written by `JsonWriterPipeline`, of its sidecar index and
+    of the conversion of the items read back from it.
+
+    .. code-block:: bash
+
+        python -m pytest tests/test_items_index.py
+"""
+
+# #############################################################################
+# ########## Libraries #############
+# ##################################
+
+# Standard library
+import locale
+from pathlib import Path
+
+# 3rd party
+import pytest
+from scrapy import Spider
+from scrapy.utils.test import get_crawler
+
+# project
+from geotribu_scraper import settings as project_settings
+from geotribu_scraper.items import ArticleItem, GeoRdpItem
+from geotribu_scraper.items_index import ItemsFile, index_path_for
+from geotribu_scraper.pipelines import JsonWriterPipeline, ScrapyCrawlerPipeline
+
+# #############################################################################
+# ########## Globals ###############
+# ##################################
+
+ITEMS_PATH = Path("_output/items_geotribu_rdp.jl")
+
+# #############################################################################
+# ########## Functions #############
+# ##################################
+
+
+def french_locale_available() -> bool:
+    """The conversion sets the fr_FR locale, to write the dates."""
+    current = locale.setlocale(locale.LC_ALL)
+    try:
+        locale.setlocale(locale.LC_ALL, "fr_FR")
+    except locale.Error:
+        return False
+    finally:
+        locale.setlocale(locale.LC_ALL, current)
+    return True
+
+
+def write_items(items: list, spider: Spider):
+    writer = JsonWriterPipeline()
+    writer.open_spider(spider)
+    for item in items:
+        writer.process_item(item, spider)
+    writer.close_spider(spider)
+
+
+def convert(items: list, spider: Spider) -> dict:
+    """Convert items to markdown and return the written documents by path."""
+    pipeline = ScrapyCrawlerPipeline.from_crawler(spider.crawler)
+    pipeline.open_spider(spider)
+    documents = {}
+    for item in items:
+        pipeline.convert_item(item, spider)
+    pipeline.close_spider(spider)
+    for md_path in sorted(Path("_output").rglob("*.md")):
+        documents[md_path.as_posix()] = md_path.read_text(encoding="UTF8")
+        md_path.unlink()
+    return documents
+
+
+# #############################################################################
+# ########## Fixtures ##############
+# ##################################
+
+
+@pytest.fixture
+def items():
+    """An RDP and an article, as yielded by the spiders."""
+    rdp = GeoRdpItem(
+        title="Revue de presse du 20150220",
+        url_full="/geotribu_reborn/GeoRDP/20150220",
+        published_date=("20", "fév", "2015"),
+        author={"thumbnail": "?", "name": "Geotribu", "description": ""},
+        intro="<p>Bonjour à tous !</p>",
+        tags=["QGIS"],
+        kind="rdp",
+        news_sections=["Client"],
+        news_details={
+            "Client": [
+                ("QGIS 2.8 est sorti", None, ["<p>Une <strong>LTR</strong>.</p>"])
+            ]
+        },
+        drupal_node=1002,
+    )
+    article = ArticleItem(
+        title="Découvrir PostGIS",
+        url_full="/geotribu_reborn/Article/20150206",
+        published_date=("06", "fév", "2015"),
+        author={"name": "Julien Moura"},
+        tags=["PostGIS"],
+        kind="art",
+        intro="<p>Une introduction.</p>",
+        body=["<p>Le corps de l'article.</p>"],
+        drupal_node=2001,
+    )
+    return [rdp, article]
+
+
+@pytest.fixture
+def spider(tmp_path, monkeypatch):
+    """Spider with the project settings, the output folder in a temporary one."""
+    monkeypatch.chdir(tmp_path)
+    settings = {
+        key: getattr(project_settings, key)
+        for key in dir(project_settings)
+        if key.isupper()
+    }
+    settings.update(DEFAULT_URL_BASE="http://localhost/geotribu_reborn/")
+    crawler = get_crawler(Spider, settings_dict=settings)
+    return crawler._create_spider(name="geotribu_rdp")
+
+
+# #############################################################################
+# ########## Tests #################
+# ##################################
+
+
+def test_random_access(items, spider):
+    write_items(items, spider)
+    assert index_path_for(ITEMS_PATH).is_file()
+
+    with ItemsFile(ITEMS_PATH) as items_file:
+        assert len(items_file) == 2
+        assert items_file.get(2001).get("title") == "Découvrir PostGIS"
+        rdp = items_file.get_url("http://localhost/geotribu_reborn/GeoRDP/20150220/")
+        assert rdp.get("drupal_node") == 1002
+        assert [entry.get("node") for entry in items_file.select(kind="art")] == [2001]
+        assert items_file.get(3000) is None
+
+
+def test_index_rebuilt(items, spider):
+    write_items(items, spider)
+    index_path_for(ITEMS_PATH).unlink()
+
+    with ItemsFile(ITEMS_PATH) as items_file:
+        assert [
+            (entry.get("node"), entry.get("type")) for entry in items_file.entries
+        ] == [
+            (1002, "GeoRdpItem"),
+            (2001, "ArticleItem"),
+        ]
+
+
+@pytest.mark.skipif(
+    not french_locale_available(), reason="fr_FR locale needed by the conversion"
+)
+def test_load_item_converted_again(items, spider):
+    expected = convert(items, spider)
+    assert sorted(expected) == [
+        "_output/articles/2015/2015-02-06_decouvrir_postgis.md",
+        "_output/rdp/2015/rdp_2015-02-20.md",
+    ]
+
+    write_items(items, spider)
+    with ItemsFile(ITEMS_PATH) as items_file:
+        loaded = [items_file.load_item(entry) for entry in items_file.select()]
+
+    assert [type(item) for item in loaded] == [GeoRdpItem, ArticleItem]
+    assert loaded[0].get("published_date") == ("20", "fév", "2015")
+    assert convert(loaded, spider) == expected
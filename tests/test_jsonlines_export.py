@@ -0,0 +1,72 @@
+#! python3  # noqa: E265
+
+"""
+    Tests of the batched and compressed JSON lines export.
+
+    .. code-block:: bash
+
+        python -m pytest tests/test_jsonlines_export.py
+"""
+
+# #############################################################################
+# ########## Libraries #############
+# ##################################
+
+# Standard library
+import gzip
+import json
+
+# project
+from geotribu_scraper.jsonlines_export import JsonLinesWriter
+
+# #############################################################################
+# ########## Functions #############
+# ##################################
+
+
+def export(base_path, count: int, **kwargs) -> list:
+    """Write items and return the paths of the files."""
+    with JsonLinesWriter(base_path, **kwargs) as writer:
+        for node in range(count):
+            writer.write(
+                {"drupal_node": node, "title": "Revue de presse n°{}".format(node)}
+            )
+    return writer.paths
+
+
+def read_items(paths: list) -> list:
+    items = []
+    for path in paths:
+        with gzip.open(path, mode="rt", encoding="UTF8") as in_items:
+            items.extend(json.loads(line) for line in in_items)
+    return items
+
+
+# #############################################################################
+# ########## Tests #################
+# ##################################
+
+
+def test_rotated_parts(tmp_path):
+    paths = export(tmp_path / "items_geotribu_rdp", 500, batch_size=50, max_bytes=1)
+    assert [path.name for path in paths[:2]] == [
+        "items_geotribu_rdp_00001.jl.gz",
+        "items_geotribu_rdp_00002.jl.gz",
+    ]
+    assert len(paths) == 10
+    items = read_items(paths)
+    assert [item.get("drupal_node") for item in items] == list(range(500))
+    assert items[1].get("title") == "Revue de presse n°1"
+
+
+def test_previous_parts_removed_not_other_exports(tmp_path):
+    shard = export(tmp_path / "items_geotribu_rdp_shard1of2", 10)
+    export(tmp_path / "items_geotribu_rdp", 500, batch_size=50, max_bytes=1)
+
+    paths = export(tmp_path / "items_geotribu_rdp", 10)
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "items_geotribu_rdp_00001.jl.gz",
+        "items_geotribu_rdp_shard1of2_00001.jl.gz",
+    ]
+    assert len(read_items(paths)) == 10
+    assert len(read_items(shard)) == 10
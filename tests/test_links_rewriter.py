@@ -0,0 +1,129 @@
+#! python3  # noqa: E265
+
+"""
+    Tests of the single-pass rewrite of the legacy URLs and images sources.
+
+    .. code-block:: bash
+
+        python -m pytest tests/test_links_rewriter.py
+"""
+
+# #############################################################################
+# ########## Libraries #############
+# ##################################
+
+# project
+from geotribu_scraper import pipelines
+from geotribu_scraper.links_rewriter import LinksRewriter, PageImages
+from geotribu_scraper.replacers import URLS_BASE_REPLACEMENTS
+
+# #############################################################################
+# ########## Globals ###############
+# ##################################
+
+PAGE_URL = "http://localhost/geotribu_reborn/GeoRDP/20150220"
+IMAGES_FOLDER = "http://localhost/geotribu_reborn/sites/default/files/Tuto/img/"
+
+# #############################################################################
+# ########## Tests #################
+# ##################################
+
+
+def test_legacy_urls_of_several_hosts():
+    rewriter = LinksRewriter(URLS_BASE_REPLACEMENTS)
+    text = (
+        "Logo : http://www.geotribu.net/sites/default/files/Tuto/img/Blog/world.png "
+        "et [carte](http://geotribu.net/sites/default/public/public_res/img/carte.png)"
+        "\n![](http://localhost/sites/default/public/public_res/default_images/News_3.png)"
+        " puis http://localhost/geotribu_reborn/sites/default/public/public_res/img/a.png"
+        " et http://www.geotribu.net/sites/default/public/public_res/img/b.png\n"
+    )
+
+    rewritten, count = rewriter.rewrite(text)
+    assert count == 5
+    assert rewritten == (
+        "Logo : https://cdn.geotribu.fr/images/internal/icons-rdp-news/world.png "
+        "et [carte](https://cdn.geotribu.fr/img/carte.png)"
+        "\n![](https://cdn.geotribu.fr/img/internal/icons-rdp-news/news.png)"
+        " puis https://cdn.geotribu.fr/img/a.png"
+        " et https://cdn.geotribu.fr/img/b.png\n"
+    )
+
+
+def test_longest_legacy_url_first():
+    rewriter = LinksRewriter(
+        {
+            "http://localhost/img/": "https://cdn.geotribu.fr/img/",
+            "http://localhost/img/logo.png": "https://cdn.geotribu.fr/logo.png",
+        }
+    )
+    rewritten, count = rewriter.rewrite(
+        "http://localhost/img/logo.png http://localhost/img/logo.png.bak"
+    )
+    assert rewritten == (
+        "https://cdn.geotribu.fr/logo.png https://cdn.geotribu.fr/logo.png.bak"
+    )
+    assert count == 2
+    assert rewriter.rewrite("http://localhost/other/logo.png") == (
+        "http://localhost/other/logo.png",
+        0,
+    )
+
+
+def test_images_sources_and_manifest():
+    rewriter = LinksRewriter(URLS_BASE_REPLACEMENTS)
+    page = PageImages(
+        page_url=PAGE_URL,
+        downloaded={
+            IMAGES_FOLDER + "qgis.png?itok=x1": "../../images/full/qgis.png",
+            IMAGES_FOLDER + "postgis.png": "../../images/full/postgis.png",
+        },
+    )
+    text = (
+        "![QGIS](/geotribu_reborn/sites/default/files/Tuto/img/qgis.png)\n"
+        "![PostGIS]({}postgis.png?itok=y2)\n"
+        "![manquante](../sites/default/files/Tuto/img/absente.png)\n"
+        "![CDN](http://localhost/geotribu_reborn/sites/default/public/public_res/img/c.png)"
+        "\n".format(IMAGES_FOLDER)
+    )
+
+    rewritten, count = rewriter.rewrite(text, page)
+    assert count == 3
+    assert rewritten == (
+        "![QGIS](../../images/full/qgis.png)\n"
+        "![PostGIS](../../images/full/postgis.png)\n"
+        "![manquante](../sites/default/files/Tuto/img/absente.png)\n"
+        "![CDN](https://cdn.geotribu.fr/img/c.png)\n"
+    )
+    # images with a known replacement are not part of the page images
+    assert page.referenced == {
+        IMAGES_FOLDER + "qgis.png": "../../images/full/qgis.png",
+        IMAGES_FOLDER + "postgis.png?itok=y2": "../../images/full/postgis.png",
+        "http://localhost/geotribu_reborn/sites/default/files/Tuto/img/absente.png": (
+            None
+        ),
+    }
+
+    pipeline = pipelines.ScrapyCrawlerPipeline()
+    pipeline.images_manifest = {}
+    out_file = pipelines.folder_output / "rdp/2015/rdp_2015-02-20.md"
+    pipeline.write_images_manifest(out_file, 1002, page)
+    assert pipeline.images_manifest == {
+        "rdp/2015/rdp_2015-02-20.md": {
+            "page": "rdp/2015/rdp_2015-02-20.md",
+            "node": 1002,
+            "images": [
+                {
+                    "url": IMAGES_FOLDER + "qgis.png",
+                    "link": "../../images/full/qgis.png",
+                },
+                {
+                    "url": IMAGES_FOLDER + "postgis.png?itok=y2",
+                    "link": "../../images/full/postgis.png",
+                },
+            ],
+            "missing": [
+                "http://localhost/geotribu_reborn/sites/default/files/Tuto/img/absente.png"
+            ],
+        }
+    }
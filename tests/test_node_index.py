@@ -0,0 +1,51 @@
+#! python3  # noqa: E265
+
+"""
+    Tests of the URL-to-node index.
+
+    .. code-block:: bash
+
+        python -m pytest tests/test_node_index.py
+"""
+
+# #############################################################################
+# ########## Libraries #############
+# ##################################
+
+# project
+from geotribu_scraper.node_index import NodeAliasIndex
+
+# #############################################################################
+# ########## Tests #################
+# ##################################
+
+
+def test_learn_and_resolve(tmp_path):
+    index_path = tmp_path / "node_alias_index.json"
+    index = NodeAliasIndex(index_path)
+    count = index.learn(
+        1002,
+        "http://localhost/geotribu_reborn/GeoRDP/20150220",
+        "http://localhost/geotribu_reborn/node/1002/",
+    )
+    assert count == 2
+    assert index.resolve("/geotribu_reborn/GeoRDP/20150220/") == 1002
+    assert index.is_processed("https://example.org/geotribu_reborn/node/1002")
+    assert not index.is_processed("http://localhost/geotribu_reborn/node/1003")
+
+    index.save()
+    assert NodeAliasIndex(index_path).is_processed(
+        "http://localhost/geotribu_reborn/GeoRDP/20150220"
+    )
+
+
+def test_non_web_urls_ignored(tmp_path):
+    """The Drupal database spider runs from a single data: URL, which must neither
+    be learnt nor be skipped on the next run."""
+    index = NodeAliasIndex(tmp_path / "node_alias_index.json")
+    assert index.learn(1002, "data:,", "/geotribu_reborn/node/1002") == 0
+    assert not index.processed_nodes
+
+    index.learn(1002, "http://localhost/geotribu_reborn/node/1002")
+    index.aliases[NodeAliasIndex.url_key("data:,")] = 1002
+    assert not index.is_processed("data:,")
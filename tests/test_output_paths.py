@@ -0,0 +1,66 @@
+#! python3  # noqa: E265
+
+"""
+    Tests of the output paths allocation.
+
+    .. code-block:: bash
+
+        python -m pytest tests/test_output_paths.py
+"""
+
+# #############################################################################
+# ########## Libraries #############
+# ##################################
+
+# Standard library
+from pathlib import Path
+
+# project
+from geotribu_scraper.output_paths import OutputPathAllocator
+
+# #############################################################################
+# ########## Tests #################
+# ##################################
+
+
+def test_collision_suffixed():
+    allocator = OutputPathAllocator()
+    out_file = Path("rdp/2015/rdp_2015-02-20.md")
+    assert allocator.allocate(out_file, 1002, "http://a") == out_file
+    assert allocator.allocate(out_file, 1002, "http://a") == out_file
+    assert allocator.allocate(out_file, 1003, "http://b") == Path(
+        "rdp/2015/rdp_2015-02-20_n1003.md"
+    )
+    assert allocator.allocate(out_file, None, "http://c").stem.startswith(
+        "rdp_2015-02-20_"
+    )
+    assert len(allocator.collisions) == 2
+
+
+def test_allocations_kept_across_runs():
+    """Once allocated, a path keeps its owner whatever the crawl order."""
+    out_file = Path("rdp/2015/rdp_2015-02-20.md")
+    first_run = OutputPathAllocator()
+    first_run.allocate(out_file, 1002, "http://a")
+    first_run.allocate(out_file, 1003, "http://b")
+
+    next_run = OutputPathAllocator(reserved=first_run.allocations())
+    assert next_run.allocate(out_file, 1003, "http://b") == Path(
+        "rdp/2015/rdp_2015-02-20_n1003.md"
+    )
+    assert next_run.allocate(out_file, 1002, "http://a") == out_file
+
+
+def test_reservations_of_partial_runs():
+    out_file = Path("art/2015/titre.md")
+    partial_run = OutputPathAllocator(reserved={out_file: 1002})
+    partial_run.allocate(Path("art/2015/autre.md"), 1003, "http://b")
+    assert partial_run.allocations() == {
+        out_file: 1002,
+        Path("art/2015/autre.md"): 1003,
+    }
+
+    # a content moved to another path releases its previous one
+    renamed = OutputPathAllocator(reserved={out_file: 1002})
+    renamed.allocate(Path("art/2015/nouveau_titre.md"), 1002, "http://a")
+    assert renamed.allocations() == {Path("art/2015/nouveau_titre.md"): 1002}
@@ -0,0 +1,151 @@
+#! python3  # noqa: E265
+
+"""
+    Tests of the persistent cache of the extraction results.
+
+    .. code-block:: bash
+
+        python -m pytest tests/test_parse_cache.py
+"""
+
+# #############################################################################
+# ########## Libraries #############
+# ##################################
+
+# Standard library
+import random
+import sqlite3
+
+# 3rd party
+from scrapy.http import HtmlResponse
+from scrapy.utils.test import get_crawler
+
+# project
+from geotribu_scraper.parse_cache import ParseCache
+
+# #############################################################################
+# ########## Globals ###############
+# ##################################
+
+PAGE_URL = "http://localhost/geotribu_reborn/GeoRDP/20150220"
+PAGE_BODY = b"<html><body><article><h1>Revue de presse</h1></article></body></html>"
+FIELDS = {
+    "title": "Revue de presse du 20150220",
+    "published_date": ("20", "fév", "2015"),
+}
+
+# #############################################################################
+# ########## Functions #############
+# ##################################
+
+
+def extract_rdp(response):
+    """Extraction function, only its name is part of the page hash."""
+
+
+def page(body: bytes = PAGE_BODY, url: str = PAGE_URL) -> HtmlResponse:
+    return HtmlResponse(url, body=body)
+
+
+def count_entries(db_path, spider: str) -> int:
+    with sqlite3.connect(str(db_path)) as connection:
+        return connection.execute(
+            "SELECT COUNT(*) FROM entries WHERE spider = ?", (spider,)
+        ).fetchone()[0]
+
+
+# #############################################################################
+# ########## Tests #################
+# ##################################
+
+
+def test_hit_on_identical_page(tmp_path):
+    db_path = tmp_path / "parse_cache.sqlite"
+    with ParseCache(db_path, spider="geotribu_rdp", version="1") as cache:
+        key = cache.key(extract_rdp, page())
+        assert cache.get(key) is None
+        cache.put(key, FIELDS)
+
+    stats = get_crawler().stats
+    with ParseCache(db_path, spider="geotribu_rdp", version="1", stats=stats) as cache:
+        # same page, downloaded again by the next run
+        fields = cache.get(cache.key(extract_rdp, page()))
+        assert fields == FIELDS
+        # tuples are kept
+        assert isinstance(fields.get("published_date"), tuple)
+        assert cache.hit_rate == 1.0
+    assert stats.get_value("parse_cache/hits") == 1
+    assert stats.get_value("parse_cache/hit_rate") == 1.0
+
+
+def test_miss_on_changed_page(tmp_path):
+    with ParseCache(tmp_path / "parse_cache.sqlite", "geotribu_rdp", "1") as cache:
+        cache.put(cache.key(extract_rdp, page()), FIELDS)
+
+        assert cache.get(cache.key(extract_rdp, page(body=PAGE_BODY + b"\n"))) is None
+        assert cache.get(cache.key(extract_rdp, page(url=PAGE_URL + "/"))) is None
+        assert cache.get(cache.key(page, page())) is None
+        assert cache.misses == 3
+
+
+def test_miss_on_extraction_version(tmp_path):
+    db_path = tmp_path / "parse_cache.sqlite"
+    with ParseCache(db_path, spider="geotribu_rdp", version="1") as cache:
+        key = cache.key(extract_rdp, page())
+        cache.put(key, FIELDS)
+
+    with ParseCache(db_path, spider="geotribu_rdp", version="2") as cache:
+        assert cache.get(key) is None
+    # entries of the previous version are deleted
+    with ParseCache(db_path, spider="geotribu_rdp", version="1") as cache:
+        assert cache.get(key) is None
+    assert count_entries(db_path, "geotribu_rdp") == 0
+
+
+def test_eviction_least_recently_used(tmp_path):
+    db_path = tmp_path / "parse_cache.sqlite"
+    randomness = random.Random(2020)
+    with ParseCache(
+        db_path, "geotribu_rdp", "1", max_bytes=20000, batch_size=3
+    ) as cache:
+        keys = [
+            cache.key(extract_rdp, page(url="{}/{}".format(PAGE_URL, i)))
+            for i in range(30)
+        ]
+        for i, key in enumerate(keys):
+            # incompressible fields of about 1 kB
+            cache.put(key, {"body": randomness.randbytes(1000)})
+            # the first page is read again by every run
+            if i % 5 == 4:
+                assert cache.get(keys[0]) is not None
+
+        # queued writes are saved by batches
+        cache.flush()
+        assert cache.evictions > 0
+        assert cache.size <= 20000
+        assert cache.get(keys[0]) is not None
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[-1]) is not None
+
+    with sqlite3.connect(str(db_path)) as connection:
+        assert (
+            connection.execute("SELECT SUM(size) FROM entries").fetchone()[0] <= 20000
+        )
+
+
+def test_spiders_isolated(tmp_path):
+    db_path = tmp_path / "parse_cache.sqlite"
+    with ParseCache(db_path, spider="geotribu_rdp", version="1") as cache:
+        key = cache.key(extract_rdp, page())
+        cache.put(key, FIELDS)
+
+    # another spider, with its own extraction version
+    with ParseCache(db_path, spider="geotribu_articles", version="2") as cache:
+        assert cache.get(key) is None
+        cache.put(key, {"title": "Article"})
+
+    assert count_entries(db_path, "geotribu_rdp") == 1
+    with ParseCache(db_path, spider="geotribu_rdp", version="1") as cache:
+        assert cache.get(key) == FIELDS
+    with ParseCache(db_path, spider="geotribu_articles", version="2") as cache:
+        assert cache.get(key) == {"title": "Article"}
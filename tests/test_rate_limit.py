@@ -0,0 +1,96 @@
+#! python3  # noqa: E265
+
+"""
+    Tests of the token buckets shared by several processes (see also
+    benchmarks/stress_shared_rate_limit.py for a longer run).
+
+    .. code-block:: bash
+
+        python -m pytest tests/test_rate_limit.py
+"""
+
+# #############################################################################
+# ########## Libraries #############
+# ##################################
+
+# Standard library
+import multiprocessing
+import time
+from bisect import bisect_left
+from pathlib import Path
+
+# project
+from geotribu_scraper.rate_limit import SharedTokenBucket
+
+# #############################################################################
+# ########## Globals ###############
+# ##################################
+
+HOST = "web.archive.org"
+PROCESSES = 4
+REQUESTS = 10
+RATE = 20
+BURST = 1
+# longer than the scheduling jitter of the processes
+WINDOW = 1
+
+# #############################################################################
+# ########## Functions #############
+# ##################################
+
+
+def worker(db_path: str, requests: int, start: float) -> list:
+    """Take tokens as fast as allowed, return the send times."""
+    bucket = SharedTokenBucket(db_path=Path(db_path), rate=RATE, burst=BURST)
+    time.sleep(max(0, start - time.time()))
+    times = []
+    for _ in range(requests):
+        delay = bucket.acquire(HOST)
+        while delay > 0:
+            time.sleep(delay)
+            delay = bucket.acquire(HOST)
+        times.append(time.time())
+    bucket.close()
+    return times
+
+
+def max_excess(times: list, window: float) -> float:
+    """Highest count of requests over the budget, in every window starting at a
+    request: a token bucket allows at most `BURST + RATE * window` requests."""
+    budget = BURST + RATE * window
+    return max(
+        bisect_left(times, first + window) - i - budget for i, first in enumerate(times)
+    )
+
+
+# #############################################################################
+# ########## Tests #################
+# ##################################
+
+
+def test_budget_shared_by_processes(tmp_path):
+    db_path = str(tmp_path / "rate_limit.sqlite")
+    # create the database before the workers start
+    SharedTokenBucket(Path(db_path), RATE, BURST).close()
+    start = time.time() + 0.5
+    with multiprocessing.Pool(PROCESSES) as pool:
+        results = pool.starmap(worker, [(db_path, REQUESTS, start)] * PROCESSES)
+
+    times = sorted(t for result in results for t in result)
+    assert len(times) == PROCESSES * REQUESTS
+    assert max_excess(times, WINDOW) <= 0
+    # a single budget for all the processes, not one each
+    assert times[-1] - times[0] >= 0.9 * (len(times) - BURST) / RATE
+
+
+def test_penalty_shared_by_connections(tmp_path):
+    db_path = tmp_path / "rate_limit.sqlite"
+    bucket = SharedTokenBucket(db_path, RATE, BURST)
+    other = SharedTokenBucket(db_path, RATE, BURST)
+    try:
+        bucket.penalize(HOST, delay=2)
+        assert other.acquire(HOST) > 2
+        assert other.acquire("other.host") == 0
+    finally:
+        bucket.close()
+        other.close()
@@ -0,0 +1,150 @@
+#! python3  # noqa: E265
+
+"""
+    Tests of the validation of the generated markdown tree, on a small output folder.
+
+    .. code-block:: bash
+
+        python -m pytest tests/test_validator.py
+"""
+
+# #############################################################################
+# ########## Libraries #############
+# ##################################
+
+# Standard library
+import json
+import sys
+
+# 3rd party
+import pytest
+
+# project
+from geotribu_scraper import validator
+
+# #############################################################################
+# ########## Globals ###############
+# ##################################
+
+DOCUMENT = """---
+authors:
+- Julien Moura
+categories:
+- article
+date: {date}
+description: Une introduction.
+image: ''
+legacy:
+    node: {node}
+license: default
+robots: index, follow
+tags:
+- PostGIS
+title: {title}
+---
+
+# {title}
+
+{body}
+
+## Auteur
+
+--8<-- "content/team/jmou.md"
+"""
+
+# #############################################################################
+# ########## Fixtures ##############
+# ##################################
+
+
+@pytest.fixture
+def output_folder(tmp_path):
+    """Output folder with one valid document and one of each problem."""
+    root = tmp_path / "_output"
+    documents = {
+        "articles/2015/2015-02-06_valide.md": dict(node=2001),
+        "articles/2015/2015-02-07_sans_titre.md": dict(node=2002, title=""),
+        "articles/2015/2015-02-08_date.md": dict(node=2003, date="08/02/2015"),
+        "articles/2015/2015-02-09_lien.md": dict(
+            node=2004,
+            body="Voir [la carte](http://localhost/geotribu_reborn/node/12) et "
+            "http://www.geotribu.net/node/12 aussi.",
+        ),
+        "articles/2015/2015-02-10_doublon.md": dict(node=2001),
+    }
+    for path, fields in documents.items():
+        values = dict(
+            date="2015-02-06 10:20", title="Découvrir PostGIS", body="Le corps."
+        )
+        values.update(fields)
+        (root / path).parent.mkdir(parents=True, exist_ok=True)
+        (root / path).write_text(DOCUMENT.format(**values), encoding="UTF8")
+    return root
+
+
+# #############################################################################
+# ########## Tests #################
+# ##################################
+
+
+def test_report(output_folder, monkeypatch):
+    monkeypatch.setattr(
+        sys, "argv", ["validator", str(output_folder), "--processes", "2"]
+    )
+    with pytest.raises(SystemExit) as exit_info:
+        validator.main()
+    assert exit_info.value.code == 1
+
+    report = json.loads(
+        (output_folder / "validation_report.json").read_text(encoding="UTF8")
+    )
+    assert report.get("files") == 5
+    assert report.get("files_with_problems") == 5
+    assert report.get("summary") == {
+        "required_field": 1,
+        "date_format": 1,
+        "missing_snippets": 0,
+        "legacy_urls": 2,
+        "duplicate_nodes": 1,
+    }
+    assert report.get("documents") == {
+        "articles/2015/2015-02-07_sans_titre.md": [
+            {"check": "required_field", "message": "missing title"}
+        ],
+        "articles/2015/2015-02-08_date.md": [
+            {
+                "check": "date_format",
+                "message": "'08/02/2015' does not match %Y-%m-%d %H:%M",
+            }
+        ],
+    }
+    assert report.get("legacy_urls") == {
+        "http://localhost/geotribu_reborn/node/12": 1,
+        "http://www.geotribu.net/node/12": 1,
+    }
+    assert report.get("duplicate_nodes") == {
+        "2001": [
+            "articles/2015/2015-02-06_valide.md",
+            "articles/2015/2015-02-10_doublon.md",
+        ]
+    }
+
+
+def test_missing_snippet_targets(output_folder):
+    (output_folder / "articles/2015/2015-02-11_auteur.md").write_text(
+        '---\n---\n\n--8<-- "content/team/inconnu.md"\n', encoding="UTF8"
+    )
+    report = validator.validate_tree(output_folder, processes=1)
+    assert report.get("missing_snippets") == {
+        "content/team/inconnu.md": ["articles/2015/2015-02-11_auteur.md"]
+    }
+    assert report.get("documents").get("articles/2015/2015-02-11_auteur.md") == [
+        {"check": "frontmatter", "message": "missing front-matter"}
+    ]
+
+    # with the website repository: the snippets must exist in it
+    website = output_folder.parent / "website"
+    (website / "content/team").mkdir(parents=True)
+    (website / "content/team/inconnu.md").write_text("", encoding="UTF8")
+    report = validator.validate_tree(output_folder, snippets_base=website, processes=1)
+    assert sorted(report.get("missing_snippets")) == ["content/team/jmou.md"]
@@ -0,0 +1,107 @@
+#! python3  # noqa: E265
+
+"""
+    Tests of the Wayback Machine CDX listings, on tests/fixtures/geotribu_net.cdx.
+
+    .. code-block:: bash
+
+        python -m pytest tests/test_wayback.py
+"""
+
+# #############################################################################
+# ########## Libraries #############
+# ##################################
+
+# Standard library
+import json
+from pathlib import Path
+
+# project
+from geotribu_scraper.wayback import (
+    CDX_SERVER_FIELDS,
+    parse_cdx,
+    read_cdx_file,
+    select_snapshots,
+    snapshot_url,
+)
+
+# #############################################################################
+# ########## Globals ###############
+# ##################################
+
+CDX_FIXTURE = Path(__file__).resolve().parent / "fixtures" / "geotribu_net.cdx"
+
+# patterns of the RDP and articles spiders
+RDP_PATTERNS = [r"/GeoRDP\d*/\d{8}/?$"]
+ARTICLE_PATTERNS = [r"/Article/[^/]+/?$"]
+
+# #############################################################################
+# ########## Tests #################
+# ##################################
+
+
+def test_parse_cdx_text():
+    records = parse_cdx(read_cdx_file(CDX_FIXTURE))
+    assert len(records) == 17
+    assert records[0] == {
+        "urlkey": "net,geotribu)/",
+        "timestamp": "20150301093012",
+        "original": "http://www.geotribu.net/",
+        "mimetype": "text/html",
+        "statuscode": "200",
+        "digest": "3I42H3S6NNFQ2MSVX7XZKYAYSCX5QBYJ",
+        "length": "6012",
+    }
+
+
+def test_parse_cdx_json_and_legend():
+    lines = read_cdx_file(CDX_FIXTURE).splitlines()
+    rows = [list(CDX_SERVER_FIELDS)] + [line.split() for line in lines]
+    assert parse_cdx(json.dumps(rows)) == parse_cdx("\n".join(lines))
+    assert parse_cdx("[]") == []
+
+    # legend line: other order of the fields
+    legend = " CDX N b a m s k S\n{}".format(lines[2])
+    assert parse_cdx(legend)[0].get("original") == (
+        "http://www.geotribu.net/revues-de-presse"
+    )
+
+
+def test_select_snapshots_most_recent():
+    records = parse_cdx(read_cdx_file(CDX_FIXTURE))
+    snapshots = select_snapshots(records, url_patterns=RDP_PATTERNS)
+
+    # 20150206: only a 503 capture. 20150220: the 302 capture is skipped.
+    # 20150213: captured with and without www and trailing slash, a single content.
+    assert [(s.get("original"), s.get("timestamp")) for s in snapshots] == [
+        ("http://www.geotribu.net/GeoRDP/20150213", "20150301093731"),
+        ("http://www.geotribu.net/GeoRDP/20150220", "20160115173045"),
+        ("http://www.geotribu.net/GeoRDP2/20150220", "20150301094002"),
+    ]
+
+    articles = select_snapshots(records, url_patterns=ARTICLE_PATTERNS)
+    assert [s.get("original") for s in articles] == [
+        "http://www.geotribu.net/Article/20140312",
+        "http://www.geotribu.net/Article/20150206",
+    ]
+
+
+def test_select_snapshots_closest_to_target():
+    records = parse_cdx(read_cdx_file(CDX_FIXTURE))
+    snapshots = select_snapshots(
+        records, url_patterns=RDP_PATTERNS, target_timestamp="20150215"
+    )
+    assert [s.get("timestamp") for s in snapshots] == [
+        "20150214101010",
+        "20150221070102",
+        "20150301094002",
+    ]
+
+
+def test_snapshot_url():
+    records = parse_cdx(read_cdx_file(CDX_FIXTURE))
+    snapshot = select_snapshots(records, url_patterns=RDP_PATTERNS)[0]
+    assert snapshot_url(snapshot, "https://web.archive.org/web/") == (
+        "https://web.archive.org/web/20150301093731id_/"
+        "http://www.geotribu.net/GeoRDP/20150213"
+    )